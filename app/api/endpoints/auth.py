@@ -3,6 +3,7 @@ from app.services.auth import AuthService
 from app.schemas.auth import UserCreateSchema, UserLoginSchema
 from app.db.mongo_client import get_db
 from app.core.validation_middleware import validate_json
+from app.core.security import PasswordHasherBusy
 from pydantic import ValidationError
 
 auth_bp = Blueprint('auth', __name__)
@@ -13,13 +14,17 @@ def register_user(data: UserCreateSchema):
     try:
         current_app.logger.info('Register endpoint called')
         auth_service = AuthService(get_db())
-        auth_service.register(user_data.model_dump())
+        auth_service.register(data.model_dump())
         return jsonify({'message': 'user created successfully'}), 201
 
     except ValidationError as e:
         current_app.logger.error(f'Validation error: {str(e)}')
         return jsonify({'error': 'validation error', 'details': str(e)}), 400
 
+    except PasswordHasherBusy as e:
+        current_app.logger.warning(f'Password hashing unavailable: {e}')
+        return jsonify({'error': 'service busy, try again shortly'}), 503, {'Retry-After': '1'}
+
     except Exception as e:
         current_app.logger.error(f'Internal server error: {e}')
         return jsonify({'error': f'internal server error {e}'}), 500
@@ -35,6 +40,9 @@ def login_user(data: UserLoginSchema):
     except ValidationError as e:
         current_app.logger.error(f'Validation error: {str(e)}')
         return jsonify({'error': 'validation error', 'details': str(e)}), 400
+    except PasswordHasherBusy as e:
+        current_app.logger.warning(f'Password hashing unavailable: {e}')
+        return jsonify({'error': 'service busy, try again shortly'}), 503, {'Retry-After': '1'}
     except Exception as e:
         current_app.logger.error(f'Internal server error: {e}')
         return jsonify({'error': f'internal server error {e}'}), 500
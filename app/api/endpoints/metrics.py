@@ -0,0 +1,29 @@
+from flask import Blueprint, Response
+from app.core.metrics import metrics_registry
+from app.core.security import password_hasher
+from app.db.mongo_client import get_pool_stats
+from app.services.clinicaltrials import client_stats
+from app.services.prefetch import page_prefetcher
+from app.services.pretranslated import pretranslated_store
+from app.services.result_cache import search_result_cache
+from app.services.single_flight import search_flights, translate_flights
+from app.services.translation_memory import translation_memory
+
+metrics_bp = Blueprint('metrics', __name__)
+
+# the stats each component already keeps, exported as per-worker gauges
+metrics_registry.add_collector('mongo_pool', get_pool_stats)
+metrics_registry.add_collector('ctgov_client', client_stats.stats)
+metrics_registry.add_collector('search_result_cache', search_result_cache.stats)
+metrics_registry.add_collector('translation_memory', translation_memory.stats)
+metrics_registry.add_collector('search_flights', search_flights.stats)
+metrics_registry.add_collector('translate_flights', translate_flights.stats)
+metrics_registry.add_collector('password_hasher', password_hasher.stats)
+if page_prefetcher is not None:
+    metrics_registry.add_collector('search_prefetch', page_prefetcher.stats)
+if pretranslated_store is not None:
+    metrics_registry.add_collector('pretranslated_store', pretranslated_store.stats)
+
+@metrics_bp.route('', methods = ['GET'])
+def metrics():
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4')
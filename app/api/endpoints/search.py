@@ -1,7 +1,9 @@
-from app.services.search import SearchService
+from app.services.registry import get_search_service
 from app.schemas.search import PacienteSearch
+from app.core.responses import encoded_response
 from app.core.validation_middleware import validate_json
 from flask import Blueprint, request, jsonify, current_app
+from requests.exceptions import RequestException
 
 search_bp = Blueprint('search', __name__)
 
@@ -10,10 +12,23 @@ search_bp = Blueprint('search', __name__)
 def search_paciente(data: PacienteSearch):
     try:
         current_app.logger.info('Search paciente endpoint called')
-        search_service = SearchService()
-        result = search_service.search_paciente(data)
+        page = request.args.get('page', 1, type=int)
+        page_size = request.args.get('pageSize', 3, type=int)
+        target_language = request.args.get('lang', 'pt')
+        if page < 1 or not 1 <= page_size <= 1000:
+            return jsonify({'error': 'invalid pagination parameters'}), 400
 
-        return jsonify(result), 200
+        search_service = get_search_service()
+        body, cache_status = search_service.search_paciente_encoded(
+            data, page_size=page_size, page=page, target_language=target_language
+        )
+
+        response = encoded_response(body)
+        response.headers['X-Cache'] = cache_status
+        return response
     except ValueError as e:
         current_app.logger.error(f'Error searching paciente: {e}')
-        return jsonify({'error': 'error searching paciente'}), 400
\ No newline at end of file
+        return jsonify({'error': 'error searching paciente'}), 400
+    except RequestException as e:
+        current_app.logger.error(f'Upstream error searching paciente: {e}')
+        return jsonify({'error': 'clinical trials service unavailable'}), 502
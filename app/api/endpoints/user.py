@@ -1,14 +1,100 @@
+import json
+from app.core.config import Config
 from app.models.user import UserModel
-from app.schemas.user import UpdateUser
+from app.schemas.user import BatchUpdateUsers, UpdateUser, UserIds
 from app.services.user import UserService 
 from app.db.mongo_client import get_db 
 from app.core.validation_middleware import validate_json
-from flask import Blueprint, request, jsonify, current_app
+from app.core.auth_middleware import require_admin, require_auth
+from flask import Blueprint, Response, request, jsonify, current_app, g, stream_with_context
 
 user_bp = Blueprint('user', __name__)
 
+def is_current_user(user_id):
+    return user_id == g.user_id
+
+def stream_json_array(items):
+    def generate():
+        yield '['
+        for index, item in enumerate(items):
+            yield (',' if index else '') + json.dumps(item)
+        yield ']'
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+def batch_too_large(size):
+    if size > Config.USER_BATCH_MAX_SIZE:
+        return jsonify({'error': f'batch larger than {Config.USER_BATCH_MAX_SIZE} items'}), 413
+    return None
+
+@user_bp.route('', methods = ['GET'])
+@require_admin
+def list_users_endpoint():
+    current_app.logger.info('List users endpoint called')
+    after = request.args.get('after')
+    user_service = UserService(get_db())
+    if request.args.get('format') == 'ndjson':
+        try:
+            users = user_service.iter_users(after, batch_size=Config.USER_STREAM_BATCH_SIZE)
+            first = next(users, None)
+        except ValueError:
+            return jsonify({'error': 'invalid cursor'}), 400
+
+        def generate():
+            if first is None:
+                return
+            yield json.dumps(first) + '\n'
+            for user in users:
+                yield json.dumps(user) + '\n'
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    limit = request.args.get('limit', 100, type=int)
+    if not 1 <= limit <= Config.USER_LIST_MAX_LIMIT:
+        return jsonify({'error': f'limit must be between 1 and {Config.USER_LIST_MAX_LIMIT}'}), 400
+    try:
+        users, next_cursor = user_service.list_users(after, limit)
+    except ValueError:
+        return jsonify({'error': 'invalid cursor'}), 400
+    return jsonify({'users': users, 'next_cursor': next_cursor}), 200
+
+@user_bp.route('/batch/lookup', methods = ['POST'])
+@require_admin
+@validate_json(UserIds)
+def lookup_users_endpoint(data):
+    current_app.logger.info('Batch lookup users endpoint called')
+    too_large = batch_too_large(len(data.ids))
+    if too_large:
+        return too_large
+    user_service = UserService(get_db())
+    return stream_json_array(user_service.get_users_by_ids(data.ids))
+
+@user_bp.route('/batch/update', methods = ['POST'])
+@require_admin
+@validate_json(BatchUpdateUsers)
+def update_users_endpoint(data):
+    current_app.logger.info('Batch update users endpoint called')
+    too_large = batch_too_large(len(data.updates))
+    if too_large:
+        return too_large
+    user_service = UserService(get_db())
+    results = user_service.update_users([update.model_dump(exclude_none=True) for update in data.updates])
+    return stream_json_array(results)
+
+@user_bp.route('/batch/delete', methods = ['POST'])
+@require_admin
+@validate_json(UserIds)
+def delete_users_endpoint(data):
+    current_app.logger.info('Batch delete users endpoint called')
+    too_large = batch_too_large(len(data.ids))
+    if too_large:
+        return too_large
+    user_service = UserService(get_db())
+    return stream_json_array(user_service.delete_users(data.ids))
+
 @user_bp.route('/<user_id>', methods = ['GET'])
+@require_auth
 def get_user_endpoint(user_id):
+    if not is_current_user(user_id):
+        return jsonify({'error': 'forbidden'}), 403
     try:
         current_app.logger.info('Get user endpoint called')
         user_service = UserService(get_db())
@@ -19,12 +105,15 @@ def get_user_endpoint(user_id):
         return jsonify({'error': 'user not found'}), 404
 
 @user_bp.route('/<user_id>', methods = ['PUT'])
+@require_auth
 @validate_json(UpdateUser)
 def update_user_endpoint(data, user_id):
+    if not is_current_user(user_id):
+        return jsonify({'error': 'forbidden'}), 403
     try:
         current_app.logger.info('Update user endpoint called')
         user_service = UserService(get_db())
-        update_data = data.model_dump()
+        update_data = data.model_dump(exclude_none=True)
         result = user_service.update_user(user_id, update_data)
         return jsonify(result), 200
     except ValueError as e:
@@ -32,7 +121,10 @@ def update_user_endpoint(data, user_id):
         return jsonify({'error': 'error updating user'}), 400
 
 @user_bp.route('/<user_id>', methods = ['DELETE'])
+@require_auth
 def delete_user_endpoint(user_id):
+    if not is_current_user(user_id):
+        return jsonify({'error': 'forbidden'}), 403
     try:
         current_app.logger.info('Delete user endpoint called')
         user_service = UserService(get_db())
@@ -0,0 +1,104 @@
+"""ASGI entrypoint: the async search on the event loop, every other route through Flask."""
+import json
+import logging
+from urllib.parse import parse_qs
+import httpx
+from asgiref.wsgi import WsgiToAsgi
+from pydantic import ValidationError
+from app.main import app as flask_app
+from app.models.study import serialize_studies
+from app.schemas.search import PacienteSearch
+from app.services.search_async import AsyncSearchService, AsyncTranslateService
+
+logger = logging.getLogger(__name__)
+
+ASYNC_SEARCH_PATH = '/search/paciente/async'
+
+
+class SearchApplication:
+    def __init__(self, wsgi_app, search_service=None):
+        self.wsgi = WsgiToAsgi(wsgi_app)
+        self.app = wsgi_app
+        self._search_service = search_service
+
+    @property
+    def search_service(self) -> AsyncSearchService:
+        if self._search_service is None:
+            self._search_service = AsyncSearchService(
+                translate_service=AsyncTranslateService(app=self.app)
+            )
+        return self._search_service
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] == 'http' and scope['path'] == ASYNC_SEARCH_PATH:
+            if scope['method'] != 'POST':
+                return await self.send_json(send, 405, {'error': 'method not allowed'})
+            return await self.search_paciente(scope, receive, send)
+        return await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._search_service is not None:
+                    await self._search_service.aclose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def read_body(receive) -> bytes:
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+        return body
+
+    @staticmethod
+    async def send_json(send, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        response_headers = [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+        ]
+        for name, value in (headers or {}).items():
+            response_headers.append((name.lower().encode(), value.encode()))
+        await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def search_paciente(self, scope, receive, send):
+        query = parse_qs(scope.get('query_string', b'').decode())
+        try:
+            page = int(query.get('page', ['1'])[0])
+            page_size = int(query.get('pageSize', ['3'])[0])
+        except ValueError:
+            page, page_size = 0, 0
+        target_language = query.get('lang', ['pt'])[0]
+        if page < 1 or not 1 <= page_size <= 1000:
+            return await self.send_json(send, 400, {'error': 'invalid pagination parameters'})
+
+        try:
+            data = PacienteSearch(**json.loads(await self.read_body(receive) or b'{}'))
+        except (ValidationError, ValueError, TypeError) as e:
+            return await self.send_json(send, 400, {'error': 'validation error', 'details': str(e)})
+
+        try:
+            result, cache_status = await self.search_service.search_paciente_cached(
+                data, page_size=page_size, page=page, target_language=target_language
+            )
+        except ValueError as e:
+            logger.error(f'Error searching paciente: {e}')
+            return await self.send_json(send, 400, {'error': 'error searching paciente'})
+        except httpx.HTTPError as e:
+            logger.error(f'Upstream error searching paciente: {e}')
+            return await self.send_json(send, 502, {'error': 'clinical trials service unavailable'})
+
+        await self.send_json(send, 200, serialize_studies(result), headers={'X-Cache': cache_status})
+
+
+application = SearchApplication(flask_app)
@@ -0,0 +1,42 @@
+from flask import g, request, jsonify
+from functools import wraps
+from app.db.mongo_client import get_db
+from app.services.auth import AuthService
+
+def require_auth(func=None, *, load_user=False):
+    """401 without a valid bearer token; sets g.user_id, g.claims and, with load_user, g.user."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+            if scheme.lower() != 'bearer' or not token:
+                return jsonify({'error': 'missing bearer token'}), 401
+
+            auth_service = AuthService(get_db())
+            try:
+                claims = auth_service.verify_claims(token.strip())
+            except ValueError:
+                return jsonify({'error': 'invalid token'}), 401
+
+            g.claims = claims
+            g.user_id = claims['sub']
+            if load_user:
+                g.user = auth_service.get_user(g.user_id)
+                if g.user is None:
+                    return jsonify({'error': 'invalid token'}), 401
+            return func(*args, **kwargs)
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def require_admin(func):
+    """require_auth(load_user=True), plus a 403 unless the user has role 'admin'."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if g.user.get('role') != 'admin':
+            return jsonify({'error': 'forbidden'}), 403
+        return func(*args, **kwargs)
+    return require_auth(wrapper, load_user=True)
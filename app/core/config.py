@@ -5,4 +5,105 @@ load_dotenv()
 
 class Config:
     MONGO_URI = os.getenv('MONGO_URI')  
-    SECRET_KEY = os.getenv('SECRET_KEY')
\ No newline at end of file
+    SECRET_KEY = os.getenv('SECRET_KEY')
+
+    # verified JWT claims are kept until the token expires or the TTL
+    # passes; AUTH_USER_CACHE_TTL=0 disables the user document cache
+    AUTH_TOKEN_CACHE_SIZE = int(os.getenv('AUTH_TOKEN_CACHE_SIZE', 10000))
+    AUTH_TOKEN_CACHE_TTL = int(os.getenv('AUTH_TOKEN_CACHE_TTL', 300))
+    AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', 10000))
+    AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 0))
+
+    # bcrypt runs in BCRYPT_POOL_SIZE processes (0 = inline); once
+    # BCRYPT_MAX_QUEUE more calls are waiting, logins get a 503
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    BCRYPT_POOL_SIZE = int(os.getenv('BCRYPT_POOL_SIZE', 2))
+    BCRYPT_MAX_QUEUE = int(os.getenv('BCRYPT_MAX_QUEUE', 16))
+    BCRYPT_TIMEOUT = float(os.getenv('BCRYPT_TIMEOUT', 5))
+
+    MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'sprint-hsl')
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 50))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 60000))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 2000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    # create the declared indexes when the app starts; `flask ensure-indexes` does it on demand
+    MONGO_ENSURE_INDEXES = os.getenv('MONGO_ENSURE_INDEXES', 'false').lower() == 'true'
+
+    # most items a batch request may carry, most users a listing page returns,
+    # and how many users the NDJSON stream reads per cursor batch
+    USER_BATCH_MAX_SIZE = int(os.getenv('USER_BATCH_MAX_SIZE', 1000))
+    USER_LIST_MAX_LIMIT = int(os.getenv('USER_LIST_MAX_LIMIT', 1000))
+    USER_STREAM_BATCH_SIZE = int(os.getenv('USER_STREAM_BATCH_SIZE', 500))
+
+    CTGOV_BASE_URL = os.getenv('CTGOV_BASE_URL', 'https://clinicaltrials.gov/api/v2/studies')
+    CTGOV_CONNECT_TIMEOUT = float(os.getenv('CTGOV_CONNECT_TIMEOUT', 3.05))
+    CTGOV_READ_TIMEOUT = float(os.getenv('CTGOV_READ_TIMEOUT', 20))
+    CTGOV_MAX_RETRIES = int(os.getenv('CTGOV_MAX_RETRIES', 3))
+    CTGOV_BACKOFF_FACTOR = float(os.getenv('CTGOV_BACKOFF_FACTOR', 0.5))
+    CTGOV_BACKOFF_MAX = float(os.getenv('CTGOV_BACKOFF_MAX', 8))
+    CTGOV_POOL_MAXSIZE = int(os.getenv('CTGOV_POOL_MAXSIZE', 10))
+    # streaming only saves memory on bodies fetched without the fields=
+    # projection and is always slower, so json.loads parses everything up
+    # to this size (see benchmarks/parse_studies.py)
+    CTGOV_STREAM_PARSE_MIN_BYTES = int(os.getenv('CTGOV_STREAM_PARSE_MIN_BYTES', 16 * 1024 * 1024))
+
+    # 'memory' keeps caches inside each worker, 'sqlite' shares them between
+    # all gunicorn workers on the same host through CACHE_SQLITE_PATH
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+    CACHE_SQLITE_PATH = os.getenv('CACHE_SQLITE_PATH', '/tmp/sprint-hsl-cache.sqlite3')
+    PAGE_TOKEN_CACHE_SIZE = int(os.getenv('PAGE_TOKEN_CACHE_SIZE', 10000))
+    PAGE_TOKEN_CACHE_TTL = int(os.getenv('PAGE_TOKEN_CACHE_TTL', 900))
+    SEARCH_CACHE_SIZE = int(os.getenv('SEARCH_CACHE_SIZE', 512))
+    SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', 300))
+    SEARCH_CACHE_STALE_TTL = int(os.getenv('SEARCH_CACHE_STALE_TTL', 1800))
+    SEARCH_PREFETCH_ENABLED = os.getenv('SEARCH_PREFETCH_ENABLED', 'false').lower() == 'true'
+    SEARCH_PREFETCH_MAX_WORKERS = int(os.getenv('SEARCH_PREFETCH_MAX_WORKERS', 2))
+    SEARCH_PREFETCH_MAX_IN_FLIGHT = int(os.getenv('SEARCH_PREFETCH_MAX_IN_FLIGHT', 8))
+    SEARCH_PREFETCH_MAX_PENDING = int(os.getenv('SEARCH_PREFETCH_MAX_PENDING', 128))
+    # identical concurrent searches/translations share one computation; with
+    # SINGLE_FLIGHT_SHARED workers also take turns through CACHE_SQLITE_PATH
+    SINGLE_FLIGHT_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_TIMEOUT', 30))
+    SINGLE_FLIGHT_SHARED = os.getenv('SINGLE_FLIGHT_SHARED', 'false').lower() == 'true'
+
+    # service account JSON; without it the client uses application default credentials
+    GOOGLE_CREDENTIALS = os.getenv('GOOGLE_CREDENTIALS')
+    # leave TRANSLATION_MEMORY_PATH empty to keep the memory in-process only
+    TRANSLATION_MEMORY_PATH = os.getenv('TRANSLATION_MEMORY_PATH', '/tmp/sprint-hsl-translations.sqlite3')
+    TRANSLATION_MEMORY_SIZE = int(os.getenv('TRANSLATION_MEMORY_SIZE', 20000))
+    TRANSLATE_BATCH_MAX_ITEMS = int(os.getenv('TRANSLATE_BATCH_MAX_ITEMS', 128))
+    TRANSLATE_BATCH_MAX_CHARS = int(os.getenv('TRANSLATE_BATCH_MAX_CHARS', 30000))
+    TRANSLATE_MAX_WORKERS = int(os.getenv('TRANSLATE_MAX_WORKERS', 4))
+    TRANSLATE_MAX_RETRIES = int(os.getenv('TRANSLATE_MAX_RETRIES', 2))
+    TRANSLATE_BACKOFF_FACTOR = float(os.getenv('TRANSLATE_BACKOFF_FACTOR', 0.25))
+    ASYNC_TRANSLATE_GROUP_SIZE = int(os.getenv('ASYNC_TRANSLATE_GROUP_SIZE', 10))
+
+    # local copy of clinicaltrials.gov that searches are answered from first
+    MIRROR_ENABLED = os.getenv('MIRROR_ENABLED', 'false').lower() == 'true'
+    MIRROR_PATH = os.getenv('MIRROR_PATH', '/tmp/sprint-hsl-mirror.sqlite3')
+    MIRROR_SYNC_ENABLED = os.getenv('MIRROR_SYNC_ENABLED', 'false').lower() == 'true'
+    MIRROR_SYNC_INTERVAL_MINUTES = int(os.getenv('MIRROR_SYNC_INTERVAL_MINUTES', 60))
+    MIRROR_SYNC_PAGE_SIZE = int(os.getenv('MIRROR_SYNC_PAGE_SIZE', 1000))
+
+    # translated study text stored per (NCT ID, content hash); empty disables it
+    PRETRANSLATED_PATH = os.getenv('PRETRANSLATED_PATH', '')
+    PRETRANSLATE_LANGUAGES = [lang for lang in os.getenv('PRETRANSLATE_LANGUAGES', 'pt').split(',') if lang]
+    PRETRANSLATE_BATCH_SIZE = int(os.getenv('PRETRANSLATE_BATCH_SIZE', 200))
+
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    # import the lazily loaded libraries at startup, for gunicorn --preload;
+    # `flask import-profile` fails when importing the app takes longer
+    # than STARTUP_BUDGET_MS
+    PRELOAD_SERVICES = os.getenv('PRELOAD_SERVICES', 'false').lower() == 'true'
+    STARTUP_BUDGET_MS = float(os.getenv('STARTUP_BUDGET_MS', 500))
+    # /metrics sums the files every worker writes to METRICS_DIR; leave it
+    # empty with a single worker. Clear the directory when deploying.
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_DIR = os.getenv('METRICS_DIR', '')
+    METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 1))
+
+    # search bodies are compressed once per cached result, not per response
+    RESPONSE_COMPRESS_MIN_SIZE = int(os.getenv('RESPONSE_COMPRESS_MIN_SIZE', 1024))
+    RESPONSE_GZIP_LEVEL = int(os.getenv('RESPONSE_GZIP_LEVEL', 6))
+    RESPONSE_BROTLI_QUALITY = int(os.getenv('RESPONSE_BROTLI_QUALITY', 8))
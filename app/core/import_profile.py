@@ -0,0 +1,94 @@
+"""Cold-import timing of the app, as a gunicorn worker boot pays it."""
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from app.core.config import Config
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@dataclass
+class ImportTiming:
+    __slots__ = ("name", "self_ms", "cumulative_ms", "depth", "parent")
+
+    name: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+    parent: Optional[str]
+
+
+def parse_importtime(stderr: str) -> List[ImportTiming]:
+    """Rows of -X importtime output, each with the module that imported it."""
+    timings = []
+    # children are printed before their parent, one indent level deeper
+    pending: Dict[int, List[ImportTiming]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        timing = ImportTiming(stripped, int(self_us) / 1000, int(cumulative_us) / 1000, depth, None)
+        for child in pending.pop(depth + 1, []):
+            child.parent = timing.name
+        pending.setdefault(depth, []).append(timing)
+        timings.append(timing)
+    return timings
+
+
+def _import_in_subprocess(module: str, *flags: str) -> subprocess.CompletedProcess:
+    code = f"import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+    completed = subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=_PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{completed.stderr[-2000:]}")
+    return completed
+
+
+def profile_imports(module: str = "app.main") -> Tuple[float, List[ImportTiming]]:
+    """Wall time in ms to import module in a new interpreter, and the per-module timings."""
+    # -X importtime slows the import down itself, so the wall time comes from a clean run
+    completed = _import_in_subprocess(module)
+    boot_ms = float(completed.stdout.strip().splitlines()[-1]) * 1000
+    return boot_ms, parse_importtime(_import_in_subprocess(module, "-X", "importtime").stderr)
+
+
+def check_startup(
+    budget_ms: Optional[float] = None,
+    top: int = 15,
+    echo: Callable[[str], None] = print,
+    module: str = "app.main"
+) -> bool:
+    """Prints where import time goes; False if the import took longer than budget_ms."""
+    budget_ms = budget_ms if budget_ms is not None else Config.STARTUP_BUDGET_MS
+    boot_ms, timings = profile_imports(module)
+
+    echo(f"{'slowest modules':<48}{'self ms':>10}")
+    for timing in sorted(timings, key=lambda t: t.self_ms, reverse=True)[:top]:
+        echo(f"{timing.name:<48}{timing.self_ms:>10.1f}")
+
+    # libraries our own modules import directly, with all they pull in
+    pulled_in = [
+        t for t in timings
+        if t.parent and t.parent.startswith("app.") and not t.name.startswith("app.")
+    ]
+    echo("")
+    echo(f"{'libraries imported by the app':<48}{'total ms':>10}  imported by")
+    for timing in sorted(pulled_in, key=lambda t: t.cumulative_ms, reverse=True)[:top]:
+        echo(f"{timing.name:<48}{timing.cumulative_ms:>10.1f}  {timing.parent}")
+
+    echo("")
+    within = boot_ms <= budget_ms
+    echo(f"import {module}: {boot_ms:.0f} ms, budget {budget_ms:.0f} ms -> {'ok' if within else 'OVER BUDGET'}")
+    return within
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_startup() else 1)
@@ -0,0 +1,320 @@
+import glob
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from flask import Flask, g, request
+from app.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_NAME = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        (registry or metrics_registry).register(self)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            values = [[list(key), value] for key, value in self._values.items()]
+        return {"kind": self.kind, "help": self.documentation, "labelnames": list(self.labelnames), "values": values}
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry=None
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        # per-bucket counts, not cumulative; the +Inf bucket is the last slot
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+            # a new list, so a snapshot being written out never sees it change
+            counts = list(counts)
+            counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot = super().snapshot()
+        snapshot["buckets"] = list(self.buckets)
+        return snapshot
+
+
+def _flatten(prefix: str, stats: Dict[str, Any], out: Dict[str, float]):
+    for key, value in stats.items():
+        name = f"{prefix}_{_NAME.sub('_', str(key))}"
+        if isinstance(value, dict):
+            _flatten(name, value, out)
+        elif isinstance(value, (int, float)):
+            out[name] = float(value)
+
+
+class MetricsRegistry:
+    """The metrics of one worker process, merged with other workers' through directory."""
+
+    def __init__(self, directory: Optional[str] = None, flush_interval: Optional[float] = None):
+        self.directory = directory if directory is not None else Config.METRICS_DIR
+        self.flush_interval = flush_interval if flush_interval is not None else Config.METRICS_FLUSH_INTERVAL
+        self.metrics: Dict[str, _Metric] = {}
+        self.collectors: Dict[str, Callable[[], Optional[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+        self._last_flush = -math.inf
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self.metrics:
+                raise ValueError(f"metric {metric.name} is already registered")
+            self.metrics[metric.name] = metric
+
+    def add_collector(self, name: str, collect: Callable[[], Optional[Dict[str, Any]]]):
+        """collect returns a (possibly nested) stats dict, exported as app_<name>_* gauges."""
+        with self._lock:
+            self.collectors[name] = collect
+
+    def reset(self):
+        for metric in list(self.metrics.values()):
+            metric.reset()
+        self._last_flush = -math.inf
+
+    def gauges(self) -> Dict[str, float]:
+        gauges = {}
+        for name, collect in list(self.collectors.items()):
+            try:
+                stats = collect()
+            except Exception as e:
+                logger.error(f"Collecting {name} stats failed: {e}")
+                continue
+            if stats:
+                _flatten(f"app_{name}", stats, gauges)
+        return gauges
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "metrics": {name: metric.snapshot() for name, metric in list(self.metrics.items())},
+            "gauges": self.gauges(),
+        }
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"metrics-{pid}.json")
+
+    def flush(self, force: bool = False):
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        path = self._path(os.getpid())
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Could not write metrics to {path}: {e}")
+
+    def collect(self) -> List[Dict[str, Any]]:
+        if not self.directory:
+            return [self.snapshot()]
+
+        self.flush(force=True)
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.error(f"Skipping unreadable metrics file {path}: {e}")
+        return snapshots
+
+    def render(self) -> str:
+        """All workers' metrics in the Prometheus text exposition format."""
+        snapshots = self.collect()
+        merged: Dict[str, Dict[str, Any]] = {}
+        for snapshot in snapshots:
+            for name, metric in snapshot["metrics"].items():
+                target = merged.setdefault(name, dict(metric, values={}))
+                for labels, value in metric["values"]:
+                    key = tuple(labels)
+                    if metric["kind"] == "counter":
+                        target["values"][key] = target["values"].get(key, 0.0) + value
+                    else:
+                        counts, total, count = target["values"].get(key) or ([0] * len(value[0]), 0.0, 0)
+                        target["values"][key] = (
+                            [a + b for a, b in zip(counts, value[0])], total + value[1], count + value[2]
+                        )
+
+        lines = []
+        for name in sorted(merged):
+            metric = merged[name]
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['kind']}")
+            for key, value in sorted(metric["values"].items()):
+                labels = list(zip(metric["labelnames"], key))
+                if metric["kind"] == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(list(metric["buckets"]) + [math.inf], counts):
+                    cumulative += bucket_count
+                    le = labels + [("le", _format_value(bound) if bound != math.inf else "+Inf")]
+                    lines.append(f"{name}_bucket{_format_labels(le)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        gauges: Dict[str, List[Tuple[str, float]]] = {}
+        for snapshot in snapshots:
+            if self.directory and not _alive(snapshot["pid"]):
+                continue
+            for name, value in snapshot["gauges"].items():
+                gauges.setdefault(name, []).append((str(snapshot["pid"]), value))
+        for name in sorted(gauges):
+            lines.append(f"# TYPE {name} gauge")
+            for worker, value in sorted(gauges[name]):
+                lines.append(f"{name}{_format_labels([('worker', worker)])} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+metrics_registry = MetricsRegistry()
+
+http_request_seconds = Histogram(
+    "app_http_request_duration_seconds",
+    "Time to build each response, by route",
+    ["method", "route", "status"],
+)
+stage_seconds = Histogram("app_stage_duration_seconds", "Time spent in each stage of handling a request", ["stage"])
+upstream_requests = Counter("app_upstream_requests_total", "Calls made to upstream services", ["service", "outcome"])
+upstream_bytes = Counter("app_upstream_bytes_total", "Response bytes read from ClinicalTrials.gov and text bytes sent for translation", ["service"])
+cache_requests = Counter("app_cache_requests_total", "Cache lookups, by cache and result", ["cache", "result"])
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Times the block, or the decorated function, into app_stage_duration_seconds."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_seconds.observe(time.perf_counter() - started, stage=stage)
+
+
+def count_cache(cache: str, hits: int, misses: int):
+    if hits:
+        cache_requests.inc(hits, cache=cache, result="hit")
+    if misses:
+        cache_requests.inc(misses, cache=cache, result="miss")
+
+
+def init_metrics(app: Flask):
+    """Times every request and keeps this worker's metrics file current."""
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop("request_started", None)
+        if started is not None:
+            # the rule, not the path, so ids in urls don't explode the label set
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            http_request_seconds.observe(
+                time.perf_counter() - started, method=request.method, route=route, status=response.status_code
+            )
+        metrics_registry.flush()
+        return response
+
+
+def _reset_after_fork():
+    # values recorded before the fork already belong to the parent's file
+    metrics_registry.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
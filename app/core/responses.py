@@ -0,0 +1,81 @@
+import gzip
+import hashlib
+from typing import Any, Dict, Optional
+import orjson
+from flask import Response, request
+from app.core.config import Config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _compress(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=Config.RESPONSE_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=Config.RESPONSE_GZIP_LEVEL, mtime=0)
+
+
+class EncodedBody:
+    """A JSON response body encoded once, with its ETag and compressed forms made on demand."""
+
+    __slots__ = ("body", "digest", "_compressed")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self._compressed: Dict[str, bytes] = {}
+
+    @classmethod
+    def from_data(cls, data: Any) -> "EncodedBody":
+        return cls(orjson.dumps(data))
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    def encoded(self, encoding: Optional[str] = None) -> bytes:
+        if not encoding:
+            return self.body
+        compressed = self._compressed.get(encoding)
+        if compressed is None:
+            # two threads may race to fill this; both produce the same bytes
+            compressed = self._compressed[encoding] = _compress(encoding, self.body)
+        return compressed
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True if an If-None-Match header names any representation of this body."""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return True
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag.strip('"').split("-", 1)[0] == self.digest:
+                return True
+        return False
+
+
+def choose_encoding(body: EncodedBody) -> Optional[str]:
+    if len(body.body) < Config.RESPONSE_COMPRESS_MIN_SIZE:
+        return None
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def encoded_response(body: EncodedBody, status: int = 200) -> Response:
+    """Serves body compressed as the client allows, or 304 if it already has it."""
+    encoding = choose_encoding(body)
+    headers = {"ETag": body.etag(encoding), "Vary": "Accept-Encoding"}
+    if status == 200 and body.matches(request.headers.get("If-None-Match")):
+        return Response(status=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body.encoded(encoding), status=status, headers=headers, mimetype="application/json")
@@ -0,0 +1,66 @@
+import fcntl
+import logging
+from apscheduler.schedulers.background import BackgroundScheduler
+from app.core.config import Config
+from app.services.mirror import MirrorSync, TrialMirror
+from app.services.pretranslated import PreTranslatedStore
+from app.services.pretranslator import PreTranslator
+from app.services.translate import TranslateService
+
+logger = logging.getLogger(__name__)
+
+_scheduler = None
+
+
+def _exclusive(name: str, job):
+    """Runs job unless another worker on this host already is."""
+    with open(f"{Config.MIRROR_PATH}.{name}.lock", "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            logger.info(f"{name} already running in another worker, skipping")
+            return 0
+        try:
+            return job()
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def run_mirror_sync(full: bool = False) -> int:
+    return _exclusive("sync", lambda: MirrorSync(TrialMirror()).sync(full=full))
+
+
+def run_pretranslate(languages=None, full: bool = False) -> int:
+    def job():
+        pretranslator = PreTranslator(
+            TrialMirror(), TranslateService(store=PreTranslatedStore())
+        )
+        return sum(pretranslator.run(lang, full=full) for lang in languages or Config.PRETRANSLATE_LANGUAGES)
+    return _exclusive("pretranslate", job)
+
+
+def _sync_job(app):
+    try:
+        run_mirror_sync()
+        if Config.PRETRANSLATED_PATH:
+            with app.app_context():
+                run_pretranslate()
+    except Exception as e:
+        logger.error(f"Mirror sync failed: {e}")
+
+
+def start_scheduler(app) -> BackgroundScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = BackgroundScheduler(daemon=True)
+        _scheduler.add_job(
+            _sync_job,
+            "interval",
+            args=[app],
+            minutes=Config.MIRROR_SYNC_INTERVAL_MINUTES,
+            id="mirror_sync",
+            max_instances=1,
+            coalesce=True,
+        )
+        _scheduler.start()
+    return _scheduler
@@ -1,14 +1,162 @@
-from passlib.context import CryptContext
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+from app.core.config import Config
 
-pwd_context = CryptContext(schemes = ['bcrypt'], deprecated = 'auto')
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    # built on first use, in whichever process does the hashing
+    from passlib.context import CryptContext
+    return CryptContext(schemes = ['bcrypt'], deprecated = 'auto', bcrypt__rounds = Config.BCRYPT_ROUNDS)
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+def _timed(fn: Callable, *args) -> Any:
+    # runs in the pool process; the timestamps let the parent split the
+    # latency into time spent queued and time spent hashing
+    started = time.time()
+    result = fn(*args)
+    return result, started, time.time()
+
+
+def _hash(password: str) -> Any:
+    return _timed(get_pwd_context().hash, password)
+
+
+def _verify(password: str, hashed_password: str) -> Any:
+    return _timed(get_pwd_context().verify, password, hashed_password)
+
+
+class _Timing:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.max * 1000,
+        }
+
+
+# bcrypt in pool_size processes; past max_queue waiting calls it raises
+# PasswordHasherBusy rather than tie up a web worker. 0 hashes inline
+class PasswordHasher:
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        self.pool_size = pool_size if pool_size is not None else Config.BCRYPT_POOL_SIZE
+        self.max_queue = max_queue if max_queue is not None else Config.BCRYPT_MAX_QUEUE
+        self.timeout = timeout if timeout is not None else Config.BCRYPT_TIMEOUT
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self.in_flight = 0
+        self.rejected = 0
+        self.queue_wait = _Timing()
+        self.hash_time = _Timing()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # spawned, not forked: the web worker has threads a fork would
+        # copy mid-flight, and a pool inherited through fork is unusable
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.pool_size,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            self._executor_pid = os.getpid()
+            self.in_flight = 0
+        return self._executor
+
+    def _run(self, fn: Callable, *args) -> Any:
+        if self.pool_size <= 0:
+            result, started, finished = fn(*args)
+            with self._lock:
+                self.hash_time.add(finished - started)
+            return result
+
+        with self._lock:
+            executor = self._get_executor()
+            if self.in_flight >= self.pool_size + self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusy("password hashing pool is saturated")
+            self.in_flight += 1
+
+        submitted = time.time()
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            self._done()
+            raise
+        # a hash that timed out keeps its pool process until bcrypt returns,
+        # so it stays counted until then rather than until we stop waiting
+        future.add_done_callback(self._done)
+        try:
+            result, started, finished = future.result(timeout=self.timeout)
+        except TimeoutError as e:
+            future.cancel()
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy("password hashing timed out") from e
+
+        with self._lock:
+            self.queue_wait.add(max(started - submitted, 0.0))
+            self.hash_time.add(finished - started)
+        return result
+
+    def _done(self, future: Optional[Future] = None):
+        with self._lock:
+            self.in_flight -= 1
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._run(_verify, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "in_flight": self.in_flight,
+                "rejected": self.rejected,
+                "queue_wait": self.queue_wait.as_dict(),
+                "hash_time": self.hash_time.as_dict(),
+            }
+
+
+password_hasher = PasswordHasher()
 
 def verify_password(
     plain_password: str,
     hashed_password: str
 ) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
 
 def hash_password(
     password: str
 ) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    return password_hasher.hash(password)
@@ -0,0 +1,22 @@
+import logging
+from pymongo import ASCENDING, IndexModel
+
+logger = logging.getLogger(__name__)
+
+# collection -> the indexes the queries in app/services rely on
+INDEXES = {
+    "users": [
+        # login and register look users up by email; unique also makes
+        # register race-free, a duplicate insert fails instead of succeeding
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+}
+
+
+def ensure_indexes(db):
+    """Creates any missing declared index; existing ones are left as they are."""
+    created = []
+    for collection, indexes in INDEXES.items():
+        created += db[collection].create_indexes(indexes)
+    logger.info(f"Indexes ensured: {', '.join(created)}")
+    return created
@@ -1,7 +1,118 @@
-from pymongo import MongoClient 
+import os
+import threading
+import time
+from pymongo import MongoClient
+from pymongo import monitoring
 from app.core.config import Config
+from app.services import registry
+
+
+# how long requests wait to check a connection out of the pool
+class PoolCheckoutListener(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.failures = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "failures": self.failures,
+                "avg_wait_ms": (self.total_wait / self.checkouts * 1000) if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+    def _record(self, failed=False):
+        started = getattr(self._local, "started", None)
+        if started is None:
+            return
+        self._local.started = None
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            if failed:
+                self.failures += 1
+                return
+            self.checkouts += 1
+            self.total_wait += elapsed
+            self.max_wait = max(self.max_wait, elapsed)
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        self._record()
+
+    def connection_check_out_failed(self, event):
+        self._record(failed=True)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+pool_listener = PoolCheckoutListener()
+
+
+def _create_client():
+    return MongoClient(
+        Config.MONGO_URI,
+        maxPoolSize=Config.MONGO_MAX_POOL_SIZE,
+        minPoolSize=Config.MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=Config.MONGO_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=Config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        connectTimeoutMS=Config.MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        event_listeners=[pool_listener],
+        connect=False,
+    )
+
+
+def get_client():
+    # one per worker process: a MongoClient must never be shared across a fork
+    return registry.get("mongo_client", lambda: _create_client())
+
+
+def close_client():
+    client = registry.discard("mongo_client")
+    if client is not None:
+        client.close()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=pool_listener.reset)
+
+
+def get_pool_stats():
+    return pool_listener.stats()
+
 
 def get_db():
-    client = MongoClient(Config.MONGO_URI)
-    collection = client['sprint-hsl']
-    return collection
\ No newline at end of file
+    return get_client()[Config.MONGO_DB_NAME]
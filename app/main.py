@@ -1,20 +1,106 @@
 import logging
-from flask import Flask, Blueprint, request, jsonify 
+import click
+from flask import Flask, jsonify
+from flask_cors import CORS
 from app.api.endpoints.auth import auth_bp
 from app.api.endpoints.user import user_bp
 from app.api.endpoints.search import search_bp
+from app.api.endpoints.metrics import metrics_bp
+from app.core.config import Config
+from app.core.metrics import init_metrics
 
-from flask_cors import CORS
 
-app = Flask(__name__)
-CORS(app)
-app.register_blueprint(auth_bp, url_prefix = '/auth')
-app.register_blueprint(user_bp, url_prefix = '/user')
-app.register_blueprint(search_bp, url_prefix = '/search')
+def create_app() -> Flask:
+    # heavy libraries load on first use, so workers boot fast; PRELOAD_SERVICES
+    # loads them here instead, for gunicorn --preload to share with the workers
+    app = Flask(__name__)
+    CORS(app)
+    app.register_blueprint(auth_bp, url_prefix = '/auth')
+    app.register_blueprint(user_bp, url_prefix = '/user')
+    app.register_blueprint(search_bp, url_prefix = '/search')
+    if Config.METRICS_ENABLED:
+        init_metrics(app)
+        app.register_blueprint(metrics_bp, url_prefix = '/metrics')
+
+    logging.basicConfig(level=Config.LOG_LEVEL)
+
+    @app.route('/')
+    def index():
+        return jsonify({'message': 'Hello World'})
+
+    register_commands(app)
+
+    if Config.PRELOAD_SERVICES:
+        preload_services()
+
+    if Config.MONGO_ENSURE_INDEXES:
+        from app.db.indexes import ensure_indexes
+        from app.db.mongo_client import get_db
+        try:
+            ensure_indexes(get_db())
+        except Exception as e:
+            app.logger.error(f'Could not ensure MongoDB indexes: {e}')
+
+    if Config.MIRROR_SYNC_ENABLED:
+        from app.core.scheduler import start_scheduler
+        start_scheduler(app)
+
+    return app
+
+
+def preload_services():
+    # importing is what is slow; clients themselves are still built per worker
+    import google.cloud.translate_v2
+    import google.oauth2.service_account
+    from app.core.security import get_pwd_context
+    get_pwd_context()
+
+
+def register_commands(app: Flask):
+    @app.cli.command('mirror-sync')
+    @click.option('--full', is_flag=True, help='Re-ingest every study instead of only recent updates.')
+    def mirror_sync_command(full):
+        """Pulls ClinicalTrials.gov studies into the local mirror."""
+        from app.core.scheduler import run_mirror_sync
+        click.echo(f'{run_mirror_sync(full=full)} studies ingested')
+
+    @app.cli.command('pretranslate')
+    @click.option('--lang', 'languages', multiple=True, help='Target language; defaults to PRETRANSLATE_LANGUAGES.')
+    @click.option('--full', is_flag=True, help='Rescan the whole mirror instead of resuming.')
+    def pretranslate_command(languages, full):
+        """Translates mirrored studies into the pre-translated store."""
+        if not Config.PRETRANSLATED_PATH:
+            raise click.UsageError('PRETRANSLATED_PATH is not set')
+        from app.core.scheduler import run_pretranslate
+        click.echo(f'{run_pretranslate(languages, full=full)} studies translated')
+
+    @app.cli.command('ensure-indexes')
+    def ensure_indexes_command():
+        """Creates the MongoDB indexes the app relies on."""
+        from app.db.indexes import ensure_indexes
+        from app.db.mongo_client import get_db
+        click.echo(f"indexes: {', '.join(ensure_indexes(get_db()))}")
+
+    @app.cli.command('grant-admin')
+    @click.argument('email')
+    @click.option('--revoke', is_flag=True, help='Make the user a regular user again.')
+    def grant_admin_command(email, revoke):
+        """Gives the user with this email the admin role."""
+        from app.db.mongo_client import get_db
+        from app.services.user import UserService
+        try:
+            click.echo(UserService(get_db()).set_role(email, 'user' if revoke else 'admin')['message'])
+        except ValueError as e:
+            raise click.ClickException(str(e))
 
-logging.basicConfig(level=logging.ERROR)
+    @app.cli.command('import-profile')
+    @click.option('--budget-ms', type=float, default=None, help='Defaults to STARTUP_BUDGET_MS.')
+    @click.option('--top', type=int, default=15, help='How many of the slowest modules to list.')
+    def import_profile_command(budget_ms, top):
+        """Times a cold import of the app and fails if it is over budget."""
+        from app.core.import_profile import check_startup
+        if not check_startup(budget_ms=budget_ms, top=top, echo=click.echo):
+            raise SystemExit(1)
 
-@app.route('/')
-def index():
-    return jsonify({'message': 'Hello World'})
 
+app = create_app()
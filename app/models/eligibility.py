@@ -0,0 +1,98 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+_AGE = re.compile(r"(\d+(?:\.\d+)?)\s*(year|month|week|day|hour|minute)?", re.IGNORECASE)
+_UNIT_IN_YEARS = {
+    "year": 1.0,
+    "month": 1 / 12,
+    "week": 7 / 365.25,
+    "day": 1 / 365.25,
+    "hour": 1 / 8766,
+    "minute": 1 / 525960,
+}
+
+_HEADING = re.compile(r"^\s*(?:key\s+)?(inclusion|exclusion)\s+criteria\b[^:\n]*:?\s*$", re.IGNORECASE)
+_BULLET = re.compile(r"^\s*(?:[*\-•]|\d+[.)])\s+(.*)$")
+
+SEXES = ("ALL", "FEMALE", "MALE")
+# what patients type, in the languages the app is used in
+_SEX_ALIASES = {
+    "F": "FEMALE", "FEMALE": "FEMALE", "FEMININO": "FEMALE", "MULHER": "FEMALE",
+    "M": "MALE", "MALE": "MALE", "MASCULINO": "MALE", "HOMEM": "MALE",
+    "ALL": "ALL",
+}
+
+
+def age_in_years(value: Optional[str]) -> Optional[float]:
+    """'18 Years' -> 18.0, '6 Months' -> 0.5; None when missing or unparseable."""
+    if not value:
+        return None
+    match = _AGE.search(value)
+    if not match:
+        return None
+    unit = (match.group(2) or "year").lower()
+    return float(match.group(1)) * _UNIT_IN_YEARS[unit]
+
+
+def normalize_sex(value: Optional[str]) -> Optional[str]:
+    """FEMALE, MALE or ALL; None for anything else."""
+    if not value:
+        return None
+    return _SEX_ALIASES.get(value.strip().upper())
+
+
+def split_criteria(text: Optional[str]) -> Tuple[List[str], List[str]]:
+    """Inclusion and exclusion items of an eligibilityCriteria blob; text before any heading is inclusion."""
+    sections = {"inclusion": [], "exclusion": []}
+    current = sections["inclusion"]
+    continues = False
+    for line in (text or "").splitlines():
+        if not line.strip():
+            continues = False
+            continue
+        heading = _HEADING.match(line)
+        if heading:
+            current = sections[heading.group(1).lower()]
+            continues = False
+            continue
+        bullet = _BULLET.match(line)
+        if bullet:
+            current.append(bullet.group(1).strip())
+            continues = True
+        elif continues and current:
+            current[-1] = f"{current[-1]} {line.strip()}"
+        else:
+            current.append(line.strip())
+            continues = True
+    return sections["inclusion"], sections["exclusion"]
+
+
+@dataclass
+class Eligibility:
+    __slots__ = ("min_age", "max_age", "sex", "criteria")
+
+    min_age: Optional[float]
+    max_age: Optional[float]
+    sex: str
+    # the untranslated criteria text; split only by whoever needs the sections
+    criteria: str
+
+    @classmethod
+    def from_api(cls, eligibility_module: Dict[str, Any]) -> "Eligibility":
+        return cls(
+            min_age=age_in_years(eligibility_module.get("minimumAge")),
+            max_age=age_in_years(eligibility_module.get("maximumAge")),
+            sex=normalize_sex(eligibility_module.get("sex")) or "ALL",
+            criteria=eligibility_module.get("eligibilityCriteria") or "",
+        )
+
+    def sections(self) -> Tuple[List[str], List[str]]:
+        return split_criteria(self.criteria)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Eligibility":
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+from app.models.eligibility import Eligibility
+
+
+@dataclass
+class Location:
+    __slots__ = ("facility", "city", "state", "country", "status")
+
+    facility: str
+    city: str
+    state: str
+    country: str
+    status: str
+
+    @classmethod
+    def from_api(cls, loc: Dict[str, Any]) -> "Location":
+        return cls(
+            facility=loc.get("facility", "N/A"),
+            city=loc.get("city", "N/A"),
+            state=loc.get("state", "N/A"),
+            country=loc.get("country", "N/A"),
+            status=loc.get("status", "N/A"),
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Location":
+        return cls(data["Facility"], data["City"], data["State"], data["Country"], data["Status"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "Facility": self.facility,
+            "City": self.city,
+            "State": self.state,
+            "Country": self.country,
+            "Status": self.status,
+        }
+
+
+@dataclass
+class Study:
+    __slots__ = (
+        "nct_id", "title", "description", "interventions", "sponsor", "keywords",
+        "contacts", "locations", "conditions", "restrictions", "has_results", "eligibility",
+    )
+
+    nct_id: str
+    title: str
+    description: str
+    interventions: List[str]
+    sponsor: str
+    keywords: List[str]
+    contacts: List[Any]
+    locations: List[Location]
+    conditions: List[str]
+    restrictions: str
+    has_results: bool
+    # parsed once from the source; not part of the response, so whoever
+    # stores studies as dicts keeps it alongside and passes it to from_dict
+    eligibility: Optional[Eligibility]
+
+    # the only fields that get translated; contacts and locations never are
+    TEXT_FIELDS = ("title", "description", "sponsor", "restrictions")
+    TEXT_LIST_FIELDS = ("interventions", "keywords", "conditions")
+
+    @classmethod
+    def from_api(cls, study: Dict[str, Any]) -> "Study":
+        protocol_section = study.get("protocolSection", {})
+        identification_module = protocol_section.get("identificationModule", {})
+        description_module = protocol_section.get("descriptionModule", {})
+        arms_interventions_module = protocol_section.get("armsInterventionsModule", {})
+        sponsors_collaborators_module = protocol_section.get("sponsorsCollaboratorsModule", {})
+        contacts_locations_module = protocol_section.get("contactsLocationsModule", {})
+        conditions_module = protocol_section.get("conditionsModule", {})
+        eligibility_module = protocol_section.get("eligibilityModule", {})
+
+        brief_summary = description_module.get("briefSummary", "")
+        detailed_description = description_module.get("detailedDescription", "")
+        interventions = arms_interventions_module.get("interventions", [])
+
+        return cls(
+            nct_id=identification_module.get("nctId", "N/A"),
+            title=identification_module.get("briefTitle") or identification_module.get("officialTitle") or "N/A",
+            description="\n\n".join(filter(None, [brief_summary, detailed_description])).strip() or "N/A",
+            interventions=[interv.get("name", "N/A") for interv in interventions] or ["N/A"],
+            sponsor=sponsors_collaborators_module.get("leadSponsor", {}).get("name", "N/A"),
+            keywords=conditions_module.get("keywords", []) or ["N/A"],
+            contacts=contacts_locations_module.get("centralContacts", []) or ["N/A"],
+            locations=[Location.from_api(loc) for loc in contacts_locations_module.get("locations", [])],
+            conditions=conditions_module.get("conditions", []) or ["N/A"],
+            restrictions=eligibility_module.get("eligibilityCriteria", "N/A").strip(),
+            has_results=study.get("hasResults", False),
+            eligibility=Eligibility.from_api(eligibility_module),
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], eligibility: Optional[Dict[str, Any]] = None) -> "Study":
+        return cls(
+            nct_id=data.get("NCT ID", "N/A"),
+            title=data["Title"],
+            description=data["Description"],
+            interventions=data["Intervention"],
+            sponsor=data["Sponsor"],
+            keywords=data["Keywords"],
+            contacts=data["Contacts"],
+            locations=[Location.from_dict(loc) for loc in data["Location"] if isinstance(loc, dict)],
+            conditions=data["Conditions"],
+            restrictions=data["Restrictions"],
+            has_results=data["Has Results Published"],
+            eligibility=Eligibility.from_dict(eligibility) if eligibility else None,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "NCT ID": self.nct_id,
+            "Title": self.title,
+            "Description": self.description,
+            "Intervention": self.interventions,
+            "Sponsor": self.sponsor,
+            "Keywords": self.keywords,
+            "Contacts": self.contacts,
+            "Location": [loc.to_dict() for loc in self.locations] or ["N/A"],
+            "Conditions": self.conditions,
+            "Restrictions": self.restrictions,
+            "Has Results Published": self.has_results,
+        }
+
+    def texts(self) -> Iterator[str]:
+        for name in self.TEXT_FIELDS:
+            value = getattr(self, name)
+            if value.strip():
+                yield value
+        for name in self.TEXT_LIST_FIELDS:
+            for value in getattr(self, name):
+                if value.strip():
+                    yield value
+
+    def text_fields(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.TEXT_FIELDS + self.TEXT_LIST_FIELDS}
+
+    def set_text_fields(self, fields: Dict[str, Any]):
+        for name in self.TEXT_FIELDS + self.TEXT_LIST_FIELDS:
+            if name in fields:
+                setattr(self, name, fields[name])
+
+    def apply_translations(self, translations: Dict[str, str]):
+        for name in self.TEXT_FIELDS:
+            value = getattr(self, name)
+            setattr(self, name, translations.get(value, value))
+        for name in self.TEXT_LIST_FIELDS:
+            setattr(self, name, [translations.get(value, value) for value in getattr(self, name)])
+
+
+def serialize_studies(studies: List[Study]) -> List[Dict[str, Any]]:
+    return [study.to_dict() for study in studies]
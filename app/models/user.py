@@ -8,6 +8,7 @@ class UserModel(BaseModel):
     username: str
     email: str
     hashed_password: str
+    role: str = "user"
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     @classmethod 
@@ -1,6 +1,15 @@
 from pydantic import BaseModel, EmailStr, Field 
-from typing import Optional 
+from typing import List, Optional 
 
 class UpdateUser(BaseModel):
     username: Optional[str] = Field(None, min_length=3)
-    email: Optional[str] = None 
\ No newline at end of file
+    email: Optional[str] = None
+
+class UserIds(BaseModel):
+    ids: List[str] = Field(..., min_length=1)
+
+class BatchUpdateItem(UpdateUser):
+    id: str
+
+class BatchUpdateUsers(BaseModel):
+    updates: List[BatchUpdateItem] = Field(..., min_length=1)
@@ -1,40 +1,70 @@
 from datetime import datetime, timedelta
-import os
+import hashlib
+import time
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import DuplicateKeyError
+from app.core.config import Config
+from app.core.metrics import cache_requests, span
 from app.models.user import UserModel
 from app.schemas.auth import UserCreateSchema, UserLoginSchema
 from app.core.security import hash_password, verify_password
+from app.services.cache import MemoryCache
 from jose import jwt, JWTError
-from dotenv import load_dotenv
 
-load_dotenv()
+# sha256(secret, token) -> verified claims, so a token is decoded once per
+# worker rather than on every request
+token_cache = MemoryCache(max_size=Config.AUTH_TOKEN_CACHE_SIZE, ttl=Config.AUTH_TOKEN_CACHE_TTL)
+# user id -> user document without the password hash
+user_cache = MemoryCache(max_size=Config.AUTH_USER_CACHE_SIZE)
+
+
+def invalidate_user(user_id: str):
+    user_cache.delete(str(user_id))
 
 class AuthService:
     def __init__(self, db):
         self.db = db
         self.ACCESS_TOKEN_EXPIRE_DAYS = 7
-        self.SECRET_KEY = os.getenv("SECRET_KEY")
+        self.SECRET_KEY = Config.SECRET_KEY
 
     def register(self, user_data: dict):
-        existing_user = self.db.users.find_one({"email": user_data["email"]})
+        # checked before hashing so duplicate signups don't take a bcrypt slot
+        with span("auth.find_user"):
+            existing_user = self.db.users.find_one({"email": user_data["email"]}, {"_id": 1})
         if existing_user:
             raise ValueError("User with this email already exists")
 
-        hashed_password = hash_password(user_data["password"])
+        with span("auth.hash_password"):
+            hashed_password = hash_password(user_data["password"])
         user = UserModel(
             username=user_data["username"],
             email=user_data["email"],
             hashed_password=hashed_password,
         )
 
-        result = self.db.users.insert_one(user.model_dump())
-        return {"user_id": str(result.inserted_id)}
+        # an upsert keyed on the email, so two concurrent signups can't both
+        # insert even where the unique email index hasn't been created
+        try:
+            with span("auth.insert_user"):
+                result = self.db.users.update_one(
+                    {"email": user.email}, {"$setOnInsert": user.model_dump()}, upsert=True
+                )
+        except DuplicateKeyError as e:
+            raise ValueError("User with this email already exists") from e
+        if result.upserted_id is None:
+            raise ValueError("User with this email already exists")
+        return {"user_id": str(result.upserted_id)}
 
     def login(self, user_data: dict):
-        user = self.db.users.find_one({"email": user_data["email"]})
+        with span("auth.find_user"):
+            user = self.db.users.find_one({"email": user_data["email"]}, {"hashed_password": 1})
         if not user:
             raise ValueError("User not found")
 
-        if not verify_password(user_data['password'], user["hashed_password"]):
+        with span("auth.verify_password"):
+            valid = verify_password(user_data['password'], user["hashed_password"])
+        if not valid:
             raise ValueError("Invalid password")
 
         access_token = self._create_token(
@@ -50,12 +80,43 @@ class AuthService:
         to_encode.update({"exp": expire})
         return jwt.encode(to_encode, self.SECRET_KEY, algorithm="HS256")
 
-    def verify_token(self, token: str):
+    def verify_claims(self, token: str) -> dict:
+        # failed verifications are never cached
+        key = hashlib.sha256(f"{self.SECRET_KEY}\0{token}".encode("utf-8")).hexdigest()
+        now = time.time()
+        claims = token_cache.get(key)
+        if claims is not None and claims["exp"] > now:
+            cache_requests.inc(cache="auth_token", result="hit")
+            return claims
+        cache_requests.inc(cache="auth_token", result="miss")
+
         try:
-            payload = jwt.decode(token, self.SECRET_KEY, algorithms=["HS256"])
-            user_id = payload.get("sub")
-            if user_id is None:
-                raise ValueError("Invalid token")
-            return user_id
+            with span("auth.decode_token"):
+                claims = jwt.decode(token, self.SECRET_KEY, algorithms=["HS256"])
         except JWTError as e:
             raise ValueError("Invalid token") from e
+        if claims.get("sub") is None:
+            raise ValueError("Invalid token")
+
+        if "exp" in claims:
+            token_cache.set(key, claims, ttl=min(claims["exp"] - now, Config.AUTH_TOKEN_CACHE_TTL))
+        return claims
+
+    def verify_token(self, token: str):
+        return self.verify_claims(token)["sub"]
+
+    def get_user(self, user_id: str):
+        if Config.AUTH_USER_CACHE_TTL > 0:
+            user = user_cache.get(user_id)
+            cache_requests.inc(cache="auth_user", result="miss" if user is None else "hit")
+            if user is not None:
+                return user
+
+        try:
+            with span("auth.get_user"):
+                user = self.db.users.find_one({"_id": ObjectId(user_id)}, {"hashed_password": 0})
+        except InvalidId:
+            return None
+        if user is not None and Config.AUTH_USER_CACHE_TTL > 0:
+            user_cache.set(user_id, user, ttl=Config.AUTH_USER_CACHE_TTL)
+        return user
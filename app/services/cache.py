@@ -0,0 +1,170 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, Optional
+from app.core.config import Config
+
+
+def connect_sqlite(path: str) -> sqlite3.Connection:
+    """Opens a connection suited to several processes sharing one file."""
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SQLiteConnections:
+    """Per-thread connections to one SQLite file, reopened after a fork."""
+
+    def __init__(
+        self,
+        path: str,
+        schema: Iterable[str] = (),
+        setup: Optional[Callable[[sqlite3.Connection], None]] = None
+    ):
+        self.path = path
+        self.schema = tuple(schema)
+        self.setup = setup
+        self._local = threading.local()
+
+    def __call__(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = connect_sqlite(self.path)
+        for statement in self.schema:
+            conn.execute(statement)
+        if self.setup is not None:
+            self.setup(conn)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+
+class CacheBackend:
+    """Key/value store with a TTL per entry and LRU eviction past max_size."""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """In-process cache, private to the worker that owns it."""
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class SQLiteCache(CacheBackend):
+    """Cache of JSON values in a local SQLite file, shared by every worker on the host."""
+
+    def __init__(self, name: str, path: Optional[str] = None, max_size: int = 1024, ttl: Optional[float] = None):
+        self.name = name
+        self.path = path or Config.CACHE_SQLITE_PATH
+        self.max_size = max_size
+        self.ttl = ttl
+        self._connection = SQLiteConnections(self.path, (
+            f"CREATE TABLE IF NOT EXISTS {self.name} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)",
+            f"CREATE INDEX IF NOT EXISTS {self.name}_accessed ON {self.name} (accessed_at)",
+        ))
+
+    def get(self, key):
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            f"SELECT value, expires_at FROM {self.name} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= now:
+            conn.execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+            return None
+        conn.execute(f"UPDATE {self.name} SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        conn = self._connection()
+        conn.execute(
+            f"INSERT OR REPLACE INTO {self.name} (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), expires_at, now),
+        )
+        conn.execute(
+            f"DELETE FROM {self.name} WHERE key IN "
+            f"(SELECT key FROM {self.name} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_size,),
+        )
+
+    def delete(self, key):
+        self._connection().execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+
+    def clear(self):
+        self._connection().execute(f"DELETE FROM {self.name}")
+
+    def __len__(self):
+        return self._connection().execute(f"SELECT COUNT(*) FROM {self.name}").fetchone()[0]
+
+
+def create_cache(name: str, max_size: int, ttl: Optional[float] = None, backend: Optional[str] = None) -> CacheBackend:
+    backend = backend or Config.CACHE_BACKEND
+    if backend == "memory":
+        return MemoryCache(max_size=max_size, ttl=ttl)
+    if backend == "sqlite":
+        return SQLiteCache(name, max_size=max_size, ttl=ttl)
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -0,0 +1,131 @@
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from app.core.config import Config
+from app.core.metrics import upstream_requests
+from app.services import registry
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def get_session(pool_maxsize: Optional[int] = None) -> requests.Session:
+    # one keep-alive session per worker process
+    return registry.get("ctgov_session", lambda: _create_session(pool_maxsize or Config.CTGOV_POOL_MAXSIZE))
+
+
+def _create_session(pool_maxsize: int) -> requests.Session:
+    session = requests.Session()
+    # retries are handled by the client so they can be measured and jittered
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept": "application/json"})
+    return session
+
+
+class ClientStats:
+    """Per-process counters for calls made to ClinicalTrials.gov."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.retries = 0
+            self.errors = 0
+            self.total_latency = 0.0
+            self.max_latency = 0.0
+            self.last_latency = 0.0
+
+    def record(self, latency: float, retries: int, failed: bool):
+        with self._lock:
+            self.requests += 1
+            self.retries += retries
+            if failed:
+                self.errors += 1
+            self.total_latency += latency
+            self.last_latency = latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "errors": self.errors,
+                "avg_latency_ms": (self.total_latency / self.requests * 1000) if self.requests else 0.0,
+                "max_latency_ms": self.max_latency * 1000,
+                "last_latency_ms": self.last_latency * 1000,
+            }
+
+
+client_stats = ClientStats()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=client_stats.reset)
+
+
+class ClinicalTrialsClient:
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_factor: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        session: Optional[requests.Session] = None,
+    ):
+        self.base_url = base_url or Config.CTGOV_BASE_URL
+        self.timeout = (
+            connect_timeout if connect_timeout is not None else Config.CTGOV_CONNECT_TIMEOUT,
+            read_timeout if read_timeout is not None else Config.CTGOV_READ_TIMEOUT,
+        )
+        self.max_retries = max_retries if max_retries is not None else Config.CTGOV_MAX_RETRIES
+        self.backoff_factor = backoff_factor if backoff_factor is not None else Config.CTGOV_BACKOFF_FACTOR
+        self.backoff_max = backoff_max if backoff_max is not None else Config.CTGOV_BACKOFF_MAX
+        self._session = session
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session or get_session()
+
+    def backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        if response is not None and response.status_code == 429:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        # full jitter, so workers retrying together don't hit the api in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+
+    def get_studies(self, params: Dict[str, Any], stream: bool = False) -> requests.Response:
+        started = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                response = None
+                try:
+                    response = self.session.get(self.base_url, params=params, timeout=self.timeout, stream=stream)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    if attempt >= self.max_retries:
+                        raise
+                    time.sleep(self.backoff(attempt))
+                    attempt += 1
+                    continue
+
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+
+                delay = self.backoff(attempt, response)
+                response.close()
+                time.sleep(delay)
+                attempt += 1
+        finally:
+            failed = response is None or response.status_code != 200
+            client_stats.record(time.perf_counter() - started, attempt, failed)
+            upstream_requests.inc(service="clinicaltrials", outcome="error" if failed else "ok")
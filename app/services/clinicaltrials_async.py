@@ -0,0 +1,62 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+import httpx
+from app.core.config import Config
+from app.core.metrics import upstream_bytes, upstream_requests
+from app.services.clinicaltrials import ClinicalTrialsClient, RETRY_STATUSES, client_stats
+
+
+class AsyncClinicalTrialsClient(ClinicalTrialsClient):
+    """asyncio counterpart of ClinicalTrialsClient, with an httpx client per event loop."""
+
+    def __init__(self, *args, http_client: Optional[httpx.AsyncClient] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._http_client = http_client
+        self._http_loop = None
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._http_client is None or (self._http_loop is not None and self._http_loop is not loop):
+            connect_timeout, read_timeout = self.timeout
+            self._http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_connections=Config.CTGOV_POOL_MAXSIZE),
+                headers={"Accept": "application/json"},
+            )
+            self._http_loop = loop
+        return self._http_client
+
+    async def aclose(self):
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+            self._http_loop = None
+
+    async def get_studies(self, params: Dict[str, Any]) -> httpx.Response:
+        started = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                response = None
+                try:
+                    response = await self.http_client.get(self.base_url, params=params)
+                except (httpx.ConnectError, httpx.TimeoutException):
+                    if attempt >= self.max_retries:
+                        raise
+                    await asyncio.sleep(self.backoff(attempt))
+                    attempt += 1
+                    continue
+
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+
+                await asyncio.sleep(self.backoff(attempt, response))
+                attempt += 1
+        finally:
+            failed = response is None or response.status_code != 200
+            client_stats.record(time.perf_counter() - started, attempt, failed)
+            upstream_requests.inc(service="clinicaltrials", outcome="error" if failed else "ok")
+            if response is not None:
+                upstream_bytes.inc(len(response.content), service="clinicaltrials")
@@ -0,0 +1,19 @@
+from typing import List, Optional
+from app.models.eligibility import Eligibility
+from app.models.study import Study
+
+
+def matches(eligibility: Optional[Eligibility], age: Optional[float] = None, sex: Optional[str] = None) -> bool:
+    """True if a patient of age (in years) and sex may enroll; unknown limits don't exclude."""
+    if eligibility is None:
+        return True
+    if age is not None:
+        if eligibility.min_age is not None and age < eligibility.min_age:
+            return False
+        if eligibility.max_age is not None and age > eligibility.max_age:
+            return False
+    return not sex or sex == "ALL" or eligibility.sex in ("ALL", sex)
+
+
+def filter_eligible(studies: List[Study], age: Optional[float] = None, sex: Optional[str] = None) -> List[Study]:
+    return [study for study in studies if matches(study.eligibility, age, sex)]
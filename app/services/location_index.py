@@ -0,0 +1,126 @@
+import unicodedata
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from app.models.study import Location, Study
+
+
+def normalize(text: Optional[str]) -> str:
+    """Case- and accent-insensitive form of a place name or status."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().replace("_", " ").split())
+
+
+_US_STATES = {
+    "al": "alabama", "ak": "alaska", "az": "arizona", "ar": "arkansas", "ca": "california",
+    "co": "colorado", "ct": "connecticut", "de": "delaware", "dc": "district of columbia",
+    "fl": "florida", "ga": "georgia", "hi": "hawaii", "id": "idaho", "il": "illinois",
+    "in": "indiana", "ia": "iowa", "ks": "kansas", "ky": "kentucky", "la": "louisiana",
+    "me": "maine", "md": "maryland", "ma": "massachusetts", "mi": "michigan", "mn": "minnesota",
+    "ms": "mississippi", "mo": "missouri", "mt": "montana", "ne": "nebraska", "nv": "nevada",
+    "nh": "new hampshire", "nj": "new jersey", "nm": "new mexico", "ny": "new york",
+    "nc": "north carolina", "nd": "north dakota", "oh": "ohio", "ok": "oklahoma", "or": "oregon",
+    "pa": "pennsylvania", "ri": "rhode island", "sc": "south carolina", "sd": "south dakota",
+    "tn": "tennessee", "tx": "texas", "ut": "utah", "vt": "vermont", "va": "virginia",
+    "wa": "washington", "wv": "west virginia", "wi": "wisconsin", "wy": "wyoming",
+    "pr": "puerto rico",
+}
+
+_BR_STATES = {
+    "ac": "acre", "al": "alagoas", "ap": "amapa", "am": "amazonas", "ba": "bahia", "ce": "ceara",
+    "df": "distrito federal", "es": "espirito santo", "go": "goias", "ma": "maranhao",
+    "mt": "mato grosso", "ms": "mato grosso do sul", "mg": "minas gerais", "pa": "para",
+    "pb": "paraiba", "pr": "parana", "pe": "pernambuco", "pi": "piaui", "rj": "rio de janeiro",
+    "rn": "rio grande do norte", "rs": "rio grande do sul", "ro": "rondonia", "rr": "roraima",
+    "sc": "santa catarina", "sp": "sao paulo", "se": "sergipe", "to": "tocantins",
+}
+
+# how patients write a country, mapped to the name ClinicalTrials.gov uses
+_COUNTRIES = {
+    "brasil": "brazil", "br": "brazil",
+    "usa": "united states", "us": "united states", "eua": "united states",
+    "estados unidos": "united states", "united states of america": "united states",
+    "uk": "united kingdom", "reino unido": "united kingdom", "inglaterra": "united kingdom",
+    "alemanha": "germany", "franca": "france", "espanha": "spain", "italia": "italy",
+    "japao": "japan",
+    "holanda": "netherlands", "paises baixos": "netherlands", "suica": "switzerland",
+    "belgica": "belgium", "africa do sul": "south africa", "coreia do sul": "korea, republic of",
+    "south korea": "korea, republic of", "russia": "russian federation",
+}
+
+
+def _build_aliases() -> Dict[str, FrozenSet[str]]:
+    aliases: Dict[str, set] = {}
+    for table in (_US_STATES, _BR_STATES, _COUNTRIES):
+        for alias, name in table.items():
+            aliases.setdefault(alias, {alias}).add(name)
+            aliases.setdefault(name, {name}).add(alias)
+    return {name: frozenset(names) for name, names in aliases.items()}
+
+
+_ALIASES = _build_aliases()
+
+
+def region_names(region: str) -> FrozenSet[str]:
+    """A normalized state or country together with its abbreviations and aliases."""
+    return _ALIASES.get(region, frozenset((region,)))
+
+
+def parse_location_query(location: str) -> Tuple[str, List[str]]:
+    """Splits "city, state, country" into the city and the remaining parts."""
+    parts = [normalize(part) for part in location.split(",")]
+    parts = [part for part in parts if part]
+    if not parts:
+        return "", []
+    return parts[0], parts[1:]
+
+
+class LocationIndex:
+    """Normalized (city, regions, status) entries for a page of studies, built in one pass."""
+
+    def __init__(self, studies: Iterable[Study]):
+        self.entries: List[Tuple[Study, List[Tuple[str, FrozenSet[str], str, Location]]]] = []
+        for study in studies:
+            self.entries.append((study, [
+                (normalize(loc.city), self._regions(loc), normalize(loc.status), loc)
+                for loc in study.locations
+            ]))
+
+    @staticmethod
+    def _regions(loc: Location) -> FrozenSet[str]:
+        return region_names(normalize(loc.state)) | region_names(normalize(loc.country))
+
+    @staticmethod
+    def _in_region(region: str, site_regions: FrozenSet[str]) -> bool:
+        if region_names(region) & site_regions:
+            return True
+        # a partial name ("rio grande") still matches, but a short code only matches exactly
+        return len(region) > 3 and any(region in name for name in site_regions)
+
+    def filter(self, location: str, statuses: Optional[Iterable[str]] = None) -> List[Study]:
+        """Studies with a site matching location and one of statuses, keeping only those sites."""
+        city, regions = parse_location_query(location)
+        wanted_statuses = {normalize(status) for status in statuses or []}
+
+        candidates = []
+        in_region_found = False
+        for study, entries in self.entries:
+            matches = [
+                (all(self._in_region(region, loc_regions) for region in regions), loc)
+                for loc_city, loc_regions, loc_status, loc in entries
+                if city in loc_city and (not wanted_statuses or loc_status in wanted_statuses)
+            ]
+            if matches:
+                candidates.append((study, matches))
+                in_region_found = in_region_found or any(in_region for in_region, _ in matches)
+
+        # a region nobody on the page is in was likely written in a way we
+        # don't recognise, so it never hides the city matches
+        filtered_studies = []
+        for study, matches in candidates:
+            locations = [loc for in_region, loc in matches if in_region or not in_region_found]
+            if locations:
+                study.locations = locations
+                filtered_studies.append(study)
+        return filtered_studies
@@ -0,0 +1,288 @@
+import json
+import logging
+import math
+import re
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.core.config import Config
+from app.models.study import Study
+from app.schemas.search import PacienteSearch
+from app.services.cache import SQLiteConnections
+from app.services.clinicaltrials import ClinicalTrialsClient
+from app.models.eligibility import age_in_years, normalize_sex
+from app.services.study_parser import STUDY_FIELDS, project, read_studies
+
+logger = logging.getLogger(__name__)
+
+# on top of what filter_studies needs, the mirror keeps what it filters on
+MIRROR_FIELDS = STUDY_FIELDS + [
+    "protocolSection.statusModule.overallStatus",
+    "protocolSection.statusModule.lastUpdatePostDateStruct",
+]
+_MIRROR_PATHS = [tuple(field.split(".")) for field in MIRROR_FIELDS]
+
+# PacienteSearch alias -> full text column it is matched against
+FTS_COLUMNS = {
+    "query.term": "term",
+    "query.cond": "cond",
+    "query.locn": "locn",
+    "query.intr": "intr",
+    "query.lead": "lead",
+}
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS studies (
+        id INTEGER PRIMARY KEY,
+        nct_id TEXT NOT NULL,
+        last_update TEXT,
+        overall_status TEXT,
+        sex TEXT,
+        min_age REAL,
+        max_age REAL,
+        data TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS studies_status ON studies (overall_status, last_update)",
+    "CREATE INDEX IF NOT EXISTS studies_last_update ON studies (last_update)",
+    # open age limits are stored as 0 and infinity, so an age is two range
+    # conditions on this index rather than IS NULL checks it can't use
+    "CREATE INDEX IF NOT EXISTS studies_eligibility ON studies (sex, min_age, max_age)",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS studies_fts USING fts5(
+        term, cond, locn, intr, lead,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    "CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)",
+]
+
+# mirrors written before the eligibility index kept open age limits as NULL
+MIGRATIONS = [
+    [
+        "UPDATE studies SET min_age = 0 WHERE min_age IS NULL",
+        "UPDATE studies SET max_age = 9e999 WHERE max_age IS NULL",
+    ],
+]
+
+
+def fts_match(column: str, text: str) -> Optional[str]:
+    # every word quoted, so user input can never be read as FTS syntax
+    words = _WORD.findall(text)
+    if not words:
+        return None
+    return "{%s} : (%s)" % (column, " ".join(f'"{word}"' for word in words))
+
+
+def _row(raw: Dict[str, Any]) -> Optional[tuple]:
+    protocol_section = raw.get("protocolSection", {})
+    nct_id = protocol_section.get("identificationModule", {}).get("nctId", "")
+    if not nct_id.startswith("NCT") or not nct_id[3:].isdigit():
+        return None
+
+    status_module = protocol_section.get("statusModule", {})
+    data = project(raw, _MIRROR_PATHS)
+    study = Study.from_api(data)
+    locations = " ".join(
+        f"{loc.facility} {loc.city} {loc.state} {loc.country}" for loc in study.locations
+    )
+    conditions = " ".join(study.conditions + study.keywords)
+
+    return (
+        int(nct_id[3:]),
+        nct_id,
+        status_module.get("lastUpdatePostDateStruct", {}).get("date") or "",
+        status_module.get("overallStatus"),
+        study.eligibility.sex,
+        study.eligibility.min_age if study.eligibility.min_age is not None else 0.0,
+        study.eligibility.max_age if study.eligibility.max_age is not None else math.inf,
+        json.dumps(data, separators=(",", ":")),
+        " ".join([study.title, study.description, conditions] + study.interventions),
+        conditions,
+        locations,
+        " ".join(study.interventions),
+        study.sponsor,
+    )
+
+
+class TrialMirror:
+    """Local SQLite/FTS5 copy of ClinicalTrials.gov studies, searchable without upstream."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.MIRROR_PATH
+        self._connection = SQLiteConnections(self.path, SCHEMA, setup=self._migrate)
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+            conn.execute("BEGIN IMMEDIATE")
+            # another worker may have migrated while this one waited for the lock
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= number:
+                conn.execute("COMMIT")
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.execute("COMMIT")
+
+    def get_state(self, key: str) -> Optional[str]:
+        row = self._connection().execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: str):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM studies").fetchone()[0]
+
+    def ingest(self, studies: Iterable[Dict[str, Any]]) -> Optional[str]:
+        """Upserts raw API studies; returns the newest last update date seen."""
+        rows = [row for row in (_row(raw) for raw in studies) if row is not None]
+        if not rows:
+            return None
+
+        conn = self._connection()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO studies "
+                "(id, nct_id, last_update, overall_status, sex, min_age, max_age, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [row[:8] for row in rows],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO studies_fts (rowid, term, cond, locn, intr, lead) VALUES (?, ?, ?, ?, ?, ?)",
+                [(row[0],) + row[8:] for row in rows],
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+
+        return max((row[2] for row in rows if row[2]), default=None)
+
+    def search(self, search_data: PacienteSearch, page_size: int = 3, page: int = 1) -> Optional[List[Study]]:
+        """Answers a search locally; None means the caller should go upstream."""
+        data_dict = search_data.dict(exclude_none=True, by_alias=True)
+        # upstream page tokens mean nothing to the mirror
+        if data_dict.get("pageToken"):
+            return None
+
+        matches = []
+        for alias, column in FTS_COLUMNS.items():
+            if data_dict.get(alias):
+                expression = fts_match(column, data_dict[alias])
+                if expression:
+                    matches.append(expression)
+
+        where = []
+        args: List[Any] = []
+        if matches:
+            where.append("studies_fts MATCH ?")
+            args.append(" AND ".join(matches))
+        if data_dict.get("filter.overallStatus"):
+            statuses = data_dict["filter.overallStatus"]
+            where.append(f"s.overall_status IN ({','.join('?' * len(statuses))})")
+            args.extend(statuses)
+        age = age_in_years(data_dict.get("age"))
+        sex = normalize_sex(data_dict.get("eligibilityModule.sex"))
+        if sex and sex != "ALL":
+            where.append("s.sex IN ('ALL', ?)")
+            args.append(sex)
+        elif age is not None:
+            # every sex, spelled out so the age range can still use the index
+            where.append("s.sex IN ('ALL', 'FEMALE', 'MALE')")
+        if age is not None:
+            where.append("s.min_age <= ? AND s.max_age >= ?")
+            args.extend([age, age])
+
+        if matches:
+            sql = "SELECT s.id FROM studies_fts JOIN studies s ON s.id = studies_fts.rowid"
+            order = "ORDER BY studies_fts.rank"
+        else:
+            sql = "SELECT s.id FROM studies s"
+            order = "ORDER BY s.last_update DESC"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" {order} LIMIT ? OFFSET ?"
+        args.extend([page_size, (page - 1) * page_size])
+
+        # rank ids first and only then load the page's JSON, so the sort
+        # never has to carry every matching study's data along
+        conn = self._connection()
+        ids = [study_id for study_id, in conn.execute(sql, args)]
+        if not ids:
+            return None
+        data = dict(conn.execute(
+            f"SELECT id, data FROM studies WHERE id IN ({','.join('?' * len(ids))})", ids
+        ))
+        return [Study.from_api(json.loads(data[study_id])) for study_id in ids]
+
+    def studies_after(
+        self,
+        cursor: Optional[Tuple[str, int]] = None,
+        limit: int = 500
+    ) -> List[Tuple[Tuple[str, int], Study]]:
+        """Up to limit studies in (last update, id) order after cursor, each with its own cursor."""
+        last_update, study_id = cursor or ("", -1)
+        rows = self._connection().execute(
+            "SELECT last_update, id, data FROM studies WHERE (last_update, id) > (?, ?) "
+            "ORDER BY last_update, id LIMIT ?",
+            (last_update, study_id, limit),
+        ).fetchall()
+        return [((last_update, study_id), Study.from_api(json.loads(data))) for last_update, study_id, data in rows]
+
+
+class MirrorSync:
+    """Pulls studies updated since the last run into a TrialMirror."""
+
+    def __init__(
+        self,
+        mirror: TrialMirror,
+        client: Optional[ClinicalTrialsClient] = None,
+        page_size: Optional[int] = None
+    ):
+        self.mirror = mirror
+        self.client = client or ClinicalTrialsClient()
+        self.page_size = page_size or Config.MIRROR_SYNC_PAGE_SIZE
+
+    def sync(self, full: bool = False) -> int:
+        since = None if full else self.mirror.get_state("last_update")
+        params = {
+            "format": "json",
+            "pageSize": self.page_size,
+            "fields": ",".join(MIRROR_FIELDS),
+            "sort": "LastUpdatePostDate",
+        }
+        if since:
+            # the boundary day is fetched again; upserts make that harmless
+            params["filter.advanced"] = f"AREA[LastUpdatePostDate]RANGE[{since},MAX]"
+
+        started = time.perf_counter()
+        ingested = 0
+        newest = since
+        while True:
+            response = self.client.get_studies(params, stream=True)
+            response.raise_for_status()
+            page = read_studies(response, MIRROR_FIELDS)
+
+            page_newest = self.mirror.ingest(page["studies"])
+            if page_newest and (newest is None or page_newest > newest):
+                newest = page_newest
+            ingested += len(page["studies"])
+
+            next_page_token = page.get("nextPageToken")
+            if not next_page_token:
+                break
+            params["pageToken"] = next_page_token
+
+        if newest:
+            self.mirror.set_state("last_update", newest)
+        self.mirror.set_state("synced_at", time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+        logger.info(f"Mirror sync ingested {ingested} studies since {since} in {time.perf_counter() - started:.1f}s")
+        return ingested
+
+
+trial_mirror = TrialMirror() if Config.MIRROR_ENABLED else None
@@ -0,0 +1,41 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import Config
+from app.services.cache import CacheBackend, create_cache
+
+
+class PageTokenCache:
+    """Remembers the nextPageToken chain of each query."""
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        # an empty backend is falsy (CacheBackend has __len__)
+        self.backend = backend if backend is not None else create_cache(
+            "page_tokens",
+            max_size=Config.PAGE_TOKEN_CACHE_SIZE,
+            ttl=Config.PAGE_TOKEN_CACHE_TTL,
+        )
+
+    @staticmethod
+    def query_key(params: Dict[str, Any]) -> str:
+        normalized = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+    def get(self, query_key: str, page: int) -> Optional[str]:
+        if page <= 1:
+            return None
+        return self.backend.get(f"{query_key}:{page}")
+
+    def set(self, query_key: str, page: int, token: str):
+        if page > 1 and token:
+            self.backend.set(f"{query_key}:{page}", token)
+
+    def nearest(self, query_key: str, page: int) -> Tuple[int, Optional[str]]:
+        for candidate in range(page, 1, -1):
+            token = self.get(query_key, candidate)
+            if token:
+                return candidate, token
+        return 1, None
+
+
+page_token_cache = PageTokenCache()
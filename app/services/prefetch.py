@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from flask import current_app
+from app.core.config import Config
+
+
+class PagePrefetcher:
+    """Computes the page after the one just served, in the background."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        ttl: Optional[float] = None
+    ):
+        self.max_workers = max_workers or Config.SEARCH_PREFETCH_MAX_WORKERS
+        self.max_in_flight = max_in_flight or Config.SEARCH_PREFETCH_MAX_IN_FLIGHT
+        self.max_pending = max_pending or Config.SEARCH_PREFETCH_MAX_PENDING
+        self.ttl = ttl if ttl is not None else Config.SEARCH_CACHE_TTL
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self._in_flight: Dict[str, Future] = {}
+        # prefetched key -> when it was stored, oldest first
+        self._pending: "OrderedDict[str, float]" = OrderedDict()
+        self.counts = {
+            "scheduled": 0, "completed": 0, "failed": 0, "consumed": 0,
+            "expired": 0, "cancelled": 0, "skipped_busy": 0, "skipped_full": 0,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # a pool inherited through fork has no threads behind it
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="prefetch")
+            self._executor_pid = os.getpid()
+            self._in_flight = {}
+        return self._executor
+
+    def _expire(self, now: float):
+        while self._pending:
+            key, stored_at = next(iter(self._pending.items()))
+            if now - stored_at < self.ttl:
+                break
+            del self._pending[key]
+            self.counts["expired"] += 1
+
+    def _cancel_queued(self):
+        for key, future in list(self._in_flight.items()):
+            if future.cancel():
+                del self._in_flight[key]
+                self.counts["cancelled"] += 1
+
+    def schedule(self, key: str, compute: Callable[[], Any], store: Callable[[str, Any], None]) -> bool:
+        """Queues compute for key unless it is already prefetched, in flight, or over a limit."""
+        app = current_app._get_current_object()
+        with self._lock:
+            self._expire(time.time())
+            if key in self._in_flight or key in self._pending:
+                return False
+            if len(self._pending) >= self.max_pending:
+                self._cancel_queued()
+                self.counts["skipped_full"] += 1
+                return False
+            if len(self._in_flight) >= self.max_in_flight:
+                self.counts["skipped_busy"] += 1
+                return False
+
+            def run():
+                try:
+                    with app.app_context():
+                        result = compute()
+                    store(key, result)
+                except Exception as e:
+                    app.logger.error(f"Prefetch of next search page failed: {e}")
+                    with self._lock:
+                        self.counts["failed"] += 1
+                        self._in_flight.pop(key, None)
+                    return
+                with self._lock:
+                    self.counts["completed"] += 1
+                    self._in_flight.pop(key, None)
+                    self._pending[key] = time.time()
+
+            self._in_flight[key] = self._get_executor().submit(run)
+            self.counts["scheduled"] += 1
+            return True
+
+    def consume(self, key: str) -> bool:
+        """Marks a served key; True if it had been prefetched."""
+        with self._lock:
+            if self._pending.pop(key, None) is None:
+                return False
+            self.counts["consumed"] += 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            finished = self.counts["consumed"] + self.counts["expired"]
+            return dict(
+                self.counts,
+                in_flight=len(self._in_flight),
+                pending=len(self._pending),
+                consumed_rate=self.counts["consumed"] / finished if finished else 0.0,
+            )
+
+
+page_prefetcher = PagePrefetcher() if Config.SEARCH_PREFETCH_ENABLED else None
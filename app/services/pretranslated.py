@@ -0,0 +1,104 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+from app.core.config import Config
+from app.models.study import Study
+from app.services.cache import SQLiteConnections
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS pretranslated (
+        nct_id TEXT NOT NULL,
+        target TEXT NOT NULL,
+        hash TEXT NOT NULL,
+        fields TEXT NOT NULL,
+        PRIMARY KEY (nct_id, target)
+    )""",
+    "CREATE TABLE IF NOT EXISTS pretranslate_state (key TEXT PRIMARY KEY, value TEXT)",
+]
+
+
+def content_hash(study: Study) -> str:
+    """Identifies a version of a study's translatable text."""
+    return hashlib.sha256(
+        json.dumps(study.text_fields(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+class PreTranslatedStore:
+    """Translated study text keyed by NCT ID, target language and content hash."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.PRETRANSLATED_PATH
+        self._connection = SQLiteConnections(self.path, SCHEMA)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def get_state(self, key: str) -> Optional[str]:
+        row = self._connection().execute("SELECT value FROM pretranslate_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: Optional[str]):
+        if value is None:
+            self._connection().execute("DELETE FROM pretranslate_state WHERE key = ?", (key,))
+        else:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO pretranslate_state (key, value) VALUES (?, ?)", (key, value)
+            )
+
+    def current(self, studies: List[Study], target_language: str) -> Dict[str, Tuple[str, Dict]]:
+        """nct_id -> (hash, translated fields) for studies with a stored translation."""
+        nct_ids = list({study.nct_id for study in studies})
+        if not nct_ids:
+            return {}
+        rows = self._connection().execute(
+            f"SELECT nct_id, hash, fields FROM pretranslated "
+            f"WHERE target = ? AND nct_id IN ({','.join('?' * len(nct_ids))})",
+            [target_language] + nct_ids,
+        ).fetchall()
+        return {nct_id: (hash_, fields) for nct_id, hash_, fields in rows}
+
+    def apply(self, studies: List[Study], target_language: str) -> List[Study]:
+        """Swaps in stored translations; returns the studies that still need one."""
+        stored = self.current(studies, target_language)
+        missing = []
+        for study in studies:
+            entry = stored.get(study.nct_id)
+            if entry is not None and entry[0] == content_hash(study):
+                study.set_text_fields(json.loads(entry[1]))
+            else:
+                missing.append(study)
+
+        with self._lock:
+            self.hits += len(studies) - len(missing)
+            self.misses += len(missing)
+        return missing
+
+    def put_many(self, entries: List[Tuple[str, str, Study]], target_language: str):
+        """Stores (nct_id, hash of the source text, translated study) entries."""
+        rows = [
+            (nct_id, target_language, hash_, json.dumps(study.text_fields(), ensure_ascii=False))
+            for nct_id, hash_, study in entries
+        ]
+        if not rows:
+            return
+
+        conn = self._connection()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO pretranslated (nct_id, target, hash, fields) VALUES (?, ?, ?, ?)", rows
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+
+
+pretranslated_store = PreTranslatedStore() if Config.PRETRANSLATED_PATH else None
@@ -0,0 +1,56 @@
+import json
+import logging
+import time
+from typing import Optional
+from app.core.config import Config
+from app.services.mirror import TrialMirror
+from app.services.pretranslated import content_hash
+from app.services.translate import TranslateService
+
+logger = logging.getLogger(__name__)
+
+
+class PreTranslator:
+    """Fills the pre-translated store from the mirror, resuming where the last run stopped."""
+
+    def __init__(
+        self,
+        mirror: TrialMirror,
+        translate_service: Optional[TranslateService] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.mirror = mirror
+        self.translate_service = translate_service or TranslateService()
+        self.batch_size = batch_size or Config.PRETRANSLATE_BATCH_SIZE
+        if self.translate_service.store is None:
+            raise ValueError("PreTranslator needs a TranslateService with a pre-translated store")
+
+    def run(self, target_language: str = 'pt', full: bool = False) -> int:
+        """Translates what is missing or outdated; returns how many studies that was."""
+        store = self.translate_service.store
+        state_key = f"cursor:{target_language}"
+        saved = None if full else store.get_state(state_key)
+        cursor = tuple(json.loads(saved)) if saved else None
+
+        started = time.perf_counter()
+        translated = 0
+        while True:
+            batch = self.mirror.studies_after(cursor, limit=self.batch_size)
+            if not batch:
+                break
+
+            studies = [study for _, study in batch]
+            stored = store.current(studies, target_language)
+            translated += sum(
+                1 for study in studies
+                if stored.get(study.nct_id, (None,))[0] != content_hash(study)
+            )
+            self.translate_service.translate_studies(studies, target_language)
+
+            cursor = batch[-1][0]
+            store.set_state(state_key, json.dumps(cursor))
+
+        logger.info(
+            f"Pre-translated {translated} studies to {target_language} in {time.perf_counter() - started:.1f}s"
+        )
+        return translated
@@ -0,0 +1,51 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+# what a worker process builds once and shares between its requests:
+# clients, pools and the services holding them. Emptied in a forked child,
+# so gunicorn workers never use the master's sockets, threads or tokens
+_instances: Dict[str, Any] = {}
+_lock = threading.RLock()
+
+
+def get(name: str, build: Callable[[], Any]) -> Any:
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+
+    with _lock:
+        if name not in _instances:
+            _instances[name] = build()
+        return _instances[name]
+
+
+def discard(name: str) -> Optional[Any]:
+    with _lock:
+        return _instances.pop(name, None)
+
+
+def get_translate_service():
+    from app.services.translate import TranslateService
+    return get("translate_service", TranslateService)
+
+
+def get_search_service():
+    from app.services.search import SearchService
+    return get("search_service", lambda: SearchService(translate_service=get_translate_service()))
+
+
+def reset_services():
+    with _lock:
+        _instances.clear()
+
+
+def _reset_after_fork():
+    # dropped, not closed: the parent still uses what it built
+    global _lock
+    _instances.clear()
+    _lock = threading.RLock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
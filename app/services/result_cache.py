@@ -0,0 +1,176 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from flask import current_app
+from app.core.config import Config
+from app.core.responses import EncodedBody
+from app.models.study import Study, serialize_studies
+from app.services.cache import CacheBackend, MemoryCache, create_cache
+
+HIT = "HIT"
+MISS = "MISS"
+STALE = "STALE"
+
+
+class SearchResultCache:
+    """Translated search results and their encoded bodies, with stale-while-revalidate."""
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None
+    ):
+        self.ttl = ttl if ttl is not None else Config.SEARCH_CACHE_TTL
+        self.stale_ttl = stale_ttl if stale_ttl is not None else Config.SEARCH_CACHE_STALE_TTL
+        # an empty backend is falsy (CacheBackend has __len__)
+        self.backend = backend if backend is not None else create_cache(
+            "search_results",
+            max_size=Config.SEARCH_CACHE_SIZE,
+            ttl=self.ttl + self.stale_ttl,
+        )
+        # bodies read back from a shared backend, so each worker still
+        # compresses a given body only once
+        self._bodies = MemoryCache(max_size=Config.SEARCH_CACHE_SIZE)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.counts = {HIT: 0, MISS: 0, STALE: 0}
+
+    @staticmethod
+    def make_key(params: Dict[str, Any], page: int, page_size: int, target_language: str) -> str:
+        canonical = {
+            key: sorted(value) if isinstance(value, list) else value
+            for key, value in params.items()
+            if value is not None
+        }
+        payload = json.dumps(
+            {"params": canonical, "page": page, "page_size": page_size, "lang": target_language},
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, status: str):
+        with self._lock:
+            self.counts[status] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self.counts.values())
+            hits = self.counts[HIT] + self.counts[STALE]
+            return dict(self.counts, hit_rate=hits / total if total else 0.0)
+
+    def store(self, key: str, result: List[Study]) -> Dict[str, Any]:
+        # the in-process cache keeps the records themselves and encodes them
+        # on first use; shared backends need plain dicts and text
+        if isinstance(self.backend, MemoryCache):
+            entry = {"stored_at": time.time(), "result": result, "body": None}
+        else:
+            serialized = serialize_studies(result)
+            entry = {
+                "stored_at": time.time(),
+                "result": serialized,
+                "eligibility": [study.eligibility.to_dict() if study.eligibility else None for study in result],
+                "body": EncodedBody.from_data(serialized).body.decode("utf-8"),
+            }
+        self.backend.set(key, entry)
+        return entry
+
+    def _lookup_entry(self, key: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        entry = self.backend.get(key)
+        if entry is None:
+            self._count(MISS)
+            return None, MISS
+
+        status = HIT if time.time() - entry["stored_at"] < self.ttl else STALE
+        self._count(status)
+        return entry, status
+
+    def lookup(self, key: str) -> Tuple[Optional[List[Study]], str]:
+        entry, status = self._lookup_entry(key)
+        if entry is None:
+            return None, status
+
+        result = entry["result"]
+        if not isinstance(self.backend, MemoryCache):
+            # entries written before eligibility was kept have none
+            eligibility = entry.get("eligibility") or [None] * len(result)
+            result = [Study.from_dict(study, parsed) for study, parsed in zip(result, eligibility)]
+        return result, status
+
+    def lookup_encoded(self, key: str) -> Tuple[Optional[EncodedBody], str]:
+        entry, status = self._lookup_entry(key)
+        if entry is None:
+            return None, status
+        return self._body(key, entry), status
+
+    def _body(self, key: str, entry: Dict[str, Any]) -> EncodedBody:
+        body = entry.get("body")
+        if isinstance(body, EncodedBody):
+            return body
+        if isinstance(self.backend, MemoryCache):
+            # the entry is this worker's own object; concurrent first lookups
+            # may both encode it, and either result is the same
+            body = entry["body"] = EncodedBody.from_data(serialize_studies(entry["result"]))
+            return body
+
+        cached = self._bodies.get(key)
+        if cached is not None and cached[0] == entry["stored_at"]:
+            return cached[1]
+        # entries written before bodies were cached only have the result
+        encoded = EncodedBody(body.encode("utf-8")) if body is not None else EncodedBody.from_data(entry["result"])
+        self._bodies.set(key, (entry["stored_at"], encoded))
+        return encoded
+
+    def claim_refresh(self, key: str) -> bool:
+        """Returns True if the caller should refresh key, False if someone already is."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def release_refresh(self, key: str):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def get_or_compute(self, key: str, compute: Callable[[], List[Study]]) -> Tuple[List[Study], str]:
+        result, status = self.lookup(key)
+        if status == STALE and self.claim_refresh(key):
+            self._refresh_in_background(key, compute)
+        if status != MISS:
+            return result, status
+
+        result = compute()
+        self.store(key, result)
+        return result, MISS
+
+    def get_or_compute_encoded(self, key: str, compute: Callable[[], List[Study]]) -> Tuple[EncodedBody, str]:
+        """get_or_compute, returning the response body instead of the studies."""
+        body, status = self.lookup_encoded(key)
+        if status == STALE and self.claim_refresh(key):
+            self._refresh_in_background(key, compute)
+        if status != MISS:
+            return body, status
+
+        return self._body(key, self.store(key, compute())), MISS
+
+    def _refresh_in_background(self, key: str, compute: Callable[[], Any]):
+        app = current_app._get_current_object()
+
+        def refresh():
+            try:
+                with app.app_context():
+                    self.store(key, compute())
+            except Exception as e:
+                app.logger.error(f"Background refresh of search result failed: {e}")
+            finally:
+                self.release_refresh(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+
+search_result_cache = SearchResultCache()
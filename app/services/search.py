@@ -1,101 +1,70 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import requests
 from flask import current_app
+from app.core.metrics import cache_requests, span
+from app.core.responses import EncodedBody
+from app.models.eligibility import age_in_years, normalize_sex
+from app.models.study import Study
 from app.schemas.search import PacienteSearch
 from app.services.translate import TranslateService
+from app.services.clinicaltrials import ClinicalTrialsClient
+from app.services.eligibility import filter_eligible
+from app.services.location_index import LocationIndex
+from app.services.mirror import TrialMirror, trial_mirror
+from app.services.page_tokens import PageTokenCache, page_token_cache
+from app.services.prefetch import PagePrefetcher, page_prefetcher
+from app.services.result_cache import MISS, SearchResultCache, search_result_cache
+from app.services.single_flight import SingleFlight, flight_key, search_flights
+from app.services.study_parser import STUDY_FIELDS, read_studies
 
 class SearchService:
-    BASE_URL = "https://clinicaltrials.gov/api/v2/studies"
-
-    def __init__(self):
-        self.translate_service = TranslateService()
+    def __init__(
+        self,
+        client: Optional[ClinicalTrialsClient] = None,
+        page_tokens: Optional[PageTokenCache] = None,
+        result_cache: Optional[SearchResultCache] = None,
+        translate_service: Optional[TranslateService] = None,
+        mirror: Optional[TrialMirror] = None,
+        prefetcher: Optional[PagePrefetcher] = None,
+        flights: Optional[SingleFlight] = None
+    ):
+        self.translate_service = translate_service or TranslateService()
+        self.client = client or ClinicalTrialsClient()
+        self.page_tokens = page_tokens or page_token_cache
+        self.result_cache = result_cache or search_result_cache
+        self.mirror = mirror or trial_mirror
+        self.prefetcher = prefetcher or page_prefetcher
+        self.flights = flights or search_flights
 
     @staticmethod
-    def filter_studies(api_response: Dict[str, Any]) -> List[Dict[str, Any]]:
-        filtered_studies = []
-
-        for study in api_response.get("studies", []):
-            filtered_study = {}
-            protocol_section = study.get("protocolSection", {})
-            identification_module = protocol_section.get("identificationModule", {})
-            description_module = protocol_section.get("descriptionModule", {})
-            arms_interventions_module = protocol_section.get("armsInterventionsModule", {})
-            sponsors_collaborators_module = protocol_section.get("sponsorsCollaboratorsModule", {})
-            contacts_locations_module = protocol_section.get("contactsLocationsModule", {})
-            conditions_module = protocol_section.get("conditionsModule", {})
-            eligibility_module = protocol_section.get("eligibilityModule", {})
-
-            title = identification_module.get("briefTitle") or identification_module.get("officialTitle") or "N/A"
-            filtered_study["Title"] = title
-
-            brief_summary = description_module.get("briefSummary", "")
-            detailed_description = description_module.get("detailedDescription", "")
-            full_description = "\n\n".join(filter(None, [brief_summary, detailed_description])).strip() or "N/A"
-            filtered_study["Description"] = full_description
-
-            interventions = arms_interventions_module.get("interventions", [])
-            intervention_names = [interv.get("name", "N/A") for interv in interventions] or ["N/A"]
-            filtered_study["Intervention"] = intervention_names
-
-            sponsor = sponsors_collaborators_module.get("leadSponsor", {}).get("name", "N/A")
-            filtered_study["Sponsor"] = sponsor
-
-            keywords = conditions_module.get("keywords", []) or ["N/A"]
-            filtered_study["Keywords"] = keywords
-
-            contacts = contacts_locations_module.get("centralContacts", []) or ["N/A"]
-            filtered_study["Contacts"] = contacts
-
-            locations = contacts_locations_module.get("locations", [])
-            location_info = []
-            for loc in locations:
-                facility = loc.get("facility", "N/A")
-                city = loc.get("city", "N/A")
-                state = loc.get("state", "N/A")
-                country = loc.get("country", "N/A")
-                status = loc.get("status", "N/A")
-                location_info.append({
-                    "Facility": facility,
-                    "City": city,
-                    "State": state,
-                    "Country": country,
-                    "Status": status
-                })
-            filtered_study["Location"] = location_info or ["N/A"]
-
-            conditions = conditions_module.get("conditions", []) or ["N/A"]
-            filtered_study["Conditions"] = conditions
-
-            restrictions = eligibility_module.get("eligibilityCriteria", "N/A").strip()
-            filtered_study["Restrictions"] = restrictions
-
-            has_results = study.get("hasResults", False)
-            filtered_study["Has Results Published"] = has_results
-
-            filtered_studies.append(filtered_study)
-
-        return filtered_studies
+    def filter_studies(api_response: Dict[str, Any]) -> List[Study]:
+        return [Study.from_api(study) for study in api_response.get("studies", [])]
 
-    def search_paciente(
-        self,
+    @staticmethod
+    def build_params(
         search_data: PacienteSearch,
         fields: Optional[List[str]] = None,
-        page_size: int = 3,
-        page: int = 1
-    ) -> List[Dict[str, Any]]:
-        search_url = self.BASE_URL
+        page_size: int = 3
+    ) -> Dict[str, Any]:
         params = {
             "format": "json",
             "pageSize": page_size
         }
 
         data_dict = search_data.dict(exclude_none=True, exclude_unset=True, by_alias=True)
-        current_app.logger.info(f"Search data: {data_dict}")
 
+        advanced = []
         if 'age' in data_dict and data_dict['age']:
             age_value = data_dict.pop('age')
-            age_expr = f"AREA[MinimumAge]RANGE[MIN, {age_value}] AND AREA[MaximumAge]RANGE[{age_value}, MAX]"
-            params['filter.advanced'] = age_expr
+            advanced.append(f"AREA[MinimumAge]RANGE[MIN, {age_value}] AND AREA[MaximumAge]RANGE[{age_value}, MAX]")
+
+        # upstream has no eligibilityModule.sex parameter, only the Sex search area
+        sex = normalize_sex(data_dict.pop('eligibilityModule.sex', None))
+        if sex and sex != 'ALL':
+            advanced.append(f"(AREA[Sex]{sex} OR AREA[Sex]ALL)")
+
+        if advanced:
+            params['filter.advanced'] = " AND ".join(advanced)
 
         for key, value in data_dict.items():
             if isinstance(value, list):
@@ -103,40 +72,100 @@ class SearchService:
             else:
                 params[key] = value
 
-        if fields:
-            params['fields'] = ",".join(fields)
+        params['fields'] = ",".join(fields or STUDY_FIELDS)
+
+        return params
+
+    def process_page(self, api_response: Dict[str, Any], search_data: PacienteSearch) -> List[Study]:
+        with span("search.filter_studies"):
+            studies = self.filter_studies(api_response)
+        return self.process_studies(studies, search_data)
+
+    def process_studies(self, filtered_response: List[Study], search_data: PacienteSearch) -> List[Study]:
+        age = age_in_years(search_data.age)
+        sex = normalize_sex(search_data.sex)
+        if age is not None or sex:
+            # upstream already filters on these; this holds every source,
+            # mirror included, to the same parsed eligibility
+            with span("search.eligibility"):
+                filtered_response = filter_eligible(filtered_response, age, sex)
+
+        if search_data.location:
+            # places can have different statuses compared to the overall, so
+            # the status filter is applied to each site as well
+            with span("search.filter_by_location"):
+                filtered_response = self.filter_by_location(
+                    filtered_response, search_data.location, search_data.status
+                )
 
+        return filtered_response
+
+    def search_paciente(
+        self,
+        search_data: PacienteSearch,
+        fields: Optional[List[str]] = None,
+        page_size: int = 3,
+        page: int = 1,
+        target_language: str = 'pt'
+    ) -> List[Study]:
+        # identical searches already running in this worker are joined
+        # rather than repeated
+        key = flight_key(
+            search_data.dict(exclude_none=True, by_alias=True), fields, page_size, page, target_language
+        )
+        return self.flights.do(
+            key,
+            lambda: self._search_paciente(search_data, fields, page_size, page, target_language),
+        )
+
+    def _search_paciente(
+        self,
+        search_data: PacienteSearch,
+        fields: Optional[List[str]],
+        page_size: int,
+        page: int,
+        target_language: str
+    ) -> List[Study]:
+        current_app.logger.info(f"Search data: {search_data}")
+        if self.mirror is not None:
+            with span("search.mirror"):
+                studies = self.mirror.search(search_data, page_size=page_size, page=page)
+            if studies:
+                current_app.logger.info("Search answered from the local mirror")
+                studies = self.process_studies(studies, search_data)
+                with span("search.translate"):
+                    self.translate_service.translate_studies(studies, target_language=target_language)
+                return studies
+
+        params = self.build_params(search_data, fields, page_size)
         current_app.logger.info(f"Initial Params: {params}")
 
-        next_page_token = None
-        current_page = 1
+        query_key = self.page_tokens.query_key(params)
+        current_page, next_page_token = self.page_tokens.nearest(query_key, page)
+        if current_page > 1:
+            current_app.logger.info(f"Resuming page walk at page {current_page} from cached token")
+
         while current_page <= page:
             if next_page_token:
                 params['pageToken'] = next_page_token
 
-            response = requests.get(search_url, params=params)
+            with span("search.upstream"):
+                response = self.client.get_studies(params, stream=True)
             if response.status_code != 200:
                 self.handle_api_error(response)
 
-            api_response = response.json()
+            with span("search.parse"):
+                api_response = read_studies(response)
+            next_page_token = api_response.get('nextPageToken')
+            self.page_tokens.set(query_key, current_page + 1, next_page_token)
 
             if current_page == page:
-                filtered_response = self.filter_studies(api_response)
-
-                if search_data.location:
-                    filtered_response = self.filter_by_location(filtered_response, search_data.location)
-                    # places can have different statuses compared to the overall, so i filter them here
-                    for study in filtered_response:
-                        if study["Location"][0]["Status"] == search_data.status:
-                            continue 
-                        else:
-                            filtered_response.remove(study)
-
-                self.translate_service.translate_fields(filtered_response)
+                filtered_response = self.process_page(api_response, search_data)
+                with span("search.translate"):
+                    self.translate_service.translate_studies(filtered_response, target_language=target_language)
 
                 return filtered_response
 
-            next_page_token = api_response.get('nextPageToken')
             if not next_page_token:
                 break
 
@@ -144,18 +173,92 @@ class SearchService:
 
         return []
 
-    def filter_by_location(self, studies: List[Dict[str, Any]], location: str) -> List[Dict[str, Any]]:
-        filter_city = location.split(",")[0].strip().lower()
-        filtered_studies = []
+    def search_paciente_cached(
+        self,
+        search_data: PacienteSearch,
+        page_size: int = 3,
+        page: int = 1,
+        target_language: str = 'pt'
+    ) -> Tuple[List[Study], str]:
+        key = self.result_cache.make_key(
+            search_data.dict(exclude_none=True, by_alias=True), page, page_size, target_language
+        )
+        result, status = self.result_cache.get_or_compute(
+            key,
+            lambda: self.search_paciente(
+                search_data, page_size=page_size, page=page, target_language=target_language
+            )
+        )
+        self._served(key, status, search_data, page_size, page, target_language)
+        return result, status
 
-        for study in studies:
-            for loc in study["Location"]:
-                if isinstance(loc, dict) and filter_city in loc.get("City", "").lower():
-                    study["Location"] = [loc] 
-                    filtered_studies.append(study)
-                    break
+    def search_paciente_encoded(
+        self,
+        search_data: PacienteSearch,
+        page_size: int = 3,
+        page: int = 1,
+        target_language: str = 'pt'
+    ) -> Tuple[EncodedBody, str]:
+        key = self.result_cache.make_key(
+            search_data.dict(exclude_none=True, by_alias=True), page, page_size, target_language
+        )
+        body, status = self.result_cache.get_or_compute_encoded(
+            key,
+            lambda: self.search_paciente(
+                search_data, page_size=page_size, page=page, target_language=target_language
+            )
+        )
+        self._served(key, status, search_data, page_size, page, target_language)
+        return body, status
 
-        return filtered_studies
+    def _served(
+        self,
+        key: str,
+        status: str,
+        search_data: PacienteSearch,
+        page_size: int,
+        page: int,
+        target_language: str
+    ):
+        cache_requests.inc(cache="search_results", result=status.lower())
+        if self.prefetcher is not None:
+            if status != MISS:
+                self.prefetcher.consume(key)
+            self.prefetch_next_page(search_data, page_size, page, target_language)
+
+    def has_next_page(self, search_data: PacienteSearch, page_size: int, page: int) -> bool:
+        query_key = self.page_tokens.query_key(self.build_params(search_data, page_size=page_size))
+        return self.page_tokens.get(query_key, page + 1) is not None
+
+    def prefetch_next_page(
+        self,
+        search_data: PacienteSearch,
+        page_size: int,
+        page: int,
+        target_language: str
+    ) -> bool:
+        if not self.has_next_page(search_data, page_size, page):
+            return False
+        key = self.result_cache.make_key(
+            search_data.dict(exclude_none=True, by_alias=True), page + 1, page_size, target_language
+        )
+        if self.result_cache.backend.get(key) is not None:
+            return False
+        return self.prefetcher.schedule(
+            key,
+            lambda: self.search_paciente(
+                search_data, page_size=page_size, page=page + 1, target_language=target_language
+            ),
+            self.result_cache.store,
+        )
+
+    def filter_by_location(
+        self,
+        studies: List[Study],
+        location: str,
+        statuses: Optional[List[str]] = None
+    ) -> List[Study]:
+        return LocationIndex(studies).filter(location, statuses)
 
     @staticmethod
     def handle_api_error(response: requests.Response):
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from flask import Flask
+from app.core.config import Config
+from app.core.metrics import cache_requests, span
+from app.models.study import Study
+from app.schemas.search import PacienteSearch
+from app.services.clinicaltrials_async import AsyncClinicalTrialsClient
+from app.services.mirror import TrialMirror
+from app.services.page_tokens import PageTokenCache
+from app.services.result_cache import SearchResultCache, MISS, STALE
+from app.services.search import SearchService
+from app.services.registry import get_translate_service
+from app.services.study_parser import load_studies
+from app.services.translate import TranslateService
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTranslateService:
+    """Runs TranslateService on the loop's executor; the Google client has no asyncio API."""
+
+    def __init__(self, translate_service: Optional[TranslateService] = None, app: Optional[Flask] = None):
+        self.translate_service = translate_service or get_translate_service()
+        self.app = app
+
+    def _translate(self, studies, target_language):
+        if self.app is None:
+            return self.translate_service.translate_studies(studies, target_language=target_language)
+        with self.app.app_context():
+            return self.translate_service.translate_studies(studies, target_language=target_language)
+
+    async def translate_studies(self, studies: List[Study], target_language: str = 'pt') -> List[Study]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._translate, studies, target_language)
+
+
+class AsyncSearchService:
+    """asyncio version of SearchService.search_paciente."""
+
+    def __init__(
+        self,
+        client: Optional[AsyncClinicalTrialsClient] = None,
+        translate_service: Optional[AsyncTranslateService] = None,
+        page_tokens: Optional[PageTokenCache] = None,
+        result_cache: Optional[SearchResultCache] = None,
+        mirror: Optional[TrialMirror] = None
+    ):
+        self.client = client or AsyncClinicalTrialsClient()
+        self.translate_service = translate_service or AsyncTranslateService()
+        self.search_service = SearchService(
+            page_tokens=page_tokens,
+            result_cache=result_cache,
+            translate_service=self.translate_service.translate_service,
+            mirror=mirror,
+        )
+        self.page_tokens = self.search_service.page_tokens
+        self.result_cache = self.search_service.result_cache
+        self._background = set()
+
+    async def _filter_and_translate(
+        self,
+        api_response: Dict[str, Any],
+        search_data: PacienteSearch,
+        target_language: str
+    ) -> List[Study]:
+        # filtered as a whole: the location filter decides per page whether
+        # a region narrows the result, so groups would disagree with SearchService
+        studies = self.search_service.process_page(api_response, search_data)
+        group_size = Config.ASYNC_TRANSLATE_GROUP_SIZE
+        translations = [
+            self.translate_service.translate_studies(studies[start:start + group_size], target_language)
+            for start in range(0, len(studies), group_size)
+        ]
+
+        groups = await asyncio.gather(*translations)
+        return [study for group in groups for study in group]
+
+    async def search_paciente(
+        self,
+        search_data: PacienteSearch,
+        fields: Optional[List[str]] = None,
+        page_size: int = 3,
+        page: int = 1,
+        target_language: str = 'pt'
+    ) -> List[Study]:
+        if self.search_service.mirror is not None:
+            loop = asyncio.get_running_loop()
+            studies = await loop.run_in_executor(
+                None, lambda: self.search_service.mirror.search(search_data, page_size=page_size, page=page)
+            )
+            if studies:
+                studies = self.search_service.process_studies(studies, search_data)
+                return await self.translate_service.translate_studies(studies, target_language)
+
+        params = SearchService.build_params(search_data, fields, page_size)
+        query_key = self.page_tokens.query_key(params)
+        current_page, next_page_token = self.page_tokens.nearest(query_key, page)
+
+        while current_page <= page:
+            if next_page_token:
+                params['pageToken'] = next_page_token
+
+            with span("search.upstream"):
+                response = await self.client.get_studies(params)
+            if response.status_code != 200:
+                response.raise_for_status()
+
+            with span("search.parse"):
+                api_response = load_studies(response.content)
+            next_page_token = api_response.get('nextPageToken')
+            self.page_tokens.set(query_key, current_page + 1, next_page_token)
+
+            if current_page == page:
+                return await self._filter_and_translate(api_response, search_data, target_language)
+
+            if not next_page_token:
+                break
+
+            current_page += 1
+
+        return []
+
+    async def search_paciente_cached(
+        self,
+        search_data: PacienteSearch,
+        page_size: int = 3,
+        page: int = 1,
+        target_language: str = 'pt'
+    ) -> Tuple[List[Study], str]:
+        key = self.result_cache.make_key(
+            search_data.dict(exclude_none=True, by_alias=True), page, page_size, target_language
+        )
+
+        async def compute():
+            return await self.search_paciente(
+                search_data, page_size=page_size, page=page, target_language=target_language
+            )
+
+        result, status = self.result_cache.lookup(key)
+        cache_requests.inc(cache="search_results", result=status.lower())
+        if status == STALE and self.result_cache.claim_refresh(key):
+            task = asyncio.ensure_future(self._refresh(key, compute))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+        if status != MISS:
+            return result, status
+
+        result = await compute()
+        self.result_cache.store(key, result)
+        return result, MISS
+
+    async def _refresh(self, key, compute):
+        try:
+            self.result_cache.store(key, await compute())
+        except Exception as e:
+            logger.error(f"Background refresh of search result failed: {e}")
+        finally:
+            self.result_cache.release_refresh(key)
+
+    async def aclose(self):
+        await self.client.aclose()
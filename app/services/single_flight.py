@@ -0,0 +1,152 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+from app.core.config import Config
+from app.services.cache import SQLiteConnections
+
+logger = logging.getLogger(__name__)
+
+_POLL_INTERVAL = 0.05
+
+
+def flight_key(*parts: Any) -> str:
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class SharedFlightLock:
+    """Per-key leases in a SQLite file, so one worker per host runs a key at a time."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.CACHE_SQLITE_PATH
+        self._owner = None
+        self._owner_pid = None
+        self._connection = SQLiteConnections(self.path, (
+            "CREATE TABLE IF NOT EXISTS flights (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)",
+        ))
+
+    @property
+    def owner(self) -> str:
+        # per process: workers forked from a preloaded master must not
+        # share one, or a worker could release a lease another took over
+        if self._owner_pid != os.getpid():
+            self._owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+            self._owner_pid = os.getpid()
+        return self._owner
+
+    def try_acquire(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        cursor = self._connection().execute(
+            "INSERT INTO flights (key, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE flights.expires_at < ?",
+            (key, self.owner, now + ttl, now),
+        )
+        return cursor.rowcount == 1
+
+    def acquire(self, key: str, ttl: float, timeout: float) -> bool:
+        """Waits up to timeout for the lease; False if another worker kept it."""
+        deadline = time.monotonic() + timeout
+        while not self.try_acquire(key, ttl):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(_POLL_INTERVAL)
+        return True
+
+    def release(self, key: str):
+        self._connection().execute("DELETE FROM flights WHERE key = ? AND owner = ?", (key, self.owner))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one."""
+
+    def __init__(self, timeout: Optional[float] = None, shared_lock: Optional[SharedFlightLock] = None):
+        self.timeout = timeout if timeout is not None else Config.SINGLE_FLIGHT_TIMEOUT
+        self.shared_lock = shared_lock
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.counts = {"leaders": 0, "followers": 0, "timeouts": 0, "shared_waits": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counts[name] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts, in_flight=len(self._calls))
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.counts["leaders"] += 1
+            else:
+                self.counts["followers"] += 1
+
+        if not leader:
+            if call.done.wait(self.timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            self._count("timeouts")
+            logger.warning(f"Single-flight leader for {key} still running after {self.timeout}s, computing alone")
+            return fn()
+
+        try:
+            call.result = self._run_leader(key, fn)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _run_leader(self, key: str, fn: Callable[[], Any]) -> Any:
+        if self.shared_lock is None:
+            return fn()
+
+        try:
+            if not self.shared_lock.try_acquire(key, self.timeout):
+                self._count("shared_waits")
+                if not self.shared_lock.acquire(key, self.timeout, self.timeout):
+                    self._count("timeouts")
+                    return fn()
+        except sqlite3.Error as e:
+            logger.error(f"Shared single-flight lock unavailable: {e}")
+            return fn()
+
+        try:
+            return fn()
+        finally:
+            try:
+                self.shared_lock.release(key)
+            except sqlite3.Error as e:
+                logger.error(f"Could not release shared single-flight lock: {e}")
+
+
+def create_single_flight() -> SingleFlight:
+    shared_lock = SharedFlightLock() if Config.SINGLE_FLIGHT_SHARED else None
+    return SingleFlight(shared_lock=shared_lock)
+
+
+search_flights = create_single_flight()
+translate_flights = create_single_flight()
@@ -0,0 +1,147 @@
+import io
+import json
+import re
+from typing import Any, Dict, IO, List, Optional, Tuple, Union
+import ijson
+from app.core.config import Config
+from app.core.metrics import upstream_bytes
+
+# the parts of a study filter_studies reads; sent upstream as the fields=
+# projection and kept locally when a response carries more than that
+STUDY_FIELDS = [
+    "protocolSection.identificationModule.nctId",
+    "protocolSection.identificationModule.briefTitle",
+    "protocolSection.identificationModule.officialTitle",
+    "protocolSection.descriptionModule.briefSummary",
+    "protocolSection.descriptionModule.detailedDescription",
+    "protocolSection.armsInterventionsModule.interventions",
+    "protocolSection.sponsorsCollaboratorsModule.leadSponsor",
+    "protocolSection.conditionsModule.keywords",
+    "protocolSection.conditionsModule.conditions",
+    "protocolSection.contactsLocationsModule.centralContacts",
+    "protocolSection.contactsLocationsModule.locations",
+    "protocolSection.eligibilityModule.eligibilityCriteria",
+    "protocolSection.eligibilityModule.sex",
+    "protocolSection.eligibilityModule.minimumAge",
+    "protocolSection.eligibilityModule.maximumAge",
+    "hasResults",
+]
+
+# an unescaped "nextPageToken" key can only be the top-level one; inside a
+# JSON string the quotes around it would be escaped
+_NEXT_PAGE_TOKEN = re.compile(rb'"nextPageToken"\s*:\s*"([^"\\]*)"')
+_EDGE_BYTES = 4096
+
+
+class _EdgeTap(io.RawIOBase):
+    """Reads through to a stream, keeping the edges that hold nextPageToken."""
+
+    def __init__(self, stream: IO[bytes], prefix: bytes = b""):
+        self.stream = stream
+        self.prefix = memoryview(prefix)
+        self.offset = 0
+        self.head = b""
+        self.tail = b""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if self.offset < len(self.prefix):
+            end = len(self.prefix) if size is None or size < 0 else self.offset + size
+            chunk = bytes(self.prefix[self.offset:end])
+            self.offset += len(chunk)
+        else:
+            chunk = self.stream.read(size)
+        if chunk:
+            if len(self.head) < _EDGE_BYTES:
+                self.head += chunk[:_EDGE_BYTES - len(self.head)]
+            self.tail = (self.tail + chunk)[-_EDGE_BYTES:]
+        return chunk
+
+    def readinto(self, buffer):
+        chunk = self.read(len(buffer))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+    def next_page_token(self) -> Optional[str]:
+        for edge in (self.tail, self.head):
+            match = _NEXT_PAGE_TOKEN.search(edge)
+            if match:
+                return match.group(1).decode("utf-8")
+        return None
+
+
+def _compile(fields: List[str]) -> List[Tuple[str, ...]]:
+    return [tuple(field.split(".")) for field in fields]
+
+
+def project(study: Dict[str, Any], paths: List[Tuple[str, ...]]) -> Dict[str, Any]:
+    projected = {}
+    for path in paths:
+        value = study
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = projected
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = value
+    return projected
+
+
+def _read_up_to(stream: IO[bytes], size: int) -> bytearray:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = stream.read(size - len(buffer))
+        if not chunk:
+            break
+        buffer += chunk
+    return buffer
+
+
+def load_studies(body: Union[bytes, bytearray], fields: List[str] = STUDY_FIELDS) -> Dict[str, Any]:
+    """Parses a whole /studies body at once, keeping only the given field paths."""
+    paths = _compile(fields)
+    data = json.loads(body)
+    page = {"studies": [project(study, paths) for study in data.get("studies", [])]}
+    if data.get("nextPageToken"):
+        page["nextPageToken"] = data["nextPageToken"]
+    return page
+
+
+def parse_studies(
+    stream: IO[bytes],
+    fields: List[str] = STUDY_FIELDS,
+    stream_min_bytes: Optional[int] = None
+) -> Dict[str, Any]:
+    """Studies and nextPageToken of a /studies body; streamed when over stream_min_bytes."""
+    if stream_min_bytes is None:
+        stream_min_bytes = Config.CTGOV_STREAM_PARSE_MIN_BYTES
+    head = _read_up_to(stream, stream_min_bytes + 1)
+    if len(head) <= stream_min_bytes:
+        return load_studies(head, fields)
+
+    paths = _compile(fields)
+    tap = _EdgeTap(stream, prefix=head)
+    del head
+    studies = [project(study, paths) for study in ijson.items(tap, "studies.item", use_float=True)]
+
+    page = {"studies": studies}
+    next_page_token = tap.next_page_token()
+    if next_page_token:
+        page["nextPageToken"] = next_page_token
+    return page
+
+
+def read_studies(response, fields: List[str] = STUDY_FIELDS) -> Dict[str, Any]:
+    """Streams a requests response opened with stream=True through parse_studies."""
+    response.raw.decode_content = True
+    try:
+        return parse_studies(response.raw, fields)
+    finally:
+        # bytes off the wire, before decompression
+        upstream_bytes.inc(response.raw.tell(), service="clinicaltrials")
+        response.close()
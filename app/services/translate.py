@@ -1,21 +1,99 @@
-import os
 import json
 from operator import itemgetter 
-from dotenv import load_dotenv
-from google.cloud import translate_v2 as translate 
-from google.oauth2 import service_account
+from typing import Dict, List, Optional
+from flask import current_app
+from app.core.config import Config
+from app.core.metrics import count_cache, span
+from app.models.study import Study
+from app.services import registry
+from app.services.pretranslated import PreTranslatedStore, content_hash, pretranslated_store
+from app.services.single_flight import SingleFlight, flight_key, translate_flights
+from app.services.translation_memory import TranslationMemory, translation_memory
+from app.services.translate_batcher import TranslationBatcher
 
-load_dotenv()
+def build_translator():
+    # the google client libraries take longer to import than the rest of
+    # the app together, so workers only load them once they translate
+    from google.cloud import translate_v2 as translate
+    from google.oauth2 import service_account
+
+    if Config.GOOGLE_CREDENTIALS:
+        credentials_info = json.loads(Config.GOOGLE_CREDENTIALS)
+        credentials = service_account.Credentials.from_service_account_info(credentials_info)
+        return translate.Client(credentials=credentials)
+    return translate.Client()
+
+
+def get_translator():
+    # one Google client per worker process: building it parses the service
+    # account and starts a fresh token and connection pool, and the client
+    # is safe to share between threads
+    return registry.get("translator", lambda: build_translator())
 
 
 class TranslateService:
-    def __init__(self):
-        if os.getenv("GOOGLE_CREDENTIALS"):
-            credentials_info = json.loads(os.getenv("GOOGLE_CREDENTIALS"))
-            credentials = service_account.Credentials.from_service_account_info(credentials_info)
-            self.translator = translate.Client(credentials=credentials)
-        else:
-            self.translator = translate.Client()
+    def __init__(
+        self,
+        memory: Optional[TranslationMemory] = None,
+        translator=None,
+        store: Optional[PreTranslatedStore] = None,
+        flights: Optional[SingleFlight] = None
+    ):
+        self.memory = memory or translation_memory
+        self.store = store or pretranslated_store
+        self.flights = flights or translate_flights
+        self.translator = translator or get_translator()
+        self.batcher = TranslationBatcher(self.translator)
+
+    def translate_texts(self, texts: List[str], target_language: str = 'pt') -> Dict[str, str]:
+        # translate_fields and translate_studies both end up here, so
+        # identical concurrent batches share one round of translator calls
+        return self.flights.do(
+            flight_key(target_language, texts),
+            lambda: self._translate_texts(texts, target_language),
+        )
+
+    def _translate_texts(self, texts: List[str], target_language: str) -> Dict[str, str]:
+        with span("translate.memory"):
+            known = self.memory.get_many(texts, target_language)
+        misses = [text for text in dict.fromkeys(texts) if text not in known]
+        count_cache("translation_memory", len(known), len(misses))
+
+        if misses:
+            with span("translate.upstream"):
+                translated = self.batcher.translate(misses, target_language)
+            if len(translated) < len(misses):
+                current_app.logger.error(f"Erro na tradução: {len(misses) - len(translated)} textos sem tradução")
+            self.memory.put_many(translated, target_language)
+            known.update(translated)
+
+        return known
+
+    def translate_studies(self, studies: List[Study], target_language: str = 'pt') -> List[Study]:
+        pending = studies
+        if self.store is not None:
+            with span("translate.store"):
+                pending = self.store.apply(studies, target_language)
+            count_cache("pretranslated", len(studies) - len(pending), len(pending))
+
+        texts = [text for study in pending for text in study.texts()]
+        if not texts:
+            return studies
+
+        hashes = [content_hash(study) for study in pending] if self.store is not None else []
+        translations = self.translate_texts(texts, target_language)
+        complete = []
+        for index, study in enumerate(pending):
+            # a study missing any translation is served as is but never stored
+            if self.store is not None and study.nct_id != "N/A" and all(
+                text in translations for text in study.texts()
+            ):
+                complete.append((study.nct_id, hashes[index], study))
+            study.apply_translations(translations)
+
+        if complete:
+            self.store.put_many(complete, target_language)
+        return studies
 
     def translate_fields(self, data, target_language='pt'):
         strings_to_translate = []
@@ -39,13 +117,8 @@ class TranslateService:
         if not strings_to_translate:
             return data
 
-        try:
-            result = self.translator.translate(strings_to_translate, target_language=target_language)
-            translated_texts = [item['translatedText'] for item in result]
-        except Exception as e:
-            current_app.logger.error(f"Erro na tradução: {e}")
-            return data
-
+        known = self.translate_texts(strings_to_translate, target_language)
+        translated_texts = [known.get(text, text) for text in strings_to_translate]
         for translated_text, path in zip(translated_texts, paths):
             d = data
             for p in path[:-1]:
@@ -0,0 +1,107 @@
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from app.core.config import Config
+from app.core.metrics import upstream_bytes, upstream_requests
+from app.services import registry
+
+logger = logging.getLogger(__name__)
+
+def get_executor() -> ThreadPoolExecutor:
+    # per worker process: threads don't survive a fork
+    return registry.get("translate_executor", lambda: ThreadPoolExecutor(
+        max_workers=Config.TRANSLATE_MAX_WORKERS,
+        thread_name_prefix="translate",
+    ))
+
+
+class TranslationBatcher:
+    """Splits strings into size-bounded requests and sends them concurrently."""
+
+    def __init__(
+        self,
+        translator,
+        max_items: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_factor: Optional[float] = None,
+        executor: Optional[ThreadPoolExecutor] = None
+    ):
+        self.translator = translator
+        self.max_items = max_items or Config.TRANSLATE_BATCH_MAX_ITEMS
+        self.max_chars = max_chars or Config.TRANSLATE_BATCH_MAX_CHARS
+        self.max_retries = max_retries if max_retries is not None else Config.TRANSLATE_MAX_RETRIES
+        self.backoff_factor = backoff_factor if backoff_factor is not None else Config.TRANSLATE_BACKOFF_FACTOR
+        self._executor = executor
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        return self._executor or get_executor()
+
+    def chunk(self, texts: List[str]) -> List[List[str]]:
+        chunks = []
+        current = []
+        current_chars = 0
+        for text in texts:
+            # a string longer than the budget still goes out, alone
+            if current and (len(current) >= self.max_items or current_chars + len(text) > self.max_chars):
+                chunks.append(current)
+                current = []
+                current_chars = 0
+            current.append(text)
+            current_chars += len(text)
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _translate_chunk(self, chunk: List[str], target_language: str) -> Dict[str, str]:
+        upstream_bytes.inc(sum(len(text.encode("utf-8")) for text in chunk), service="translate")
+        try:
+            result = self.translator.translate(chunk, target_language=target_language)
+        except Exception:
+            upstream_requests.inc(service="translate", outcome="error")
+            raise
+        upstream_requests.inc(service="translate", outcome="ok")
+        return {text: item['translatedText'] for text, item in zip(chunk, result)}
+
+    def _dispatch(self, chunks: List[List[str]], target_language: str):
+        # a single chunk runs inline, there is nothing to overlap it with
+        if len(chunks) == 1:
+            calls = [lambda: self._translate_chunk(chunks[0], target_language)]
+        else:
+            futures = [self.executor.submit(self._translate_chunk, chunk, target_language) for chunk in chunks]
+            calls = [future.result for future in futures]
+
+        outcomes = []
+        for chunk, call in zip(chunks, calls):
+            try:
+                outcomes.append((chunk, call(), None))
+            except Exception as e:
+                outcomes.append((chunk, None, e))
+        return outcomes
+
+    def translate(self, texts: List[str], target_language: str) -> Dict[str, str]:
+        translated = {}
+        pending = self.chunk(list(dict.fromkeys(texts)))
+
+        for attempt in range(self.max_retries + 1):
+            if not pending:
+                break
+            if attempt:
+                time.sleep(random.uniform(0, self.backoff_factor * (2 ** attempt)))
+
+            outcomes = self._dispatch(pending, target_language)
+            failed = []
+            for chunk, result, error in outcomes:
+                if error is None:
+                    translated.update(result)
+                else:
+                    logger.warning(f"Translation chunk of {len(chunk)} strings failed (attempt {attempt + 1}): {error}")
+                    failed.append(chunk)
+            pending = failed
+
+        if pending:
+            logger.error(f"Giving up on {sum(len(chunk) for chunk in pending)} strings after {self.max_retries + 1} attempts")
+        return translated
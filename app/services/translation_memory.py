@@ -0,0 +1,103 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+from app.core.config import Config
+from app.services.cache import MemoryCache, SQLiteConnections
+
+# sqlite caps the number of bound parameters per statement
+_SQLITE_BATCH = 500
+
+
+class TranslationMemory:
+    """Translations in an in-process LRU, backed by a SQLite file shared by all workers."""
+
+    def __init__(self, path: Optional[str] = None, memory_size: Optional[int] = None):
+        self.path = path if path is not None else Config.TRANSLATION_MEMORY_PATH
+        self.memory = MemoryCache(max_size=memory_size or Config.TRANSLATION_MEMORY_SIZE)
+        self._connections = SQLiteConnections(self.path, (
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, target TEXT NOT NULL, translated TEXT NOT NULL, created_at REAL NOT NULL)",
+        ))
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @staticmethod
+    def key(text: str, target_language: str) -> str:
+        return hashlib.sha256(f"{target_language}\0{text}".encode("utf-8")).hexdigest()
+
+    def reset_stats(self):
+        with self._lock:
+            self.memory_hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_size": len(self.memory),
+            }
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        return self._connections()
+
+    def get_many(self, texts: Iterable[str], target_language: str) -> Dict[str, str]:
+        found = {}
+        pending = {}
+        for text in set(texts):
+            key = self.key(text, target_language)
+            translated = self.memory.get(key)
+            if translated is not None:
+                found[text] = translated
+            else:
+                pending[key] = text
+        memory_hits = len(found)
+
+        conn = self._connection()
+        if pending and conn is not None:
+            keys = list(pending)
+            for start in range(0, len(keys), _SQLITE_BATCH):
+                batch = keys[start:start + _SQLITE_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, translated FROM translations WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, translated in rows:
+                    found[pending.pop(key)] = translated
+                    self.memory.set(key, translated)
+
+        with self._lock:
+            self.memory_hits += memory_hits
+            self.disk_hits += len(found) - memory_hits
+            self.misses += len(pending)
+        return found
+
+    def put_many(self, translations: Dict[str, str], target_language: str):
+        rows = []
+        now = time.time()
+        for text, translated in translations.items():
+            key = self.key(text, target_language)
+            self.memory.set(key, translated)
+            rows.append((key, target_language, translated, now))
+
+        conn = self._connection()
+        if rows and conn is not None:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO translations (key, target, translated, created_at) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+
+
+translation_memory = TranslationMemory()
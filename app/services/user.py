@@ -1,5 +1,34 @@
 from app.db.mongo_client import get_db 
+from app.services.auth import invalidate_user
+from typing import Dict, Iterator, List, Tuple
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+# cursor batch for $in lookups, so large batches stream instead of arriving at once
+_CURSOR_BATCH = 500
+_DUPLICATE_KEY = 11000
+
+
+PUBLIC_FIELDS = {"username": 1, "email": 1}
+
+
+def public_user(user) -> Dict:
+    return {"_id": str(user["_id"]), "username": user["username"], "email": user["email"]}
+
+
+def parse_ids(user_ids) -> Tuple[Dict[str, ObjectId], List[Dict]]:
+    object_ids = {}
+    invalid = []
+    for user_id in user_ids:
+        if user_id in object_ids:
+            continue
+        try:
+            object_ids[user_id] = ObjectId(user_id)
+        except (InvalidId, TypeError):
+            invalid.append({"id": user_id, "status": "invalid_id"})
+    return object_ids, invalid
 
 class UserService:
     def __init__(self, db):
@@ -7,20 +36,16 @@ class UserService:
 
     def get_user_by_id(self, user_id):
         try:
-            user = self.db.users.find_one({"_id": ObjectId(user_id)})
+            user = self.db.users.find_one({"_id": ObjectId(user_id)}, PUBLIC_FIELDS)
             if not user:
                 raise ValueError("User not found")
             
-            return {
-                "_id": str(user["_id"]),
-                "username": user["username"],
-                "email": user["email"],
-            }
+            return public_user(user)
         except Exception as e:
             raise ValueError(f"error fetching user: {str(e)}")
     
     def get_user_by_email(self, email):
-        user = self.db.users.find_one({"email": email})
+        user = self.db.users.find_one({"email": email}, {"hashed_password": 0})
         if not user:
             raise ValueError("User not found")
         return user
@@ -28,22 +53,142 @@ class UserService:
     def update_user(self, user_id, update_data):
         if update_data.keys() - {"username", "email"}:
             raise ValueError("Invalid update data")
-        
-        if not self.db.users.find_one({"_id": ObjectId(user_id)}):
-            raise ValueError("User not found")
 
-        result = self.db.users.update_one(
-            {"_id": user_id},
-            {"$set": update_data}
-        )
+        # one round trip: the document as it was before the update tells
+        # both whether the user exists and whether anything changed
+        try:
+            previous = self.db.users.find_one_and_update(
+                {"_id": ObjectId(user_id)},
+                {"$set": update_data},
+                projection={field: 1 for field in update_data},
+                return_document=ReturnDocument.BEFORE,
+            )
+        except DuplicateKeyError as e:
+            raise ValueError("User with this email already exists") from e
+
+        if previous is None:
+            raise ValueError("User not found")
 
-        if result.modified_count == 0:
+        if all(previous.get(field) == value for field, value in update_data.items()):
             raise ValueError("No modifications were made")
 
+        invalidate_user(user_id)
         return {"message": "user updated successfully"}
 
+    def set_role(self, email, role):
+        user = self.db.users.find_one_and_update({"email": email}, {"$set": {"role": role}}, projection={"_id": 1})
+        if user is None:
+            raise ValueError("User not found")
+        invalidate_user(str(user["_id"]))
+        return {"message": f"{email} is now {role}"}
+
     def delete_user(self, user_id):
         result = self.db.users.delete_one({"_id": ObjectId(user_id)})
         if result.deleted_count == 0:
             raise ValueError("User not found")
-        return {"message": "user deleted successfully"}
\ No newline at end of file
+        invalidate_user(user_id)
+        return {"message": "user deleted successfully"}
+
+    def get_users_by_ids(self, user_ids) -> Iterator[Dict]:
+        object_ids, invalid = parse_ids(user_ids)
+        yield from invalid
+
+        missing = set(object_ids)
+        cursor = self.db.users.find(
+            {"_id": {"$in": list(object_ids.values())}}, PUBLIC_FIELDS
+        ).batch_size(_CURSOR_BATCH)
+        for user in cursor:
+            user_id = str(user["_id"])
+            missing.discard(user_id)
+            yield {"id": user_id, "status": "ok", "user": public_user(user)}
+
+        for user_id in missing:
+            yield {"id": user_id, "status": "not_found"}
+
+    def update_users(self, updates: List[Dict]) -> List[Dict]:
+        results = {}
+        pending = {}
+        for update in updates:
+            user_id = update["id"]
+            fields = {key: value for key, value in update.items() if key != "id"}
+            if user_id in results or user_id in pending:
+                results[user_id] = {"id": user_id, "status": "duplicate_id"}
+                pending.pop(user_id, None)
+            elif not fields or fields.keys() - {"username", "email"}:
+                results[user_id] = {"id": user_id, "status": "invalid_data"}
+            else:
+                pending[user_id] = fields
+
+        object_ids, invalid = parse_ids(pending)
+        for result in invalid:
+            results[result["id"]] = result
+            pending.pop(result["id"])
+
+        current = {
+            str(user["_id"]): user
+            for user in self.db.users.find(
+                {"_id": {"$in": list(object_ids.values())}}, {"username": 1, "email": 1}
+            )
+        }
+
+        operations = []
+        for user_id, fields in pending.items():
+            user = current.get(user_id)
+            if user is None:
+                results[user_id] = {"id": user_id, "status": "not_found"}
+            elif all(user.get(field) == value for field, value in fields.items()):
+                results[user_id] = {"id": user_id, "status": "unchanged"}
+            else:
+                results[user_id] = {"id": user_id, "status": "updated"}
+                operations.append((user_id, UpdateOne({"_id": object_ids[user_id]}, {"$set": fields})))
+
+        if operations:
+            try:
+                self.db.users.bulk_write([operation for _, operation in operations], ordered=False)
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    user_id = operations[error["index"]][0]
+                    status = "duplicate_email" if error.get("code") == _DUPLICATE_KEY else "error"
+                    results[user_id] = {"id": user_id, "status": status}
+
+        for user_id, _ in operations:
+            invalidate_user(user_id)
+        return list(results.values())
+
+    def delete_users(self, user_ids) -> List[Dict]:
+        object_ids, results = parse_ids(user_ids)
+        found = {
+            str(user["_id"])
+            for user in self.db.users.find({"_id": {"$in": list(object_ids.values())}}, {"_id": 1})
+        }
+        if found:
+            self.db.users.delete_many({"_id": {"$in": [object_ids[user_id] for user_id in found]}})
+
+        for user_id in object_ids:
+            if user_id in found:
+                invalidate_user(user_id)
+                results.append({"id": user_id, "status": "deleted"})
+            else:
+                results.append({"id": user_id, "status": "not_found"})
+        return results
+
+    def _after(self, after):
+        if after is None:
+            return {}
+        try:
+            return {"_id": {"$gt": ObjectId(after)}}
+        except (InvalidId, TypeError):
+            raise ValueError("Invalid cursor")
+
+    def list_users(self, after=None, limit=100) -> Tuple[List[Dict], str]:
+        # keyset pagination: each page is an index range scan from the last _id
+        users = list(
+            self.db.users.find(self._after(after), PUBLIC_FIELDS).sort("_id", ASCENDING).limit(limit + 1)
+        )
+        next_cursor = str(users[limit - 1]["_id"]) if len(users) > limit else None
+        return [public_user(user) for user in users[:limit]], next_cursor
+
+    def iter_users(self, after=None, batch_size=_CURSOR_BATCH) -> Iterator[Dict]:
+        cursor = self.db.users.find(self._after(after), PUBLIC_FIELDS).sort("_id", ASCENDING).batch_size(batch_size)
+        for user in cursor:
+            yield public_user(user)
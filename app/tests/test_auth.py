@@ -1,8 +1,13 @@
+import hashlib
 import pytest
 from unittest.mock import Mock, patch
 from datetime import timedelta, datetime
+from flask import Flask, g, jsonify
 from jose import jwt
-from app.services.auth import AuthService
+from pymongo.errors import DuplicateKeyError
+from app.core.auth_middleware import require_auth
+from app.core.config import Config
+from app.services.auth import AuthService, invalidate_user, token_cache
 from app.models.user import UserModel
 from app.schemas.auth import UserCreateSchema
 from pydantic import ValidationError
@@ -24,16 +29,18 @@ def test_register_new_user(mock_db, auth_service):
         password="strongpassword123"
     )
     mock_db.users.find_one.return_value = None
-    mock_insert_result = Mock()
-    mock_insert_result.inserted_id = "mock_user_id"
-    mock_db.users.insert_one.return_value = mock_insert_result
+    mock_db.users.update_one.return_value.upserted_id = "mock_user_id"
     auth_service.SECRET_KEY = secret_key_mock
 
     result = auth_service.register(user_data.model_dump())
 
     assert result == {"user_id": "mock_user_id"}
-    mock_db.users.find_one.assert_called_once_with({"email": user_data.email})
-    mock_db.users.insert_one.assert_called_once()
+    mock_db.users.find_one.assert_called_once_with({"email": user_data.email}, {"_id": 1})
+    query, update = mock_db.users.update_one.call_args[0]
+    assert query == {"email": user_data.email}
+    assert update["$setOnInsert"]["username"] == "testuser"
+    assert update["$setOnInsert"]["role"] == "user"
+    assert mock_db.users.update_one.call_args[1] == {"upsert": True}
 
 def test_register_existing_user(mock_db, auth_service):
     auth_service.SECRET_KEY = secret_key_mock
@@ -42,11 +49,28 @@ def test_register_existing_user(mock_db, auth_service):
         email="existing@example.com",
         password="strongpassword123"
     )
-    mock_db.users.find_one.return_value = {"email": user_data.email}
+    mock_db.users.find_one.return_value = {"_id": "507f1f77bcf86cd799439011"}
+
+    with patch("app.services.auth.hash_password") as hash_password, \
+            pytest.raises(ValueError, match="User with this email already exists"):
+        auth_service.register(user_data.model_dump())
+    hash_password.assert_not_called()
+    mock_db.users.update_one.assert_not_called()
+
+def test_register_loses_race_for_email(mock_db, auth_service):
+    auth_service.SECRET_KEY = secret_key_mock
+    user_data = UserCreateSchema(username="racer", email="race@example.com", password="strongpassword123")
+    mock_db.users.find_one.return_value = None
+    # another signup for the same email got in between the check and the upsert
+    mock_db.users.update_one.return_value.upserted_id = None
 
     with pytest.raises(ValueError, match="User with this email already exists"):
         auth_service.register(user_data.model_dump())
 
+    mock_db.users.update_one.side_effect = DuplicateKeyError("E11000 duplicate key error")
+    with pytest.raises(ValueError, match="User with this email already exists"):
+        auth_service.register(user_data.model_dump())
+
 def test_register_invalid_data(mock_db, auth_service):
     auth_service.SECRET_KEY = secret_key_mock
     with pytest.raises(ValidationError):
@@ -147,4 +171,89 @@ def test_token_expiration(auth_service):
     expired_token = jwt.encode(past_data, secret_key_mock, algorithm="HS256")
 
     with pytest.raises(ValueError, match="Invalid token"):
-        auth_service.verify_token(expired_token)
\ No newline at end of file
+        auth_service.verify_token(expired_token)
+
+def test_verify_claims_decodes_once(auth_service):
+    auth_service.SECRET_KEY = secret_key_mock
+    token = auth_service._create_token({"sub": "cached_user"}, timedelta(days=1))
+
+    with patch("app.services.auth.jwt.decode", wraps=jwt.decode) as decode:
+        assert auth_service.verify_claims(token)["sub"] == "cached_user"
+        assert auth_service.verify_token(token) == "cached_user"
+
+    decode.assert_called_once()
+
+def test_verify_claims_cache_respects_exp(auth_service):
+    auth_service.SECRET_KEY = secret_key_mock
+    token = auth_service._create_token({"sub": "short_lived"}, timedelta(seconds=2))
+
+    claims = auth_service.verify_claims(token)
+
+    key = hashlib.sha256(f"{secret_key_mock}\0{token}".encode("utf-8")).hexdigest()
+    assert token_cache._data[key][1] < claims["exp"] + 0.01
+
+def test_verify_claims_cache_is_per_secret(auth_service):
+    auth_service.SECRET_KEY = secret_key_mock
+    token = auth_service._create_token({"sub": "user_id"}, timedelta(days=1))
+    auth_service.verify_claims(token)
+
+    auth_service.SECRET_KEY = "another-secret"
+    with pytest.raises(ValueError, match="Invalid token"):
+        auth_service.verify_claims(token)
+
+@pytest.fixture
+def protected_app(mock_db):
+    app = Flask(__name__)
+
+    @app.route("/me")
+    @require_auth
+    def me():
+        return jsonify({"user_id": g.user_id})
+
+    @app.route("/profile")
+    @require_auth(load_user=True)
+    def profile():
+        return jsonify({"username": g.user["username"]})
+
+    with patch("app.core.auth_middleware.get_db", return_value=mock_db), \
+            patch("app.services.auth.Config.SECRET_KEY", secret_key_mock):
+        yield app.test_client()
+
+def bearer(user_id="507f1f77bcf86cd799439011", days=1):
+    token = jwt.encode({"sub": user_id, "exp": datetime.utcnow() + timedelta(days=days)}, secret_key_mock, algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+def test_require_auth_rejects_missing_and_invalid_tokens(protected_app):
+    assert protected_app.get("/me").status_code == 401
+    assert protected_app.get("/me", headers={"Authorization": "Basic abc"}).status_code == 401
+    assert protected_app.get("/me", headers={"Authorization": "Bearer not.a.token"}).status_code == 401
+    assert protected_app.get("/me", headers=bearer(days=-1)).status_code == 401
+
+def test_require_auth_sets_user_id(protected_app):
+    response = protected_app.get("/me", headers=bearer())
+
+    assert response.status_code == 200
+    assert response.get_json() == {"user_id": "507f1f77bcf86cd799439011"}
+
+def test_require_auth_loads_user(protected_app, mock_db):
+    mock_db.users.find_one.return_value = {"_id": "507f1f77bcf86cd799439011", "username": "testuser"}
+    assert protected_app.get("/profile", headers=bearer()).get_json() == {"username": "testuser"}
+    mock_db.users.find_one.assert_called_once()
+    assert mock_db.users.find_one.call_args[0][1] == {"hashed_password": 0}
+
+    mock_db.users.find_one.return_value = None
+    assert protected_app.get("/profile", headers=bearer()).status_code == 401
+
+def test_user_cache_is_used_and_invalidated(auth_service, mock_db):
+    user_id = "507f1f77bcf86cd799439012"
+    mock_db.users.find_one.return_value = {"_id": user_id, "username": "cached"}
+
+    with patch.object(Config, "AUTH_USER_CACHE_TTL", 60):
+        auth_service.get_user(user_id)
+        auth_service.get_user(user_id)
+        assert mock_db.users.find_one.call_count == 1
+
+        invalidate_user(user_id)
+        auth_service.get_user(user_id)
+        assert mock_db.users.find_one.call_count == 2
+    invalidate_user(user_id)
@@ -0,0 +1,140 @@
+import json
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+from flask import Flask
+from app.models.study import Study, serialize_studies
+from app.services.cache import MemoryCache, SQLiteCache, SQLiteConnections, create_cache
+from app.services.page_tokens import PageTokenCache
+from app.services.result_cache import SearchResultCache, HIT, MISS, STALE
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCache(max_size=2, ttl=60)
+    return SQLiteCache("test_cache", path=str(tmp_path / "cache.sqlite3"), max_size=2, ttl=60)
+
+def test_set_and_get(cache):
+    cache.set("a", {"value": 1})
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("missing") is None
+
+def test_lru_eviction(cache):
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+def test_ttl_expiry(cache):
+    with patch("app.services.cache.time.time", return_value=100):
+        cache.set("a", 1, ttl=10)
+    with patch("app.services.cache.time.time", return_value=111):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_delete_and_clear(cache):
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.delete("a")
+    assert cache.get("a") is None
+    cache.clear()
+    assert len(cache) == 0
+
+def test_sqlite_connections_per_thread_and_process(tmp_path):
+    setup = Mock()
+    connections = SQLiteConnections(str(tmp_path / "test.db"), ["CREATE TABLE IF NOT EXISTS t (x)"], setup=setup)
+    conn = connections()
+    others = []
+    thread = threading.Thread(target=lambda: others.append(connections()))
+    thread.start()
+    thread.join()
+
+    assert connections() is conn
+    assert others[0] is not conn
+    with patch("app.services.cache.os.getpid", return_value=-1):
+        assert connections() is not conn
+    assert setup.call_count == 3
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone() == (0,)
+
+def test_create_cache_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown cache backend"):
+        create_cache("test", max_size=1, backend="redis")
+
+def test_page_token_nearest():
+    tokens = PageTokenCache(MemoryCache(max_size=10))
+    key = tokens.query_key({"query.cond": "asthma", "pageSize": 3})
+    tokens.set(key, 2, "token-2")
+    tokens.set(key, 3, "token-3")
+
+    assert tokens.nearest(key, 3) == (3, "token-3")
+    assert tokens.nearest(key, 5) == (3, "token-3")
+    assert tokens.nearest(key, 1) == (1, None)
+
+def test_page_token_cache_keeps_injected_empty_backend(tmp_path):
+    backend = SQLiteCache("page_tokens", path=str(tmp_path / "cache.sqlite3"))
+    tokens = PageTokenCache(backend)
+    tokens.set("query", 2, "token-2")
+
+    assert tokens.backend is backend
+    assert backend.get("query:2") == "token-2"
+
+def test_page_token_query_key_is_order_independent():
+    assert PageTokenCache.query_key({"a": 1, "b": 2}) == PageTokenCache.query_key({"b": 2, "a": 1})
+
+@pytest.fixture
+def result_cache():
+    return SearchResultCache(MemoryCache(max_size=10), ttl=10, stale_ttl=100)
+
+def test_result_cache_miss_then_hit(result_cache):
+    compute = Mock(return_value=["study"])
+
+    assert result_cache.get_or_compute("key", compute) == (["study"], MISS)
+    assert result_cache.get_or_compute("key", compute) == (["study"], HIT)
+    compute.assert_called_once()
+    assert result_cache.stats()["hit_rate"] == 0.5
+
+def test_result_cache_serves_stale_and_refreshes(result_cache):
+    with patch("app.services.result_cache.time.time", return_value=100):
+        result_cache.store("key", ["old"])
+
+    refreshed = threading.Event()
+    def compute():
+        refreshed.set()
+        return ["new"]
+
+    with Flask(__name__).app_context(), patch("app.services.result_cache.time.time", return_value=120):
+        assert result_cache.get_or_compute("key", compute) == (["old"], STALE)
+
+        assert refreshed.wait(1)
+        for _ in range(100):
+            if not result_cache._refreshing:
+                break
+            time.sleep(0.01)
+        assert result_cache.get_or_compute("key", compute) == (["new"], HIT)
+
+def test_result_cache_key_is_canonical():
+    first = SearchResultCache.make_key({"filter.overallStatus": ["RECRUITING", "COMPLETED"], "x": None}, 1, 3, "pt")
+    second = SearchResultCache.make_key({"filter.overallStatus": ["COMPLETED", "RECRUITING"]}, 1, 3, "pt")
+    assert first == second
+    assert first != SearchResultCache.make_key({"filter.overallStatus": ["COMPLETED", "RECRUITING"]}, 2, 3, "pt")
+    assert first != SearchResultCache.make_key({"filter.overallStatus": ["COMPLETED", "RECRUITING"]}, 1, 3, "en")
+
+def test_result_cache_keeps_encoded_body(cache):
+    result_cache = SearchResultCache(cache, ttl=10, stale_ttl=100)
+    study = Study.from_api({"protocolSection": {"identificationModule": {"nctId": "NCT1", "briefTitle": "Asthma"}}})
+    compute = Mock(return_value=[study])
+
+    body, status = result_cache.get_or_compute_encoded("key", compute)
+    again, again_status = result_cache.get_or_compute_encoded("key", compute)
+
+    assert (status, again_status) == (MISS, HIT)
+    assert json.loads(body.body) == serialize_studies([study])
+    assert again.etag() == body.etag()
+    assert again.encoded("gzip") is result_cache.lookup_encoded("key")[0].encoded("gzip")
+    compute.assert_called_once()
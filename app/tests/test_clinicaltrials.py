@@ -0,0 +1,86 @@
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.services.clinicaltrials import ClinicalTrialsClient, client_stats, _create_session
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # statuses to answer with, in order; the last one repeats
+    statuses = [200]
+    calls = []
+
+    def do_GET(self):
+        StubHandler.calls.append(self.path)
+        index = min(len(StubHandler.calls), len(StubHandler.statuses)) - 1
+        status = StubHandler.statuses[index]
+        body = json.dumps({"studies": [], "status": status}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    StubHandler.calls = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/api/v2/studies"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def client(stub_server):
+    client_stats.reset()
+    return ClinicalTrialsClient(
+        base_url=stub_server,
+        max_retries=2,
+        backoff_factor=0,
+        session=_create_session(pool_maxsize=2),
+    )
+
+def test_get_studies_success(client):
+    StubHandler.statuses = [200]
+    response = client.get_studies({"format": "json", "query.cond": "asthma"})
+
+    assert response.status_code == 200
+    assert response.json()["studies"] == []
+    assert "query.cond=asthma" in StubHandler.calls[0]
+    assert client_stats.stats()["requests"] == 1
+
+def test_get_studies_retries_on_server_error(client):
+    StubHandler.statuses = [503, 429, 200]
+    response = client.get_studies({"format": "json"})
+
+    assert response.status_code == 200
+    assert len(StubHandler.calls) == 3
+    stats = client_stats.stats()
+    assert stats["retries"] == 2
+    assert stats["errors"] == 0
+
+def test_get_studies_gives_up_after_max_retries(client):
+    StubHandler.statuses = [500]
+    response = client.get_studies({"format": "json"})
+
+    assert response.status_code == 500
+    assert len(StubHandler.calls) == 3
+    assert client_stats.stats()["errors"] == 1
+
+def test_get_studies_does_not_retry_client_error(client):
+    StubHandler.statuses = [400]
+    response = client.get_studies({"format": "json"})
+
+    assert response.status_code == 400
+    assert len(StubHandler.calls) == 1
+
+def test_backoff_is_bounded(client):
+    client.backoff_factor = 1
+    client.backoff_max = 2
+    for attempt in range(6):
+        assert 0 <= client.backoff(attempt) <= 2
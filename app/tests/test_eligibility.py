@@ -0,0 +1,100 @@
+from unittest.mock import Mock, patch
+from app.models.study import Study
+from app.schemas.search import PacienteSearch
+from app.models.eligibility import Eligibility, age_in_years, normalize_sex, split_criteria
+from app.services.eligibility import filter_eligible, matches
+from app.services.search import SearchService
+
+CRITERIA = """Inclusion Criteria:
+
+* Age 18 or older
+* Diagnosis of asthma for at least
+  6 months
+1. Able to consent
+
+Exclusion Criteria:
+
+* Pregnancy
+* Current smoker"""
+
+
+def make_study(nct_id, sex="ALL", minimum_age=None, maximum_age=None):
+    eligibility_module = {"sex": sex}
+    if minimum_age:
+        eligibility_module["minimumAge"] = minimum_age
+    if maximum_age:
+        eligibility_module["maximumAge"] = maximum_age
+    return Study.from_api({"protocolSection": {
+        "identificationModule": {"nctId": nct_id},
+        "eligibilityModule": eligibility_module,
+    }})
+
+def test_age_in_years():
+    assert age_in_years("18 Years") == 18.0
+    assert age_in_years("6 Months") == 0.5
+    assert age_in_years("30") == 30.0
+    assert age_in_years("N/A") is None
+    assert age_in_years(None) is None
+
+def test_normalize_sex():
+    assert normalize_sex("female") == "FEMALE"
+    assert normalize_sex("Masculino") == "MALE"
+    assert normalize_sex("ALL") == "ALL"
+    assert normalize_sex("other") is None
+    assert normalize_sex(None) is None
+
+def test_split_criteria():
+    inclusion, exclusion = split_criteria(CRITERIA)
+
+    assert inclusion == ["Age 18 or older", "Diagnosis of asthma for at least 6 months", "Able to consent"]
+    assert exclusion == ["Pregnancy", "Current smoker"]
+    assert split_criteria("Adults with asthma") == (["Adults with asthma"], [])
+    assert split_criteria(None) == ([], [])
+
+def test_eligibility_from_api():
+    eligibility = Eligibility.from_api({
+        "sex": "FEMALE", "minimumAge": "6 Months", "maximumAge": "17 Years", "eligibilityCriteria": CRITERIA,
+    })
+
+    assert (eligibility.min_age, eligibility.max_age, eligibility.sex) == (0.5, 17.0, "FEMALE")
+    assert eligibility.sections()[1] == ["Pregnancy", "Current smoker"]
+    assert Eligibility.from_api({}).sex == "ALL"
+
+def test_matches():
+    eligibility = Eligibility.from_api({"sex": "FEMALE", "minimumAge": "18 Years", "maximumAge": "65 Years"})
+
+    assert matches(eligibility, 18, "FEMALE")
+    assert matches(eligibility, 65)
+    assert matches(eligibility, sex="ALL")
+    assert not matches(eligibility, 17.9)
+    assert not matches(eligibility, 66, "FEMALE")
+    assert not matches(eligibility, 30, "MALE")
+    assert matches(Eligibility.from_api({}), 0.1, "MALE")
+    assert matches(None, 30, "MALE")
+
+def test_filter_eligible_keeps_order():
+    studies = [make_study("NCT1", maximum_age="12 Years"), make_study("NCT2"), make_study("NCT3", sex="MALE")]
+
+    assert [study.nct_id for study in filter_eligible(studies, 8, "MALE")] == ["NCT1", "NCT2", "NCT3"]
+    assert [study.nct_id for study in filter_eligible(studies, 30, "FEMALE")] == ["NCT2"]
+
+def test_build_params_sends_sex_as_search_area():
+    params = SearchService.build_params(PacienteSearch(condition="asthma", age="30", sex="female"))
+
+    assert "eligibilityModule.sex" not in params
+    assert params["filter.advanced"] == (
+        "AREA[MinimumAge]RANGE[MIN, 30] AND AREA[MaximumAge]RANGE[30, MAX] AND (AREA[Sex]FEMALE OR AREA[Sex]ALL)"
+    )
+
+def test_process_studies_filters_on_eligibility():
+    studies = [
+        make_study("NCT1", minimum_age="18 Years"),
+        make_study("NCT2", sex="MALE"),
+        make_study("NCT3", maximum_age="12 Years"),
+    ]
+    with patch("app.services.search.TranslateService"):
+        service = SearchService(client=Mock())
+
+    result = service.process_studies(studies, PacienteSearch(age="30", sex="F"))
+
+    assert [study.nct_id for study in result] == ["NCT1"]
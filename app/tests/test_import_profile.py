@@ -0,0 +1,42 @@
+import subprocess
+import sys
+from unittest.mock import patch
+from app.core.import_profile import check_startup, parse_importtime, _PROJECT_ROOT
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _heapq
+import time:       300 |        420 |   heapq
+import time:      2000 |       2420 | requests
+import time:       500 |        500 |   pymongo
+import time:      1000 |       1500 | app.services.auth
+import time:       800 |       2300 | app.main
+"""
+
+
+def test_parse_importtime_links_parents():
+    timings = {t.name: t for t in parse_importtime(IMPORTTIME)}
+
+    assert timings["requests"].cumulative_ms == 2.42
+    assert timings["heapq"].parent == "requests"
+    assert timings["_heapq"].parent == "heapq"
+    assert timings["pymongo"].parent == "app.services.auth"
+    assert timings["app.main"].parent is None
+
+def test_check_startup_fails_over_budget():
+    lines = []
+    with patch("app.core.import_profile.profile_imports", return_value=(120.0, parse_importtime(IMPORTTIME))):
+        assert check_startup(budget_ms=200, echo=lines.append)
+        assert not check_startup(budget_ms=100, echo=lines.append)
+
+    assert any(line.startswith("pymongo") and line.endswith("app.services.auth") for line in lines)
+    assert "OVER BUDGET" in lines[-1]
+
+def test_app_import_leaves_heavy_libraries_unloaded():
+    code = (
+        "import sys, app.main; "
+        "print(','.join(m for m in ('google.cloud.translate_v2', 'passlib', 'apscheduler') if m in sys.modules))"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], cwd=_PROJECT_ROOT, capture_output=True, text=True)
+
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == ""
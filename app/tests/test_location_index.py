@@ -0,0 +1,82 @@
+from app.models.study import Location, Study
+from app.services.location_index import LocationIndex, normalize
+
+
+def make_study(nct_id, *locations):
+    study = Study.from_api({"protocolSection": {"identificationModule": {"nctId": nct_id}}})
+    study.locations = [Location("Site", city, state, country, status) for city, state, country, status in locations]
+    return study
+
+def test_normalize():
+    assert normalize("  São   Paulo ") == "sao paulo"
+    assert normalize("MONTRÉAL") == "montreal"
+    assert normalize("NOT_YET_RECRUITING") == "not yet recruiting"
+    assert normalize(None) == ""
+
+def test_filter_is_accent_and_case_insensitive():
+    studies = [make_study("NCT1", ("São Paulo", "SP", "Brazil", "RECRUITING"))]
+
+    assert LocationIndex(studies).filter("sao paulo") == studies
+
+def test_filter_keeps_matching_sites_only():
+    study = make_study(
+        "NCT1",
+        ("Boston", "Massachusetts", "United States", "COMPLETED"),
+        ("São Paulo", "SP", "Brazil", "RECRUITING"),
+        ("Sao Paulo", "SP", "Brazil", "NOT_YET_RECRUITING"),
+    )
+
+    result = LocationIndex([study]).filter("São Paulo", ["RECRUITING", "NOT_YET_RECRUITING"])
+
+    assert result == [study]
+    assert [loc.status for loc in study.locations] == ["RECRUITING", "NOT_YET_RECRUITING"]
+
+def test_filter_by_status_does_not_skip_studies():
+    studies = [
+        make_study("NCT1", ("Boston", "MA", "United States", "COMPLETED")),
+        make_study("NCT2", ("Boston", "MA", "United States", "COMPLETED")),
+        make_study("NCT3", ("Boston", "MA", "United States", "RECRUITING")),
+    ]
+
+    result = LocationIndex(studies).filter("Boston", ["RECRUITING"])
+
+    assert [study.nct_id for study in result] == ["NCT3"]
+
+def test_filter_uses_state_and_country_parts():
+    studies = [
+        make_study("NCT1", ("Portland", "Oregon", "United States", "RECRUITING")),
+        make_study("NCT2", ("Portland", "Maine", "United States", "RECRUITING")),
+    ]
+
+    result = LocationIndex(studies).filter("Portland, Maine")
+
+    assert [study.nct_id for study in result] == ["NCT2"]
+
+def test_filter_matches_state_abbreviations():
+    studies = [
+        make_study("NCT1", ("Houston", "Texas", "United States", "RECRUITING")),
+        make_study("NCT2", ("New York", "New York", "United States", "RECRUITING")),
+        make_study("NCT3", ("São Paulo", "São Paulo", "Brazil", "RECRUITING")),
+        make_study("NCT4", ("Boston", "MA", "United States", "RECRUITING")),
+    ]
+
+    assert [study.nct_id for study in LocationIndex(studies).filter("Houston, TX")] == ["NCT1"]
+    assert [study.nct_id for study in LocationIndex(studies).filter("New York, NY")] == ["NCT2"]
+    assert [study.nct_id for study in LocationIndex(studies).filter("São Paulo, SP")] == ["NCT3"]
+    assert [study.nct_id for study in LocationIndex(studies).filter("Boston, Massachusetts")] == ["NCT4"]
+
+def test_filter_matches_country_aliases():
+    studies = [
+        make_study("NCT1", ("Recife", "Pernambuco", "Brazil", "RECRUITING")),
+        make_study("NCT2", ("Cambridge", "Massachusetts", "United States", "RECRUITING")),
+        make_study("NCT3", ("Cambridge", "", "United Kingdom", "RECRUITING")),
+    ]
+
+    assert [study.nct_id for study in LocationIndex(studies).filter("Recife, PE, Brasil")] == ["NCT1"]
+    assert [study.nct_id for study in LocationIndex(studies).filter("Cambridge, UK")] == ["NCT3"]
+    assert [study.nct_id for study in LocationIndex(studies).filter("Cambridge, EUA")] == ["NCT2"]
+
+def test_unrecognised_region_falls_back_to_city():
+    studies = [make_study("NCT1", ("Houston", "Texas", "United States", "RECRUITING"))]
+
+    assert LocationIndex(studies).filter("Houston, Tejas") == studies
@@ -0,0 +1,102 @@
+import pytest
+from unittest.mock import patch
+from flask import Flask
+from app.core import metrics
+from app.core.metrics import Counter, Histogram, MetricsRegistry, init_metrics, span, stage_seconds
+
+DEAD_PID = 2 ** 22 + 1
+
+
+def make_registry(directory=""):
+    registry = MetricsRegistry(directory=directory, flush_interval=60)
+    counter = Counter("test_requests_total", "Requests", ["outcome"], registry=registry)
+    histogram = Histogram("test_seconds", "Latency", buckets=(0.1, 1.0), registry=registry)
+    return registry, counter, histogram
+
+def test_render_counters_and_histograms():
+    registry, counter, histogram = make_registry()
+    counter.inc(outcome="ok")
+    counter.inc(2, outcome="ok")
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    text = registry.render()
+
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{outcome="ok"} 3.0' in text
+    assert 'test_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_seconds_bucket{le="1.0"} 2' in text
+    assert 'test_seconds_bucket{le="+Inf"} 3' in text
+    assert "test_seconds_count 3" in text
+    assert "test_seconds_sum 5.55" in text
+
+def test_labels_must_match():
+    _, counter, _ = make_registry()
+
+    with pytest.raises(ValueError):
+        counter.inc(status="ok")
+
+def test_workers_are_summed_and_dead_workers_lose_their_gauges(tmp_path):
+    dead, dead_counter, dead_histogram = make_registry(str(tmp_path))
+    dead.add_collector("pool", lambda: {"in_flight": 4, "nested": {"max_ms": 2.5}, "name": "skipped"})
+    dead_counter.inc(outcome="ok")
+    dead_histogram.observe(0.5)
+    with patch("app.core.metrics.os.getpid", return_value=DEAD_PID):
+        dead.flush(force=True)
+
+    live, live_counter, live_histogram = make_registry(str(tmp_path))
+    live.add_collector("pool", lambda: {"in_flight": 1})
+    live_counter.inc(2, outcome="ok")
+    live_histogram.observe(0.05)
+
+    text = live.render()
+
+    assert 'test_requests_total{outcome="ok"} 3.0' in text
+    assert "test_seconds_count 2" in text
+    assert 'test_seconds_bucket{le="0.1"} 1' in text
+    assert f'app_pool_in_flight{{worker="{metrics.os.getpid()}"}} 1.0' in text
+    assert str(DEAD_PID) not in text
+    assert "app_pool_name" not in text
+
+def test_flush_is_rate_limited(tmp_path):
+    registry, counter, _ = make_registry(str(tmp_path))
+    registry.flush()
+    counter.inc(outcome="ok")
+    registry.flush()
+
+    other, _, _ = make_registry("")
+    other.directory = str(tmp_path)
+    with patch.object(other, "flush"):
+        snapshots = other.collect()
+
+    assert [s["metrics"]["test_requests_total"]["values"] for s in snapshots] == [[]]
+
+def test_span_records_stage():
+    before = stage_seconds.count(stage="test.stage")
+
+    with span("test.stage"):
+        pass
+
+    assert stage_seconds.count(stage="test.stage") == before + 1
+
+def test_requests_timed_and_exposed():
+    from app.api.endpoints.metrics import metrics_bp
+
+    app = Flask(__name__)
+    init_metrics(app)
+    app.register_blueprint(metrics_bp, url_prefix='/metrics')
+
+    @app.route('/items/<item_id>')
+    def item(item_id):
+        return 'ok'
+
+    client = app.test_client()
+    client.get('/items/1')
+    client.get('/items/2')
+    response = client.get('/metrics')
+
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    assert 'app_http_request_duration_seconds_count{method="GET",route="/items/<item_id>",status="200"}' in text
+    assert "app_translation_memory_misses" in text
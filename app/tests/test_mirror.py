@@ -0,0 +1,141 @@
+import io
+import json
+import pytest
+from unittest.mock import Mock, patch
+from flask import Flask
+from app.schemas.search import PacienteSearch
+from app.services.cache import MemoryCache
+from app.services.mirror import MirrorSync, TrialMirror, fts_match
+from app.services.page_tokens import PageTokenCache
+from app.services.search import SearchService
+
+
+def make_study(n, title, condition="Asthma", status="RECRUITING", updated="2024-01-01",
+               sex="ALL", minimum_age="18 Years", maximum_age=None, city="São Paulo"):
+    eligibility = {"sex": sex, "minimumAge": minimum_age, "eligibilityCriteria": "Adults"}
+    if maximum_age:
+        eligibility["maximumAge"] = maximum_age
+    return {"protocolSection": {
+        "identificationModule": {"nctId": f"NCT{n:08d}", "briefTitle": title},
+        "statusModule": {"overallStatus": status, "lastUpdatePostDateStruct": {"date": updated}},
+        "conditionsModule": {"conditions": [condition]},
+        "eligibilityModule": eligibility,
+        "contactsLocationsModule": {"locations": [
+            {"facility": "Hospital", "city": city, "country": "Brazil", "status": status},
+        ]},
+    }}
+
+def make_response(studies, next_page_token=None):
+    body = {"studies": studies}
+    if next_page_token:
+        body["nextPageToken"] = next_page_token
+    response = Mock()
+    response.status_code = 200
+    response.raw = io.BytesIO(json.dumps(body).encode())
+    return response
+
+@pytest.fixture
+def mirror(tmp_path):
+    mirror = TrialMirror(str(tmp_path / "mirror.sqlite3"))
+    mirror.ingest([
+        make_study(1, "Inhaled steroids in asthma", updated="2024-01-01"),
+        make_study(2, "Metformin for diabetes", condition="Diabetes", status="COMPLETED", updated="2024-03-01"),
+        make_study(3, "Asthma in children", sex="FEMALE", minimum_age="6 Months", maximum_age="12 Years",
+                   updated="2024-02-01", city="Lyon"),
+    ])
+    return mirror
+
+def test_fts_match_quotes_user_input():
+    assert fts_match("cond", 'asthma OR "x"') == '{cond} : ("asthma" "OR" "x")'
+    assert fts_match("cond", "!!") is None
+
+def test_ingest_upserts(mirror):
+    assert mirror.count() == 3
+    mirror.ingest([make_study(1, "Renamed")])
+    assert mirror.count() == 3
+    assert [s.title for s in mirror.search(PacienteSearch(keywords="renamed"))] == ["Renamed"]
+
+def test_search_full_text_ignores_accents(mirror):
+    result = mirror.search(PacienteSearch(condition="asthma"))
+    assert {s.nct_id for s in result} == {"NCT00000001", "NCT00000003"}
+
+    result = mirror.search(PacienteSearch(location="sao paulo"))
+    assert {s.nct_id for s in result} == {"NCT00000001", "NCT00000002"}
+
+def test_search_filters(mirror):
+    assert [s.nct_id for s in mirror.search(PacienteSearch(status=["COMPLETED"]))] == ["NCT00000002"]
+    assert [s.nct_id for s in mirror.search(PacienteSearch(condition="asthma", age="40"))] == ["NCT00000001"]
+    assert [s.nct_id for s in mirror.search(PacienteSearch(condition="asthma", age="8", sex="female"))] == [
+        "NCT00000003"
+    ]
+    assert mirror.search(PacienteSearch(condition="asthma", age="8", sex="male")) is None
+    assert [s.nct_id for s in mirror.search(PacienteSearch(condition="asthma", age="30", sex="male"))] == [
+        "NCT00000001"
+    ]
+
+def test_age_and_sex_use_the_eligibility_index(mirror):
+    conn = mirror._connection()
+    for sex in ("'ALL', 'FEMALE'", "'ALL', 'FEMALE', 'MALE'"):
+        plan = " ".join(row[-1] for row in conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT s.id FROM studies s WHERE s.sex IN ({sex}) AND s.min_age <= 8 AND s.max_age >= 8"
+        ))
+        assert "studies_eligibility" in plan
+    assert [s.nct_id for s in mirror.search(PacienteSearch(age="8"))] == ["NCT00000003"]
+
+def test_open_age_limits_from_older_mirrors_are_migrated(tmp_path):
+    path = str(tmp_path / "mirror.sqlite3")
+    mirror = TrialMirror(path)
+    mirror.ingest([make_study(1, "Asthma", minimum_age=None)])
+    conn = mirror._connection()
+    conn.execute("UPDATE studies SET min_age = NULL, max_age = NULL")
+    conn.execute("PRAGMA user_version = 0")
+
+    migrated = TrialMirror(path)
+    assert migrated._connection().execute("SELECT min_age, max_age FROM studies").fetchone() == (0.0, float("inf"))
+    assert [s.nct_id for s in migrated.search(PacienteSearch(age="90", sex="male"))] == ["NCT00000001"]
+
+def test_search_pages_by_last_update(mirror):
+    assert [s.nct_id for s in mirror.search(PacienteSearch(), page_size=2)] == ["NCT00000002", "NCT00000003"]
+    assert [s.nct_id for s in mirror.search(PacienteSearch(), page_size=2, page=2)] == ["NCT00000001"]
+
+def test_search_miss_returns_none(mirror):
+    assert mirror.search(PacienteSearch(condition="zzzz")) is None
+    assert mirror.search(PacienteSearch(condition="asthma", pageToken="abc")) is None
+
+def test_sync_is_incremental(tmp_path):
+    mirror = TrialMirror(str(tmp_path / "mirror.sqlite3"))
+    client = Mock()
+    client.get_studies.side_effect = [
+        make_response([make_study(1, "One", updated="2024-01-01")], next_page_token="next"),
+        make_response([make_study(2, "Two", updated="2024-02-01")]),
+    ]
+
+    assert MirrorSync(mirror, client=client, page_size=1).sync() == 2
+    assert mirror.count() == 2
+    assert mirror.get_state("last_update") == "2024-02-01"
+    first_params = client.get_studies.call_args_list[0][0][0]
+    assert "filter.advanced" not in first_params
+
+    client.get_studies.side_effect = [make_response([make_study(3, "Three", updated="2024-03-01")])]
+    MirrorSync(mirror, client=client, page_size=1).sync()
+    params = client.get_studies.call_args[0][0]
+    assert params["filter.advanced"] == "AREA[LastUpdatePostDate]RANGE[2024-02-01,MAX]"
+    assert mirror.count() == 3
+    assert mirror.get_state("last_update") == "2024-03-01"
+
+def test_search_service_prefers_mirror(mirror):
+    client = Mock()
+    client.get_studies.side_effect = lambda params, stream=False: make_response([make_study(9, "Upstream")])
+    with patch("app.services.search.TranslateService"):
+        service = SearchService(
+            client=client, page_tokens=PageTokenCache(MemoryCache(max_size=10)), mirror=mirror
+        )
+
+    with Flask(__name__).app_context():
+        result = service.search_paciente(PacienteSearch(condition="asthma", location="Lyon"))
+        assert [s.nct_id for s in result] == ["NCT00000003"]
+        client.get_studies.assert_not_called()
+
+        result = service.search_paciente(PacienteSearch(condition="zzzz"))
+        assert [s.title for s in result] == ["Upstream"]
+        client.get_studies.assert_called_once()
@@ -0,0 +1,69 @@
+import pytest
+from unittest.mock import MagicMock, Mock, patch
+from app.db import mongo_client
+from app.db.indexes import ensure_indexes
+from app.services import registry
+
+
+@pytest.fixture(autouse=True)
+def reset_client():
+    registry.discard("mongo_client")
+    mongo_client.pool_listener.reset()
+    yield
+    registry.discard("mongo_client")
+
+def test_get_db_reuses_client():
+    with patch("app.db.mongo_client.MongoClient") as mock_client:
+        first = mongo_client.get_db()
+        second = mongo_client.get_db()
+
+    mock_client.assert_called_once()
+    assert first is second
+
+def test_client_uses_pool_settings():
+    with patch("app.db.mongo_client.MongoClient") as mock_client:
+        mongo_client.get_client()
+
+    kwargs = mock_client.call_args.kwargs
+    assert kwargs["maxPoolSize"] == mongo_client.Config.MONGO_MAX_POOL_SIZE
+    assert kwargs["waitQueueTimeoutMS"] == mongo_client.Config.MONGO_WAIT_QUEUE_TIMEOUT_MS
+    assert kwargs["connect"] is False
+
+def test_client_rebuilt_in_forked_child():
+    with patch("app.db.mongo_client.MongoClient") as mock_client:
+        mongo_client.get_client()
+        registry._reset_after_fork()
+        mongo_client.get_client()
+
+    assert mock_client.call_count == 2
+
+def test_close_client():
+    with patch("app.db.mongo_client.MongoClient") as mock_client:
+        mongo_client.get_client()
+        mongo_client.close_client()
+        mongo_client.get_client()
+
+    mock_client.return_value.close.assert_called_once()
+    assert mock_client.call_count == 2
+
+def test_pool_checkout_stats():
+    listener = mongo_client.pool_listener
+    listener.connection_check_out_started(Mock())
+    listener.connection_checked_out(Mock())
+    listener.connection_check_out_started(Mock())
+    listener.connection_check_out_failed(Mock())
+
+    stats = mongo_client.get_pool_stats()
+    assert stats["checkouts"] == 1
+    assert stats["failures"] == 1
+    assert stats["max_wait_ms"] >= 0
+
+def test_ensure_indexes_declares_unique_email():
+    db = MagicMock()
+    db.__getitem__.return_value.create_indexes.return_value = ["email_unique"]
+
+    assert ensure_indexes(db) == ["email_unique"]
+
+    db.__getitem__.assert_called_once_with("users")
+    (indexes,), _ = db.__getitem__.return_value.create_indexes.call_args
+    assert indexes[0].document == {"key": {"email": 1}, "name": "email_unique", "unique": True}
@@ -0,0 +1,90 @@
+import pytest
+from unittest.mock import Mock
+from flask import Flask
+from app.services.mirror import TrialMirror
+from app.services.pretranslated import PreTranslatedStore
+from app.services.pretranslator import PreTranslator
+from app.services.translate import TranslateService
+from app.services.translation_memory import TranslationMemory
+from app.tests.test_mirror import make_study
+
+
+def fake_translate(texts, target_language):
+    return [{"translatedText": f"{target_language}:{text}"} for text in texts]
+
+@pytest.fixture
+def app_context():
+    with Flask(__name__).app_context():
+        yield
+
+@pytest.fixture
+def store(tmp_path):
+    return PreTranslatedStore(str(tmp_path / "pretranslated.sqlite3"))
+
+@pytest.fixture
+def translate_service(store):
+    translator = Mock()
+    translator.translate.side_effect = fake_translate
+    service = TranslateService(memory=TranslationMemory(path="", memory_size=100), translator=translator, store=store)
+    service.batcher.backoff_factor = 0
+    return service
+
+@pytest.fixture
+def mirror(tmp_path):
+    mirror = TrialMirror(str(tmp_path / "mirror.sqlite3"))
+    mirror.ingest([make_study(n, f"Study {n}", updated=f"2024-01-0{n}") for n in range(1, 6)])
+    return mirror
+
+def fresh(mirror):
+    return [study for _, study in mirror.studies_after(limit=100)]
+
+def test_hit_needs_no_translation_calls(app_context, translate_service, store, mirror):
+    translate_service.translate_studies(fresh(mirror), "pt")
+    translate_service.translator.translate.reset_mock()
+    # a cold translation memory, so only the store can answer
+    translate_service.memory = TranslationMemory(path="", memory_size=100)
+
+    studies = translate_service.translate_studies(fresh(mirror), "pt")
+
+    translate_service.translator.translate.assert_not_called()
+    assert studies[0].title == "pt:Study 1"
+    assert studies[0].conditions == ["pt:Asthma"]
+    assert studies[0].locations[0].city == "São Paulo"
+    assert store.stats() == {"hits": 5, "misses": 5}
+
+def test_changed_text_misses(app_context, translate_service, store, mirror):
+    translate_service.translate_studies(fresh(mirror), "pt")
+    mirror.ingest([make_study(1, "Study 1, revised", updated="2024-02-01")])
+
+    missing = store.apply(fresh(mirror), "pt")
+
+    assert [study.nct_id for study in missing] == ["NCT00000001"]
+    assert store.apply(fresh(mirror), "es") != []
+
+def test_partial_translations_are_not_stored(app_context, translate_service, store, mirror):
+    def flaky_translate(texts, target_language):
+        if "Study 1" in texts:
+            raise RuntimeError("quota exceeded")
+        return fake_translate(texts, target_language)
+
+    translate_service.translator.translate.side_effect = flaky_translate
+    translate_service.batcher.max_items = 1
+
+    studies = translate_service.translate_studies(fresh(mirror), "pt")
+
+    assert studies[0].title == "Study 1"
+    assert set(store.current(studies, "pt")) == {"NCT00000002", "NCT00000003", "NCT00000004", "NCT00000005"}
+
+def test_pretranslator_resumes(app_context, translate_service, store, mirror):
+    pretranslator = PreTranslator(mirror, translate_service, batch_size=2)
+
+    assert pretranslator.run("pt") == 5
+    assert store.get_state("cursor:pt") == '["2024-01-05", 5]'
+    translate_service.translator.translate.reset_mock()
+
+    assert pretranslator.run("pt") == 0
+    translate_service.translator.translate.assert_not_called()
+
+    mirror.ingest([make_study(2, "Study 2, revised", updated="2024-02-01"), make_study(6, "Study 6", updated="2024-02-02")])
+    assert pretranslator.run("pt") == 2
+    assert pretranslator.run("pt", full=True) == 0
@@ -0,0 +1,42 @@
+import pytest
+from unittest.mock import Mock, patch
+from app.services import registry
+
+
+@pytest.fixture(autouse=True)
+def reset_services():
+    registry.reset_services()
+    with patch("app.services.translate.TranslateService") as translate_service, \
+            patch("app.services.search.SearchService") as search_service:
+        yield translate_service, search_service
+    registry.reset_services()
+
+def test_services_built_once_and_shared(reset_services):
+    translate_service, search_service = reset_services
+
+    first = registry.get_search_service()
+    second = registry.get_search_service()
+
+    assert first is second
+    search_service.assert_called_once_with(translate_service=translate_service.return_value)
+    assert registry.get_translate_service() is translate_service.return_value
+    translate_service.assert_called_once()
+
+def test_services_rebuilt_in_forked_child(reset_services):
+    translate_service, search_service = reset_services
+
+    registry.get_search_service()
+    registry._reset_after_fork()
+    registry.get_search_service()
+
+    assert search_service.call_count == 2
+    assert translate_service.call_count == 2
+
+def test_discard_forgets_an_instance():
+    build = Mock(side_effect=lambda: object())
+
+    first = registry.get("client", build)
+    assert registry.get("client", build) is first
+    assert registry.discard("client") is first
+    assert registry.get("client", build) is not first
+    assert registry.discard("missing") is None
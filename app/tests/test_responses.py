@@ -0,0 +1,70 @@
+import gzip
+import json
+import brotli
+import pytest
+from unittest.mock import Mock, patch
+from flask import Flask
+from app.api.endpoints.search import search_bp
+from app.core.responses import EncodedBody
+from app.services.result_cache import HIT
+
+PAYLOAD = [{"NCT ID": f"NCT{n}", "Description": "Long translated description " * 20} for n in range(5)]
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(search_bp, url_prefix='/search')
+    search_service = Mock()
+    search_service.search_paciente_encoded.return_value = (EncodedBody.from_data(PAYLOAD), HIT)
+    with patch("app.api.endpoints.search.get_search_service", return_value=search_service):
+        yield app.test_client()
+
+def search(client, **headers):
+    return client.post('/search/paciente', json={"query.cond": "asthma"}, headers=headers)
+
+def test_etag_is_a_content_hash():
+    assert EncodedBody.from_data(PAYLOAD).etag() == EncodedBody.from_data(json.loads(json.dumps(PAYLOAD))).etag()
+    assert EncodedBody.from_data(PAYLOAD).etag() != EncodedBody.from_data(PAYLOAD[:1]).etag()
+
+def test_compressed_once_per_encoding():
+    body = EncodedBody.from_data(PAYLOAD)
+
+    assert body.encoded("gzip") is body.encoded("gzip")
+    assert gzip.decompress(body.encoded("gzip")) == body.body
+
+def test_uncompressed_without_accept_encoding(client):
+    response = search(client)
+
+    assert response.status_code == 200
+    assert response.headers.get("Content-Encoding") is None
+    assert response.get_json() == PAYLOAD
+    assert response.headers["X-Cache"] == HIT
+
+def test_brotli_preferred_over_gzip(client):
+    response = search(client, **{"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert json.loads(brotli.decompress(response.get_data())) == PAYLOAD
+
+    response = search(client, **{"Accept-Encoding": "gzip"})
+    assert json.loads(gzip.decompress(response.get_data())) == PAYLOAD
+
+def test_small_bodies_not_compressed(client):
+    with patch("app.core.responses.Config.RESPONSE_COMPRESS_MIN_SIZE", 10 ** 6):
+        response = search(client, **{"Accept-Encoding": "gzip"})
+
+    assert response.headers.get("Content-Encoding") is None
+
+def test_if_none_match_answers_304(client):
+    etag = search(client, **{"Accept-Encoding": "gzip"}).headers["ETag"]
+
+    response = search(client, **{"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+    assert response.headers["ETag"] == etag
+
+    # the same content fetched in another encoding is still current
+    assert search(client, **{"If-None-Match": f'W/{etag}'}).status_code == 304
+    assert search(client, **{"If-None-Match": '"stale"'}).status_code == 200
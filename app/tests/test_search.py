@@ -0,0 +1,153 @@
+import io
+import json
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+from flask import Flask
+from app.schemas.search import PacienteSearch
+from app.services.cache import MemoryCache
+from app.services.page_tokens import PageTokenCache
+from app.services.prefetch import PagePrefetcher
+from app.services.result_cache import HIT, MISS, SearchResultCache
+from app.services.single_flight import SingleFlight
+from app.services.search import SearchService
+
+
+def make_response(page):
+    response = Mock()
+    response.status_code = 200
+    response.raw = io.BytesIO(json.dumps({
+        "studies": [{"protocolSection": {"identificationModule": {"briefTitle": f"Study {page}"}}}],
+        "nextPageToken": f"token-{page + 1}",
+    }).encode())
+    return response
+
+@pytest.fixture
+def app_context():
+    with Flask(__name__).app_context():
+        yield
+
+@pytest.fixture
+def mock_client():
+    client = Mock()
+    client.get_studies.side_effect = lambda params, stream=False: make_response(
+        int(params.get("pageToken", "token-1").split("-")[1])
+    )
+    return client
+
+@pytest.fixture
+def search_service(mock_client):
+    with patch("app.services.search.TranslateService"):
+        return SearchService(client=mock_client, page_tokens=PageTokenCache(MemoryCache(max_size=100)))
+
+def test_search_walks_pages(app_context, search_service, mock_client):
+    result = search_service.search_paciente(PacienteSearch(condition="asthma"), page=3)
+
+    assert result[0].title == "Study 3"
+    assert mock_client.get_studies.call_count == 3
+
+def test_search_uses_cached_page_tokens(app_context, search_service, mock_client):
+    search_service.search_paciente(PacienteSearch(condition="asthma"), page=3)
+    mock_client.get_studies.reset_mock()
+
+    result = search_service.search_paciente(PacienteSearch(condition="asthma"), page=3)
+    assert result[0].title == "Study 3"
+    assert mock_client.get_studies.call_count == 1
+
+    mock_client.get_studies.reset_mock()
+    result = search_service.search_paciente(PacienteSearch(condition="asthma"), page=5)
+    assert result[0].title == "Study 5"
+    assert mock_client.get_studies.call_count == 2
+
+def test_search_page_tokens_are_per_query(app_context, search_service, mock_client):
+    search_service.search_paciente(PacienteSearch(condition="asthma"), page=3)
+    mock_client.get_studies.reset_mock()
+
+    search_service.search_paciente(PacienteSearch(condition="diabetes"), page=3)
+    assert mock_client.get_studies.call_count == 3
+
+@pytest.fixture
+def prefetching_service(mock_client):
+    with patch("app.services.search.TranslateService"):
+        return SearchService(
+            client=mock_client,
+            page_tokens=PageTokenCache(MemoryCache(max_size=100)),
+            result_cache=SearchResultCache(MemoryCache(max_size=100), ttl=60, stale_ttl=0),
+            prefetcher=PagePrefetcher(max_workers=1, max_in_flight=2, max_pending=10, ttl=60),
+        )
+
+def wait_for_prefetches(prefetcher):
+    deadline = time.time() + 5
+    while prefetcher.stats()["in_flight"] and time.time() < deadline:
+        time.sleep(0.01)
+
+def test_next_page_is_prefetched(app_context, prefetching_service, mock_client):
+    result, status = prefetching_service.search_paciente_cached(PacienteSearch(condition="asthma"), page=1)
+    assert (result[0].title, status) == ("Study 1", MISS)
+    wait_for_prefetches(prefetching_service.prefetcher)
+    assert mock_client.get_studies.call_count == 2
+
+    result, status = prefetching_service.search_paciente_cached(PacienteSearch(condition="asthma"), page=2)
+    assert (result[0].title, status) == ("Study 2", HIT)
+    wait_for_prefetches(prefetching_service.prefetcher)
+
+    stats = prefetching_service.prefetcher.stats()
+    assert stats["consumed"] == 1
+    assert stats["completed"] == 2
+    assert stats["pending"] == 1
+    # page 3 was fetched in the background straight from its cached token
+    assert mock_client.get_studies.call_count == 3
+
+def test_prefetch_is_refused_when_pending_is_full(app_context):
+    prefetcher = PagePrefetcher(max_workers=1, max_in_flight=5, max_pending=1, ttl=60)
+    stored = {}
+
+    assert prefetcher.schedule("a", lambda: ["a"], stored.__setitem__)
+    wait_for_prefetches(prefetcher)
+    assert not prefetcher.schedule("b", lambda: ["b"], stored.__setitem__)
+    assert prefetcher.stats()["skipped_full"] == 1
+
+    assert prefetcher.consume("a")
+    assert not prefetcher.consume("a")
+    assert prefetcher.schedule("b", lambda: ["b"], stored.__setitem__)
+    wait_for_prefetches(prefetcher)
+    assert stored == {"a": ["a"], "b": ["b"]}
+
+def test_prefetch_concurrency_cap(app_context):
+    prefetcher = PagePrefetcher(max_workers=1, max_in_flight=2, max_pending=10, ttl=60)
+    release = threading.Event()
+
+    assert prefetcher.schedule("a", release.wait, lambda key, result: None)
+    assert prefetcher.schedule("b", release.wait, lambda key, result: None)
+    assert not prefetcher.schedule("c", release.wait, lambda key, result: None)
+    assert prefetcher.stats()["skipped_busy"] == 1
+
+    release.set()
+    wait_for_prefetches(prefetcher)
+    assert prefetcher.stats()["completed"] == 2
+
+def test_concurrent_identical_searches_share_upstream_calls(mock_client):
+    app = Flask(__name__)
+    get_studies = mock_client.get_studies.side_effect
+    mock_client.get_studies.side_effect = lambda params, stream=False: time.sleep(0.1) or get_studies(params, stream)
+    with patch("app.services.search.TranslateService"):
+        service = SearchService(
+            client=mock_client,
+            page_tokens=PageTokenCache(MemoryCache(max_size=100)),
+            flights=SingleFlight(timeout=5),
+        )
+    results = []
+
+    def search():
+        with app.app_context():
+            results.append(service.search_paciente(PacienteSearch(condition="asthma")))
+
+    threads = [threading.Thread(target=search) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert mock_client.get_studies.call_count == 1
+    assert [result[0].title for result in results] == ["Study 1"] * 5
@@ -0,0 +1,103 @@
+import asyncio
+import httpx
+import pytest
+from unittest.mock import Mock, patch
+from app.asgi import SearchApplication
+from app.main import app as flask_app
+from app.schemas.search import PacienteSearch
+from app.services.cache import MemoryCache
+from app.services.clinicaltrials_async import AsyncClinicalTrialsClient
+from app.services.page_tokens import PageTokenCache
+from app.services.result_cache import SearchResultCache
+from app.services.search_async import AsyncSearchService, AsyncTranslateService
+from app.services.translate import TranslateService
+from app.services.translation_memory import TranslationMemory
+
+
+def studies_handler(request):
+    page = int(request.url.params.get("pageToken", "token-1").split("-")[1])
+    studies = [
+        {"protocolSection": {"identificationModule": {"briefTitle": f"Study {page}.{n}"}}}
+        for n in range(25)
+    ]
+    return httpx.Response(200, json={"studies": studies, "nextPageToken": f"token-{page + 1}"})
+
+def fake_translate(texts, target_language):
+    return [{"translatedText": f"{target_language}:{text}"} for text in texts]
+
+@pytest.fixture
+def requests_seen():
+    return []
+
+@pytest.fixture
+def search_service(requests_seen):
+    def handler(request):
+        requests_seen.append(request)
+        return studies_handler(request)
+
+    translator = Mock()
+    translator.translate.side_effect = fake_translate
+    translate_service = TranslateService(memory=TranslationMemory(path=""), translator=translator)
+    return AsyncSearchService(
+        client=AsyncClinicalTrialsClient(
+            base_url="http://ctgov.test/api/v2/studies",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        ),
+        translate_service=AsyncTranslateService(translate_service, app=flask_app),
+        page_tokens=PageTokenCache(MemoryCache(max_size=100)),
+        result_cache=SearchResultCache(MemoryCache(max_size=100), ttl=60, stale_ttl=60),
+    )
+
+def test_async_search_filters_and_translates(search_service, requests_seen):
+    result = asyncio.run(search_service.search_paciente(PacienteSearch(condition="asthma"), page=2))
+
+    assert len(result) == 25
+    assert result[0].title == "pt:Study 2.0"
+    assert result[-1].title == "pt:Study 2.24"
+    assert len(requests_seen) == 2
+    assert requests_seen[0].url.params["query.cond"] == "asthma"
+
+def test_async_location_filter_matches_sync_path(search_service):
+    def site(n, state):
+        return {"protocolSection": {
+            "identificationModule": {"nctId": f"NCT{n}", "briefTitle": f"Study {n}"},
+            "contactsLocationsModule": {"locations": [{"city": "Springfield", "state": state, "status": "RECRUITING"}]},
+        }}
+    # only the last group of five has a site in Illinois
+    api_response = {"studies": [site(n, "Illinois" if n == 11 else "Missouri") for n in range(12)]}
+    search_data = PacienteSearch(location="Springfield, IL")
+
+    with patch("app.services.search_async.Config.ASYNC_TRANSLATE_GROUP_SIZE", 5):
+        result = asyncio.run(search_service._filter_and_translate(api_response, search_data, "pt"))
+
+    expected = search_service.search_service.process_page(api_response, search_data)
+    assert [study.nct_id for study in result] == [study.nct_id for study in expected] == ["NCT11"]
+
+def test_async_search_cached(search_service, requests_seen):
+    async def run():
+        first = await search_service.search_paciente_cached(PacienteSearch(condition="asthma"))
+        second = await search_service.search_paciente_cached(PacienteSearch(condition="asthma"))
+        return first, second
+
+    (first, first_status), (second, second_status) = asyncio.run(run())
+    assert (first_status, second_status) == ("MISS", "HIT")
+    assert first == second
+    assert len(requests_seen) == 1
+
+def test_asgi_search_endpoint(search_service):
+    application = SearchApplication(flask_app, search_service=search_service)
+
+    async def run():
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+            search = await client.post("/search/paciente/async?page=1", json={"query.cond": "asthma"})
+            invalid = await client.post("/search/paciente/async?page=0", json={})
+            index = await client.get("/")
+        return search, invalid, index
+
+    search, invalid, index = asyncio.run(run())
+    assert search.status_code == 200
+    assert search.headers["x-cache"] == "MISS"
+    assert search.json()[0]["Title"] == "pt:Study 1.0"
+    assert invalid.status_code == 400
+    assert index.json() == {"message": "Hello World"}
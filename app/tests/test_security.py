@@ -0,0 +1,82 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from flask import Flask
+from app.api.endpoints.auth import auth_bp
+from app.core.security import PasswordHasher, PasswordHasherBusy
+
+
+@pytest.fixture(scope="module")
+def pooled_hasher():
+    hasher = PasswordHasher(pool_size=1, max_queue=0, timeout=30)
+    yield hasher
+    hasher._executor.shutdown()
+
+def _slow(seconds):
+    time.sleep(seconds)
+    return None, 0.0, 0.0
+
+def wait_for_in_flight(hasher, count, timeout=5):
+    # the pool releases a slot from its own thread, just after the result is set
+    deadline = time.time() + timeout
+    while hasher.stats()["in_flight"] != count and time.time() < deadline:
+        time.sleep(0.001)
+    return hasher.stats()["in_flight"]
+
+def test_inline_hash_and_verify():
+    hasher = PasswordHasher(pool_size=0)
+
+    hashed = hasher.hash("secret")
+
+    assert hashed.startswith("$2b$")
+    assert hasher.verify("secret", hashed)
+    assert not hasher.verify("wrong", hashed)
+    assert hasher.stats()["hash_time"]["count"] == 3
+
+def test_pool_hash_and_verify(pooled_hasher):
+    hashed = pooled_hasher.hash("secret")
+
+    assert pooled_hasher.verify("secret", hashed)
+    stats = pooled_hasher.stats()
+    assert stats["hash_time"]["count"] == 2
+    assert stats["queue_wait"]["count"] == 2
+    assert wait_for_in_flight(pooled_hasher, 0) == 0
+
+def test_saturated_pool_rejects_immediately(pooled_hasher):
+    worker = threading.Thread(target=pooled_hasher.hash, args=("secret",))
+    worker.start()
+    wait_for_in_flight(pooled_hasher, 1)
+
+    started = time.time()
+    with pytest.raises(PasswordHasherBusy):
+        pooled_hasher.hash("another")
+    assert time.time() - started < 0.05
+    worker.join()
+    assert pooled_hasher.stats()["rejected"] == 1
+    wait_for_in_flight(pooled_hasher, 0)
+
+def test_timed_out_hash_holds_its_slot_until_it_finishes(pooled_hasher):
+    pooled_hasher.timeout = 0.05
+    try:
+        with pytest.raises(PasswordHasherBusy):
+            pooled_hasher._run(_slow, 0.5)
+        # still running in the pool, so the next caller is turned away
+        assert pooled_hasher.stats()["in_flight"] == 1
+        with pytest.raises(PasswordHasherBusy, match="saturated"):
+            pooled_hasher.hash("another")
+    finally:
+        pooled_hasher.timeout = 30
+
+    assert wait_for_in_flight(pooled_hasher, 0) == 0
+
+def test_login_answers_503_when_busy():
+    app = Flask(__name__)
+    app.register_blueprint(auth_bp, url_prefix='/auth')
+
+    with patch("app.api.endpoints.auth.get_db"), \
+            patch("app.api.endpoints.auth.AuthService.login", side_effect=PasswordHasherBusy("saturated")):
+        response = app.test_client().post('/auth/login', json={"email": "a@example.com", "password": "x"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
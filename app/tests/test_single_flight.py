@@ -0,0 +1,119 @@
+import copy
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from app.services.single_flight import SharedFlightLock, SingleFlight, flight_key
+
+
+def run_concurrently(n, target):
+    results = [None] * n
+    errors = [None] * n
+
+    def worker(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+def slow(calls, result, delay=0.2):
+    def fn():
+        calls.append(1)
+        time.sleep(delay)
+        return result
+    return fn
+
+def test_flight_key_is_canonical():
+    assert flight_key({"a": 1, "b": [1]}, "pt") == flight_key({"b": [1], "a": 1}, "pt")
+    assert flight_key({"a": 1}, "pt") != flight_key({"a": 1}, "en")
+
+def test_concurrent_calls_share_one_computation():
+    flights = SingleFlight(timeout=5)
+    calls = []
+
+    results, errors = run_concurrently(8, lambda: flights.do("key", slow(calls, ["result"])))
+
+    assert len(calls) == 1
+    assert results == [["result"]] * 8
+    assert errors == [None] * 8
+    assert flights.stats() == {"leaders": 1, "followers": 7, "timeouts": 0, "shared_waits": 0, "in_flight": 0}
+
+def test_followers_get_the_leaders_error():
+    flights = SingleFlight(timeout=5)
+
+    def fail():
+        time.sleep(0.1)
+        raise ValueError("upstream down")
+
+    _, errors = run_concurrently(4, lambda: flights.do("key", fail))
+
+    assert all(isinstance(error, ValueError) for error in errors)
+
+def test_follower_stops_waiting_after_timeout():
+    flights = SingleFlight(timeout=0.05)
+    calls = []
+
+    results, _ = run_concurrently(2, lambda: flights.do("key", slow(calls, "done", delay=0.3)))
+
+    assert len(calls) == 2
+    assert results == ["done", "done"]
+    assert flights.stats()["timeouts"] == 1
+
+def test_shared_lock_serializes_workers(tmp_path):
+    path = str(tmp_path / "flights.sqlite3")
+    # two SingleFlights with their own lock owners stand in for two workers
+    workers = [SingleFlight(timeout=5, shared_lock=SharedFlightLock(path)) for _ in range(2)]
+    spans = []
+
+    def fn():
+        started = time.monotonic()
+        time.sleep(0.1)
+        spans.append((started, time.monotonic()))
+
+    threads = [threading.Thread(target=worker.do, args=("key", fn)) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    first, second = sorted(spans)
+    assert second[0] >= first[1]
+    assert sum(worker.stats()["shared_waits"] for worker in workers) == 1
+
+def test_shared_lease_expires(tmp_path):
+    path = str(tmp_path / "flights.sqlite3")
+    crashed, other = SharedFlightLock(path), SharedFlightLock(path)
+
+    assert crashed.try_acquire("key", ttl=0.05)
+    assert not other.try_acquire("key", ttl=5)
+    time.sleep(0.06)
+    assert other.try_acquire("key", ttl=5)
+
+    crashed.release("key")
+    assert not crashed.try_acquire("key", ttl=5)
+    other.release("key")
+    assert crashed.try_acquire("key", ttl=5)
+
+def test_forked_workers_get_their_own_owner(tmp_path):
+    # one lock built at import, copied into every worker of a preloaded master
+    lock = SharedFlightLock(str(tmp_path / "flights.sqlite3"))
+    lock.owner
+    workers = {pid: copy.copy(lock) for pid in (1, 2, 3)}
+
+    def in_worker(pid, fn):
+        with patch("app.services.single_flight.os.getpid", return_value=pid):
+            return fn(workers[pid])
+
+    assert len({in_worker(pid, lambda worker: worker.owner) for pid in workers} | {lock.owner}) == 4
+    assert in_worker(1, lambda worker: worker.try_acquire("key", ttl=0))
+    assert in_worker(2, lambda worker: worker.try_acquire("key", ttl=5))
+    # the first worker finishes late; the lease its sibling took over stays
+    in_worker(1, lambda worker: worker.release("key"))
+    assert not in_worker(3, lambda worker: worker.try_acquire("key", ttl=5))
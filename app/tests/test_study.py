@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import Mock
+from flask import Flask
+from app.models.study import Location, Study, serialize_studies
+from app.services.cache import SQLiteCache
+from app.services.result_cache import SearchResultCache
+from app.services.translate import TranslateService
+from app.services.translation_memory import TranslationMemory
+
+
+API_STUDY = {
+    "protocolSection": {
+        "identificationModule": {"nctId": "NCT00000001", "briefTitle": "Asthma Study"},
+        "descriptionModule": {"briefSummary": "Summary", "detailedDescription": "Details"},
+        "armsInterventionsModule": {"interventions": [{"name": "Drug A"}]},
+        "sponsorsCollaboratorsModule": {"leadSponsor": {"name": "Sponsor"}},
+        "conditionsModule": {"conditions": ["Asthma"]},
+        "contactsLocationsModule": {"locations": [{"facility": "H", "city": "Boston", "status": "RECRUITING"}]},
+        "eligibilityModule": {"eligibilityCriteria": " Adults "},
+    },
+    "hasResults": True,
+}
+
+def test_study_from_api():
+    study = Study.from_api(API_STUDY)
+
+    assert study.nct_id == "NCT00000001"
+    assert study.description == "Summary\n\nDetails"
+    assert study.keywords == ["N/A"]
+    assert study.contacts == ["N/A"]
+    assert study.restrictions == "Adults"
+    assert study.locations == [Location("H", "Boston", "N/A", "N/A", "RECRUITING")]
+
+def test_study_to_dict_keeps_response_shape():
+    data = Study.from_api(API_STUDY).to_dict()
+
+    assert data["Title"] == "Asthma Study"
+    assert data["Intervention"] == ["Drug A"]
+    assert data["Location"] == [{"Facility": "H", "City": "Boston", "State": "N/A", "Country": "N/A", "Status": "RECRUITING"}]
+    assert data["Has Results Published"] is True
+    assert Study.from_api({}).to_dict()["Location"] == ["N/A"]
+
+def test_study_dict_roundtrip():
+    study = Study.from_api(API_STUDY)
+    restored = Study.from_dict(study.to_dict())
+    # parsed eligibility is internal and not serialized
+    assert restored.eligibility is None
+    restored.eligibility = study.eligibility
+    assert restored == study
+
+def test_study_has_no_instance_dict():
+    assert not hasattr(Study.from_api(API_STUDY), "__dict__")
+
+def test_translate_studies_only_touches_text_fields():
+    translator = Mock()
+    translator.translate.side_effect = lambda texts, target_language: [{"translatedText": t.upper()} for t in texts]
+    service = TranslateService(memory=TranslationMemory(path=""), translator=translator)
+    study = Study.from_api(API_STUDY)
+
+    with Flask(__name__).app_context():
+        service.translate_studies([study])
+
+    assert study.title == "ASTHMA STUDY"
+    assert study.interventions == ["DRUG A"]
+    assert study.keywords == ["N/A"]
+    assert study.locations[0].city == "Boston"
+    assert study.nct_id == "NCT00000001"
+
+def test_result_cache_rehydrates_studies_from_shared_backend(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SearchResultCache(SQLiteCache("results", path=path), ttl=60, stale_ttl=60)
+    studies = [Study.from_api(API_STUDY)]
+
+    cache.store("key", studies)
+
+    assert SQLiteCache("results", path=path).get("key")["result"] == serialize_studies(studies)
+    assert cache.lookup("key") == (studies, "HIT")
+    assert cache.lookup("key")[0][0].eligibility == studies[0].eligibility
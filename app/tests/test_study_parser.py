@@ -0,0 +1,79 @@
+import io
+import json
+import pytest
+from app.services.search import SearchService
+from app.services.study_parser import parse_studies
+
+
+@pytest.fixture(params=[None, 0], ids=["json.loads", "streaming"])
+def parse(request):
+    return lambda stream: parse_studies(stream, stream_min_bytes=request.param)
+
+def make_payload():
+    return {
+        "totalCount": 2,
+        "studies": [
+            {
+                "protocolSection": {
+                    "identificationModule": {"nctId": "NCT00000001", "briefTitle": "Asthma Study", "acronym": "AS"},
+                    "descriptionModule": {"briefSummary": "Summary"},
+                    "armsInterventionsModule": {
+                        "armGroups": [{"label": "A"}],
+                        "interventions": [{"name": "Drug A", "type": "DRUG"}],
+                    },
+                    "contactsLocationsModule": {
+                        "locations": [{"facility": "H", "city": "Boston", "geoPoint": {"lat": 1.5, "lon": 2}}],
+                    },
+                    "eligibilityModule": {"eligibilityCriteria": "  Adults only  ", "sex": "ALL"},
+                    "outcomesModule": {"primaryOutcomes": [{"measure": "x"}]},
+                },
+                "derivedSection": {"miscInfoModule": {"versionHolder": "2024-01-01"}},
+                "hasResults": True,
+            },
+            {"protocolSection": {"identificationModule": {"officialTitle": "Other"}}, "hasResults": False},
+        ],
+        "nextPageToken": "abc",
+    }
+
+def test_parse_studies_projects_only_used_fields(parse):
+    page = parse(io.BytesIO(json.dumps(make_payload()).encode()))
+
+    first = page["studies"][0]
+    assert page["nextPageToken"] == "abc"
+    assert "derivedSection" not in first
+    assert "outcomesModule" not in first["protocolSection"]
+    assert "armGroups" not in first["protocolSection"]["armsInterventionsModule"]
+    assert first["protocolSection"]["identificationModule"] == {"nctId": "NCT00000001", "briefTitle": "Asthma Study"}
+    assert first["protocolSection"]["contactsLocationsModule"]["locations"][0]["geoPoint"] == {"lat": 1.5, "lon": 2}
+    assert first["hasResults"] is True
+
+def test_parse_studies_matches_full_parse(parse):
+    payload = make_payload()
+    page = parse(io.BytesIO(json.dumps(payload).encode()))
+
+    assert SearchService.filter_studies(page) == SearchService.filter_studies(payload)
+
+def test_parse_studies_without_token(parse):
+    page = parse(io.BytesIO(b'{"studies": []}'))
+    assert page == {"studies": []}
+
+def test_parse_studies_token_before_studies(parse):
+    body = b'{"nextPageToken": "first", "studies": [{"hasResults": false}]}'
+    assert parse(io.BytesIO(body)) == {"studies": [{"hasResults": False}], "nextPageToken": "first"}
+
+def test_parse_studies_ignores_token_inside_strings(parse):
+    payload = {"studies": [{"protocolSection": {"descriptionModule": {"briefSummary": '"nextPageToken": "fake"'}}}]}
+    page = parse(io.BytesIO(json.dumps(payload).encode()))
+    assert "nextPageToken" not in page
+
+def test_parse_studies_resumes_short_reads_past_the_threshold():
+    class ShortReads(io.BytesIO):
+        def read(self, size=-1):
+            return super().read(min(size, 64) if size and size > 0 else size)
+
+    body = json.dumps(make_payload()).encode()
+    expected = parse_studies(io.BytesIO(body), stream_min_bytes=len(body))
+
+    # the bytes read while deciding are handed on to the streaming parser
+    assert parse_studies(ShortReads(body), stream_min_bytes=len(body) // 2) == expected
+    assert parse_studies(ShortReads(body), stream_min_bytes=100) == expected
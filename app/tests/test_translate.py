@@ -0,0 +1,134 @@
+import pytest
+from unittest.mock import Mock, patch
+from flask import Flask
+from app.services import registry
+from app.services import translate as translate_module
+from app.services.translate import TranslateService
+from app.services.translation_memory import TranslationMemory
+from app.services.translate_batcher import TranslationBatcher
+
+
+def fake_translate(texts, target_language):
+    return [{"translatedText": f"{target_language}:{text}"} for text in texts]
+
+@pytest.fixture
+def app_context():
+    with Flask(__name__).app_context():
+        yield
+
+@pytest.fixture
+def memory(tmp_path):
+    return TranslationMemory(path=str(tmp_path / "translations.sqlite3"), memory_size=100)
+
+@pytest.fixture
+def translator():
+    translator = Mock()
+    translator.translate.side_effect = fake_translate
+    return translator
+
+@pytest.fixture
+def translate_service(memory, translator):
+    service = TranslateService(memory=memory, translator=translator)
+    service.batcher.backoff_factor = 0
+    return service
+
+def test_translate_fields_skips_location_and_contacts(app_context, translate_service):
+    data = [{"Title": "Study", "Location": [{"City": "Boston"}], "Contacts": ["Dr. X"], "Conditions": ["Asthma"]}]
+
+    translate_service.translate_fields(data)
+
+    assert data == [{"Title": "pt:Study", "Location": [{"City": "Boston"}], "Contacts": ["Dr. X"], "Conditions": ["pt:Asthma"]}]
+
+def test_translate_fields_uses_memory(app_context, translate_service, memory):
+    translate_service.translate_fields([{"Title": "N/A", "Sponsor": "N/A", "Description": "Text"}])
+    translate_service.translator.translate.assert_called_once_with(["N/A", "Text"], target_language="pt")
+
+    translate_service.translator.translate.reset_mock()
+    data = [{"Title": "N/A", "Description": "Text"}]
+    translate_service.translate_fields(data)
+
+    translate_service.translator.translate.assert_not_called()
+    assert data == [{"Title": "pt:N/A", "Description": "pt:Text"}]
+    assert memory.stats()["memory_hits"] == 2
+
+def test_translation_memory_is_per_language(app_context, translate_service):
+    translate_service.translate_fields([{"Title": "Study"}])
+    translate_service.translator.translate.reset_mock()
+
+    data = [{"Title": "Study"}]
+    translate_service.translate_fields(data, target_language="es")
+
+    translate_service.translator.translate.assert_called_once_with(["Study"], target_language="es")
+    assert data == [{"Title": "es:Study"}]
+
+def test_translation_memory_survives_restart(tmp_path):
+    path = str(tmp_path / "translations.sqlite3")
+    TranslationMemory(path=path).put_many({"Study": "Estudo"}, "pt")
+
+    memory = TranslationMemory(path=path)
+    assert memory.get_many(["Study", "Other"], "pt") == {"Study": "Estudo"}
+    assert memory.stats()["disk_hits"] == 1
+    assert memory.stats()["misses"] == 1
+
+def test_translate_failure_returns_original(app_context, translate_service):
+    translate_service.translator.translate.side_effect = Exception("quota exceeded")
+    data = [{"Title": "Study"}]
+
+    assert translate_service.translate_fields(data) == [{"Title": "Study"}]
+
+
+def test_translate_failure_keeps_only_failed_chunk_untranslated(app_context, translate_service, translator):
+    def flaky_translate(texts, target_language):
+        if "Bad" in texts:
+            raise Exception("text too long")
+        return fake_translate(texts, target_language)
+    translator.translate.side_effect = flaky_translate
+    translate_service.batcher.max_items = 1
+    data = [{"Title": "Good", "Description": "Bad"}]
+
+    assert translate_service.translate_fields(data) == [{"Title": "pt:Good", "Description": "Bad"}]
+
+def test_batcher_chunks_by_count_and_chars(translator):
+    batcher = TranslationBatcher(translator, max_items=2, max_chars=10)
+
+    assert batcher.chunk(["a", "b", "c"]) == [["a", "b"], ["c"]]
+    assert batcher.chunk(["aaaaaa", "bbbbbb", "c"]) == [["aaaaaa"], ["bbbbbb", "c"]]
+    assert batcher.chunk(["x" * 20, "y"]) == [["x" * 20], ["y"]]
+
+def test_batcher_dedupes_and_runs_chunks_concurrently(translator):
+    batcher = TranslationBatcher(translator, max_items=2)
+
+    result = batcher.translate(["a", "b", "a", "c", "b"], "pt")
+
+    assert result == {"a": "pt:a", "b": "pt:b", "c": "pt:c"}
+    sent = sorted(call.args[0] for call in translator.translate.call_args_list)
+    assert sent == [["a", "b"], ["c"]]
+
+def test_batcher_retries_only_failed_chunks(translator):
+    attempts = {"b": 0}
+    def flaky_translate(texts, target_language):
+        if texts == ["b"]:
+            attempts["b"] += 1
+            if attempts["b"] == 1:
+                raise Exception("rate limited")
+        return fake_translate(texts, target_language)
+    translator.translate.side_effect = flaky_translate
+    batcher = TranslationBatcher(translator, max_items=1, max_retries=2, backoff_factor=0)
+
+    assert batcher.translate(["a", "b"], "pt") == {"a": "pt:a", "b": "pt:b"}
+    assert translator.translate.call_count == 3
+
+def test_translator_built_once_per_process():
+    registry.discard("translator")
+    try:
+        with patch("app.services.translate.build_translator") as build:
+            first = TranslateService(memory=TranslationMemory(path="")).translator
+            second = TranslateService(memory=TranslationMemory(path="")).translator
+            registry._reset_after_fork()
+            third = translate_module.get_translator()
+    finally:
+        registry.discard("translator")
+
+    assert first is second
+    assert build.call_count == 2
+    assert third is build.return_value
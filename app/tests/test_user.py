@@ -1,6 +1,15 @@
+import json
 import pytest
-from unittest.mock import MagicMock
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from flask import Flask
+from jose import jwt
+from app.api.endpoints.user import user_bp
+from app.core.config import Config
+from app.main import register_commands
 from app.services.user import UserService
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 @pytest.fixture
 def mock_db():
@@ -32,7 +41,7 @@ def test_get_user_by_email_not_found(user_service, mock_db):
         user_service.get_user_by_email("test@example.com")
 
 def test_update_user(user_service, mock_db):
-    mock_db.users.update_one.return_value.modified_count = 1
+    mock_db.users.find_one_and_update.return_value = {"_id": "507f1f77bcf86cd799439011", "username": "olduser"}
     response = user_service.update_user("507f1f77bcf86cd799439011", {"username": "newuser"})
     assert response == {"message": "user updated successfully"}
 
@@ -41,10 +50,21 @@ def test_update_user_invalid_data(user_service, mock_db):
         user_service.update_user("507f1f77bcf86cd799439011", {"invalid_field": "value"})
 
 def test_update_user_no_modifications(user_service, mock_db):
-    mock_db.users.update_one.return_value.modified_count = 0
+    mock_db.users.find_one_and_update.return_value = {"_id": "507f1f77bcf86cd799439011", "username": "newuser"}
     with pytest.raises(ValueError, match="No modifications were made"):
         user_service.update_user("507f1f77bcf86cd799439011", {"username": "newuser"})
 
+def test_update_user_not_found(user_service, mock_db):
+    mock_db.users.find_one_and_update.return_value = None
+    with pytest.raises(ValueError, match="User not found"):
+        user_service.update_user("507f1f77bcf86cd799439011", {"username": "newuser"})
+    mock_db.users.find_one.assert_not_called()
+
+def test_update_user_duplicate_email(user_service, mock_db):
+    mock_db.users.find_one_and_update.side_effect = DuplicateKeyError("E11000 duplicate key error")
+    with pytest.raises(ValueError, match="already exists"):
+        user_service.update_user("507f1f77bcf86cd799439011", {"email": "taken@example.com"})
+
 def test_delete_user(user_service, mock_db):
     mock_db.users.delete_one.return_value.deleted_count = 1
     response = user_service.delete_user("507f1f77bcf86cd799439011")
@@ -53,4 +73,201 @@ def test_delete_user(user_service, mock_db):
 def test_delete_user_not_found(user_service, mock_db):
     mock_db.users.delete_one.return_value.deleted_count = 0
     with pytest.raises(ValueError, match="User not found"):
-        user_service.delete_user("507f1f77bcf86cd799439011")
\ No newline at end of file
+        user_service.delete_user("507f1f77bcf86cd799439011")
+
+def test_set_role(user_service, mock_db):
+    mock_db.users.find_one_and_update.return_value = {"_id": ObjectId("507f1f77bcf86cd799439011")}
+    with patch("app.services.user.invalidate_user") as invalidate:
+        assert user_service.set_role("test@example.com", "admin") == {"message": "test@example.com is now admin"}
+    mock_db.users.find_one_and_update.assert_called_once_with(
+        {"email": "test@example.com"}, {"$set": {"role": "admin"}}, projection={"_id": 1}
+    )
+    invalidate.assert_called_once_with("507f1f77bcf86cd799439011")
+
+    mock_db.users.find_one_and_update.return_value = None
+    with pytest.raises(ValueError, match="User not found"):
+        user_service.set_role("missing@example.com", "admin")
+
+def test_grant_admin_command(mock_db):
+    app = Flask(__name__)
+    register_commands(app)
+    runner = app.test_cli_runner()
+    mock_db.users.find_one_and_update.return_value = {"_id": ObjectId("507f1f77bcf86cd799439011")}
+
+    with patch("app.db.mongo_client.get_db", return_value=mock_db):
+        result = runner.invoke(args=["grant-admin", "test@example.com"])
+        assert result.exit_code == 0
+        assert "test@example.com is now admin" in result.output
+
+        runner.invoke(args=["grant-admin", "test@example.com", "--revoke"])
+        assert mock_db.users.find_one_and_update.call_args[0][1] == {"$set": {"role": "user"}}
+
+        mock_db.users.find_one_and_update.return_value = None
+        result = runner.invoke(args=["grant-admin", "missing@example.com"])
+        assert result.exit_code == 1
+        assert "User not found" in result.output
+
+def test_user_endpoints_require_auth_for_own_user(mock_db):
+    app = Flask(__name__)
+    app.register_blueprint(user_bp, url_prefix='/user')
+    client = app.test_client()
+    token = jwt.encode({"sub": "507f1f77bcf86cd799439011", "exp": datetime.utcnow() + timedelta(days=1)},
+                       "secret", algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+    mock_db.users.find_one.return_value = {"_id": "507f1f77bcf86cd799439011", "username": "u", "email": "e"}
+
+    with patch("app.core.auth_middleware.get_db", return_value=mock_db), \
+            patch("app.api.endpoints.user.get_db", return_value=mock_db), \
+            patch("app.services.auth.Config.SECRET_KEY", "secret"):
+        assert client.get('/user/507f1f77bcf86cd799439011').status_code == 401
+        assert client.get('/user/507f1f77bcf86cd799439011', headers=headers).status_code == 200
+        assert client.get('/user/507f1f77bcf86cd799439012', headers=headers).status_code == 403
+        assert client.delete('/user/507f1f77bcf86cd799439012', headers=headers).status_code == 403
+
+ID_1 = "507f1f77bcf86cd799439011"
+ID_2 = "507f1f77bcf86cd799439012"
+ID_3 = "507f1f77bcf86cd799439013"
+
+def user_doc(user_id, username, email):
+    return {"_id": ObjectId(user_id), "username": username, "email": email}
+
+def test_get_users_by_ids_uses_one_query(user_service, mock_db):
+    mock_db.users.find.return_value.batch_size.return_value = iter([user_doc(ID_1, "a", "a@example.com")])
+
+    results = list(user_service.get_users_by_ids([ID_1, ID_2, ID_1, "bad"]))
+
+    assert results == [
+        {"id": "bad", "status": "invalid_id"},
+        {"id": ID_1, "status": "ok", "user": {"_id": ID_1, "username": "a", "email": "a@example.com"}},
+        {"id": ID_2, "status": "not_found"},
+    ]
+    mock_db.users.find.assert_called_once()
+    assert mock_db.users.find.call_args[0][0] == {"_id": {"$in": [ObjectId(ID_1), ObjectId(ID_2)]}}
+    mock_db.users.find_one.assert_not_called()
+
+def test_update_users_reports_each_item(user_service, mock_db):
+    mock_db.users.find.return_value = [
+        user_doc(ID_1, "a", "a@example.com"),
+        user_doc(ID_2, "b", "b@example.com"),
+    ]
+
+    results = user_service.update_users([
+        {"id": ID_1, "username": "a2"},
+        {"id": ID_2, "email": "a@example.com"},
+        {"id": ID_3, "username": "c"},
+        {"id": "bad", "username": "d"},
+        {"id": ID_1, "username": "a3"},
+        {"id": ID_2, "username": "b"},
+    ])
+
+    assert sorted(results, key=lambda result: result["id"]) == [
+        {"id": ID_1, "status": "duplicate_id"},
+        {"id": ID_2, "status": "duplicate_id"},
+        {"id": ID_3, "status": "not_found"},
+        {"id": "bad", "status": "invalid_id"},
+    ]
+    mock_db.users.bulk_write.assert_not_called()
+
+    results = user_service.update_users([
+        {"id": ID_1, "username": "a"},
+        {"id": ID_2, "email": "taken@example.com"},
+        {"id": ID_3, "role": "admin"},
+    ])
+    assert results == [
+        {"id": ID_3, "status": "invalid_data"},
+        {"id": ID_1, "status": "unchanged"},
+        {"id": ID_2, "status": "updated"},
+    ]
+    (operations,), kwargs = mock_db.users.bulk_write.call_args
+    assert len(operations) == 1 and kwargs == {"ordered": False}
+
+def test_update_users_maps_write_errors(user_service, mock_db):
+    mock_db.users.find.return_value = [user_doc(ID_1, "a", "a@example.com"), user_doc(ID_2, "b", "b@example.com")]
+    mock_db.users.bulk_write.side_effect = BulkWriteError({
+        "writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate key"}],
+    })
+
+    results = user_service.update_users([{"id": ID_1, "username": "a2"}, {"id": ID_2, "email": "a@example.com"}])
+
+    assert results == [{"id": ID_1, "status": "updated"}, {"id": ID_2, "status": "duplicate_email"}]
+
+def test_delete_users_uses_one_delete(user_service, mock_db):
+    mock_db.users.find.return_value = [{"_id": ObjectId(ID_1)}]
+
+    results = user_service.delete_users([ID_1, ID_2, "bad"])
+
+    assert results == [
+        {"id": "bad", "status": "invalid_id"},
+        {"id": ID_1, "status": "deleted"},
+        {"id": ID_2, "status": "not_found"},
+    ]
+    mock_db.users.delete_many.assert_called_once_with({"_id": {"$in": [ObjectId(ID_1)]}})
+
+def test_batch_endpoints_are_admin_only_and_bounded(mock_db):
+    app = Flask(__name__)
+    app.register_blueprint(user_bp, url_prefix='/user')
+    client = app.test_client()
+    token = jwt.encode({"sub": ID_1, "exp": datetime.utcnow() + timedelta(days=1)}, "secret", algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+    mock_db.users.find.return_value.batch_size.return_value = iter([user_doc(ID_2, "b", "b@example.com")])
+
+    with patch("app.core.auth_middleware.get_db", return_value=mock_db), \
+            patch("app.api.endpoints.user.get_db", return_value=mock_db), \
+            patch("app.services.auth.Config.SECRET_KEY", "secret"), \
+            patch("app.api.endpoints.user.Config.USER_BATCH_MAX_SIZE", 2):
+        mock_db.users.find_one.return_value = {"_id": ID_1, "username": "u"}
+        assert client.post('/user/batch/lookup', json={"ids": [ID_2]}, headers=headers).status_code == 403
+
+        mock_db.users.find_one.return_value = {"_id": ID_1, "username": "u", "role": "admin"}
+        response = client.post('/user/batch/lookup', json={"ids": [ID_2]}, headers=headers)
+        assert response.status_code == 200
+        assert response.get_json() == [
+            {"id": ID_2, "status": "ok", "user": {"_id": ID_2, "username": "b", "email": "b@example.com"}}
+        ]
+
+        response = client.post('/user/batch/delete', json={"ids": [ID_1, ID_2, ID_3]}, headers=headers)
+        assert response.status_code == 413
+
+def test_list_users_is_keyset_paginated(user_service, mock_db):
+    cursor = mock_db.users.find.return_value.sort.return_value.limit
+    cursor.return_value = [user_doc(ID_2, "b", "b@example.com"), user_doc(ID_3, "c", "c@example.com")]
+
+    users, next_cursor = user_service.list_users(after=ID_1, limit=1)
+
+    assert users == [{"_id": ID_2, "username": "b", "email": "b@example.com"}]
+    assert next_cursor == ID_2
+    assert mock_db.users.find.call_args[0] == ({"_id": {"$gt": ObjectId(ID_1)}}, {"username": 1, "email": 1})
+    mock_db.users.find.return_value.sort.assert_called_once_with("_id", 1)
+    cursor.assert_called_once_with(2)
+
+    cursor.return_value = [user_doc(ID_3, "c", "c@example.com")]
+    assert user_service.list_users(after=ID_2, limit=1)[1] is None
+
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        user_service.list_users(after="bad")
+
+def test_list_users_endpoint_streams_ndjson(mock_db):
+    app = Flask(__name__)
+    app.register_blueprint(user_bp, url_prefix='/user')
+    client = app.test_client()
+    token = jwt.encode({"sub": ID_1, "exp": datetime.utcnow() + timedelta(days=1)}, "secret", algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+    mock_db.users.find_one.return_value = {"_id": ID_1, "username": "u", "role": "admin"}
+    stream = mock_db.users.find.return_value.sort.return_value.batch_size
+    stream.return_value = iter([user_doc(ID_2, "b", "b@example.com"), user_doc(ID_3, "c", "c@example.com")])
+    mock_db.users.find.return_value.sort.return_value.limit.return_value = [user_doc(ID_2, "b", "b@example.com")]
+
+    with patch("app.core.auth_middleware.get_db", return_value=mock_db), \
+            patch("app.api.endpoints.user.get_db", return_value=mock_db), \
+            patch("app.services.auth.Config.SECRET_KEY", "secret"):
+        response = client.get('/user?format=ndjson', headers=headers)
+        assert response.mimetype == 'application/x-ndjson'
+        assert [json.loads(line)["_id"] for line in response.get_data(as_text=True).splitlines()] == [ID_2, ID_3]
+        assert stream.call_args[0] == (Config.USER_STREAM_BATCH_SIZE,)
+
+        response = client.get('/user?limit=10', headers=headers)
+        assert response.get_json() == {"users": [{"_id": ID_2, "username": "b", "email": "b@example.com"}],
+                                       "next_cursor": None}
+        assert client.get('/user?limit=0', headers=headers).status_code == 400
+        assert client.get('/user?after=bad', headers=headers).status_code == 400
+        assert client.get('/user?after=bad&format=ndjson', headers=headers).status_code == 400
@@ -0,0 +1,50 @@
+"""Per-request JWT verification: jwt.decode every time versus the claims cache.
+
+    python -m benchmarks.auth --requests 20000
+
+Times AuthService.verify_claims against a warm token cache next to a
+plain jwt.decode of the same token, i.e. what every authenticated
+request paid before require_auth cached verified claims.
+"""
+import argparse
+import itertools
+import time
+from datetime import timedelta
+from unittest.mock import Mock
+from jose import jwt
+from app.services.auth import AuthService, token_cache
+
+SECRET = "benchmark-secret"
+
+
+def per_request_us(fn, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        fn()
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=100, help="distinct tokens cycled through")
+    args = parser.parse_args()
+
+    auth_service = AuthService(Mock())
+    auth_service.SECRET_KEY = SECRET
+    tokens = [auth_service._create_token({"sub": f"user-{n}"}, timedelta(days=1)) for n in range(args.users)]
+    next_token = itertools.cycle(tokens).__next__
+
+    decode_us = per_request_us(lambda: jwt.decode(next_token(), SECRET, algorithms=["HS256"]), args.requests)
+    token_cache.clear()
+    cold_us = per_request_us(lambda: auth_service.verify_claims(next_token()), args.users)
+    warm_us = per_request_us(lambda: auth_service.verify_claims(next_token()), args.requests)
+
+    print(f"{args.requests} requests over {args.users} tokens")
+    print(f"{'jwt.decode per request':<28}{decode_us:>8.1f} us")
+    print(f"{'verify_claims, cold cache':<28}{cold_us:>8.1f} us")
+    print(f"{'verify_claims, warm cache':<28}{warm_us:>8.1f} us  ({decode_us / warm_us:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
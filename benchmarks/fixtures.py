@@ -0,0 +1,110 @@
+"""Synthetic ClinicalTrials.gov v2 /studies payloads for benchmarks.
+
+Shaped like real responses: the handful of modules filter_studies reads
+plus the bulky sections it ignores (derived MeSH trees, outcomes, results).
+Use parse_studies.py --record to capture real responses instead.
+"""
+import json
+import random
+
+CONDITIONS = ["Asthma", "Diabetes Mellitus, Type 2", "Breast Cancer", "Hypertension", "COVID-19", "Depression"]
+CITIES = [("São Paulo", "SP", "Brazil"), ("Boston", "Massachusetts", "United States"),
+          ("Montréal", "Quebec", "Canada"), ("Lyon", "", "France"), ("Rio de Janeiro", "RJ", "Brazil")]
+STATUSES = ["RECRUITING", "NOT_YET_RECRUITING", "COMPLETED", "ACTIVE_NOT_RECRUITING"]
+WORDS = ("patients study treatment randomized placebo efficacy safety dose clinical outcome "
+         "participants phase trial baseline week primary secondary endpoint adverse events").split()
+
+
+def text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def make_study(rng, n):
+    locations = []
+    for _ in range(rng.randint(1, 40)):
+        city, state, country = rng.choice(CITIES)
+        locations.append({
+            "facility": f"Hospital {rng.randint(1, 999)}",
+            "status": rng.choice(STATUSES),
+            "city": city,
+            "state": state,
+            "zip": f"{rng.randint(10000, 99999)}",
+            "country": country,
+            "contacts": [{"name": f"Dr. {rng.randint(1, 99)}", "role": "CONTACT", "email": "x@example.com"}],
+            "geoPoint": {"lat": rng.uniform(-40, 60), "lon": rng.uniform(-120, 10)},
+        })
+    condition = rng.choice(CONDITIONS)
+    return {
+        "protocolSection": {
+            "identificationModule": {
+                "nctId": f"NCT{n:08d}",
+                "orgStudyIdInfo": {"id": f"ORG-{n}"},
+                "briefTitle": f"A Study of {condition} Treatment {n}",
+                "officialTitle": text(rng, 25),
+                "organization": {"fullName": "Sponsor Org", "class": "INDUSTRY"},
+            },
+            "statusModule": {
+                "overallStatus": rng.choice(STATUSES),
+                "startDateStruct": {"date": "2023-01-01"},
+                "lastUpdatePostDateStruct": {"date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"},
+            },
+            "sponsorsCollaboratorsModule": {
+                "leadSponsor": {"name": f"Sponsor {rng.randint(1, 50)}", "class": "INDUSTRY"},
+                "collaborators": [{"name": f"Collaborator {i}"} for i in range(rng.randint(0, 5))],
+            },
+            "descriptionModule": {
+                "briefSummary": text(rng, 120),
+                "detailedDescription": text(rng, 600),
+            },
+            "conditionsModule": {
+                "conditions": [condition],
+                "keywords": [rng.choice(WORDS) for _ in range(rng.randint(0, 6))],
+            },
+            "designModule": {
+                "studyType": "INTERVENTIONAL",
+                "phases": ["PHASE2"],
+                "designInfo": {"allocation": "RANDOMIZED", "maskingInfo": {"masking": "DOUBLE"}},
+                "enrollmentInfo": {"count": rng.randint(10, 2000), "type": "ESTIMATED"},
+            },
+            "armsInterventionsModule": {
+                "armGroups": [{"label": f"Arm {i}", "description": text(rng, 40)} for i in range(3)],
+                "interventions": [{"type": "DRUG", "name": f"Drug {rng.randint(1, 300)}",
+                                   "description": text(rng, 30)} for _ in range(rng.randint(1, 3))],
+            },
+            "outcomesModule": {
+                "primaryOutcomes": [{"measure": text(rng, 12), "description": text(rng, 60),
+                                     "timeFrame": "12 weeks"} for _ in range(4)],
+                "secondaryOutcomes": [{"measure": text(rng, 12), "description": text(rng, 60),
+                                       "timeFrame": "24 weeks"} for _ in range(10)],
+            },
+            "eligibilityModule": {
+                "eligibilityCriteria": "Inclusion Criteria:\n\n* " + "\n* ".join(text(rng, 15) for _ in range(10))
+                                       + "\n\nExclusion Criteria:\n\n* " + "\n* ".join(text(rng, 15) for _ in range(12)),
+                "sex": rng.choice(["ALL", "FEMALE", "MALE"]),
+                "minimumAge": f"{rng.randint(0, 40)} Years",
+                "maximumAge": f"{rng.randint(41, 90)} Years",
+                "stdAges": ["ADULT", "OLDER_ADULT"],
+            },
+            "contactsLocationsModule": {
+                "centralContacts": [{"name": "Study Contact", "role": "CONTACT", "phone": "555-0100"}],
+                "locations": locations,
+            },
+        },
+        "derivedSection": {
+            "conditionBrowseModule": {
+                "meshes": [{"id": f"D{rng.randint(1000, 9999)}", "term": rng.choice(WORDS)} for _ in range(5)],
+                "browseLeaves": [{"id": f"M{i}", "name": rng.choice(WORDS), "relevance": "LOW"} for i in range(60)],
+                "browseBranches": [{"abbrev": "BC", "name": rng.choice(WORDS)} for _ in range(10)],
+            },
+        },
+        "hasResults": rng.random() < 0.2,
+    }
+
+
+def make_page(studies=100, seed=0):
+    rng = random.Random(seed)
+    return {"studies": [make_study(rng, seed * studies + n) for n in range(studies)], "nextPageToken": f"token-{seed + 1}"}
+
+
+def make_page_bytes(studies=100, seed=0):
+    return json.dumps(make_page(studies, seed)).encode("utf-8")
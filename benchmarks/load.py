@@ -0,0 +1,379 @@
+"""Load test of the Flask app against local stand-ins for its upstreams.
+
+    python -m benchmarks.load --requests 2000 --concurrency 8
+    python -m benchmarks.load --baseline benchmarks/load_baseline.json
+    python -m benchmarks.load --save-baseline benchmarks/load_baseline.json
+
+Starts the app on a local port with ClinicalTrials.gov replaced by a stub
+server that replays recorded /studies pages (benchmarks/data, see
+parse_studies.py --record; synthetic pages otherwise) after --upstream-ms,
+Google Translate by a fake that answers after --translate-ms, and MongoDB
+by mongomock unless --mongo-uri is given. Worker threads then drive a
+weighted mix of register, login, user CRUD and search requests and the
+latency percentiles and throughput of each are reported.
+
+With --baseline, an endpoint whose p95 grows or whose throughput drops
+by more than --tolerance against the saved run, or that starts failing,
+makes the run exit with status 1. Baselines are only comparable on the
+same machine and with the same options.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from unittest.mock import patch
+import requests
+from jose import jwt
+from benchmarks.fixtures import CONDITIONS, WORDS
+
+DEFAULT_MIX = "register=1,login=2,user_get=6,user_update=2,user_delete=1,search=8"
+PERCENTILES = (50, 95, 99)
+
+
+class StubClinicalTrials(ThreadingHTTPServer):
+    """Replays recorded /studies pages, cut to the requested pageSize."""
+
+    daemon_threads = True
+
+    def __init__(self, latency):
+        self.pages = []
+        self.latency = latency
+        self.requests = 0
+        self._encoded = {}
+        self._lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), StubHandler)
+
+    def load(self, bodies):
+        self.pages = [json.loads(body) for body in bodies]
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/v2/studies"
+
+    def body(self, page_size, token):
+        with self._lock:
+            self.requests += 1
+            index = int(token.rsplit("-", 1)[-1]) if token and token[-1].isdigit() else 0
+            key = (index % len(self.pages), page_size)
+            if key not in self._encoded:
+                page = self.pages[key[0]]
+                self._encoded[key] = json.dumps({
+                    "studies": page["studies"][:page_size],
+                    "nextPageToken": f"token-{index + 1}",
+                }).encode("utf-8")
+            return self._encoded[key]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        body = self.server.body(int(query.get("pageSize", ["10"])[0]), query.get("pageToken", [""])[0])
+        time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeTranslator:
+    """Stands in for translate.Client: one --translate-ms wait per call."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def translate(self, texts, target_language):
+        time.sleep(self.latency)
+        return [{"translatedText": f"[{target_language}] {text}"} for text in texts]
+
+
+def configure_environment(args, stub_url):
+    # Config reads the environment on import, so this runs before the app is imported
+    os.environ.update({
+        "SECRET_KEY": "load-benchmark",
+        "CTGOV_BASE_URL": stub_url,
+        "BCRYPT_ROUNDS": str(args.bcrypt_rounds),
+        "TRANSLATION_MEMORY_PATH": "",
+        "CACHE_BACKEND": "memory",
+        "MIRROR_ENABLED": "false",
+        "MIRROR_SYNC_ENABLED": "false",
+        "METRICS_DIR": "",
+        "LOG_LEVEL": "WARNING",
+        "MONGO_DB_NAME": "load_benchmark",
+    })
+    if args.mongo_uri:
+        os.environ["MONGO_URI"] = args.mongo_uri
+
+
+def start_app(args):
+    from werkzeug.serving import make_server
+    from app.db import mongo_client
+    from app.db.indexes import ensure_indexes
+
+    if not args.mongo_uri:
+        import mongomock
+        mongo = mongomock.MongoClient()
+        patcher = patch.object(mongo_client, "_create_client", return_value=mongo)
+        patcher.start()
+    db = mongo_client.get_db()
+    db.users.drop()
+    ensure_indexes(db)
+
+    from app.main import app
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+class Run:
+    """State shared by the worker threads: accounts, search bodies, timings."""
+
+    def __init__(self, base_url, args):
+        self.base_url = base_url
+        self.args = args
+        self.lock = threading.Lock()
+        self.accounts = []
+        self.disposable = []
+        self.timings = {}
+        self.errors = {}
+        self.serial = 0
+        rng = random.Random(args.seed)
+        self.searches = [
+            {
+                "query.cond": rng.choice(CONDITIONS),
+                "query.term": rng.choice(WORDS),
+                "page": rng.randint(1, args.max_page),
+            }
+            for _ in range(args.distinct_searches)
+        ]
+
+    def new_email(self):
+        with self.lock:
+            self.serial += 1
+            return f"load{self.serial}@example.com"
+
+    def record(self, name, seconds, ok):
+        with self.lock:
+            self.timings.setdefault(name, []).append(seconds)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def timed(self, session, name, method, path, expected, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = session.request(method, f"{self.base_url}{path}", timeout=60, **kwargs)
+            ok = response.status_code == expected
+        except requests.RequestException:
+            response, ok = None, False
+        self.record(name, time.perf_counter() - started, ok)
+        return response if ok else None
+
+    def register(self, session, name="POST /auth/register"):
+        email = self.new_email()
+        account = {"email": email, "password": "load-benchmark-password"}
+        if self.timed(session, name, "POST", "/auth/register", 201, json=dict(account, username=email.split("@")[0])):
+            return account
+        return None
+
+    def login(self, session, account, name="POST /auth/login"):
+        response = self.timed(session, name, "POST", "/auth/login", 200, json=account)
+        if response is None:
+            return None
+        token = response.json()["access_token"]
+        return dict(account, token=token, user_id=jwt.get_unverified_claims(token)["sub"])
+
+    def setup(self, session, users):
+        for _ in range(users):
+            account = self.register(session, name="setup")
+            account = account and self.login(session, account, name="setup")
+            if account:
+                self.accounts.append(account)
+        if not self.accounts:
+            raise SystemExit("setup failed: could not register any accounts")
+
+    def step(self, session, rng, operation):
+        headers = lambda account: {"Authorization": f"Bearer {account['token']}"}
+        if operation == "register":
+            account = self.register(session)
+            if account:
+                with self.lock:
+                    self.disposable.append(account)
+        elif operation == "login":
+            self.login(session, rng.choice(self.accounts))
+        elif operation == "user_get":
+            account = rng.choice(self.accounts)
+            self.timed(session, "GET /user/<id>", "GET", f"/user/{account['user_id']}", 200, headers=headers(account))
+        elif operation == "user_update":
+            account = rng.choice(self.accounts)
+            self.timed(
+                session, "PUT /user/<id>", "PUT", f"/user/{account['user_id']}", 200,
+                headers=headers(account), json={"username": f"user{rng.randint(0, 10 ** 6)}"},
+            )
+        elif operation == "user_delete":
+            with self.lock:
+                account = self.disposable.pop() if self.disposable else None
+            account = account or self.register(session, name="setup")
+            account = account and self.login(session, account, name="setup")
+            if account:
+                self.timed(
+                    session, "DELETE /user/<id>", "DELETE", f"/user/{account['user_id']}", 200, headers=headers(account)
+                )
+        elif operation == "search":
+            search = dict(rng.choice(self.searches))
+            page = search.pop("page")
+            self.timed(
+                session, "POST /search/paciente", "POST",
+                f"/search/paciente?page={page}&pageSize={self.args.page_size}", 200, json=search,
+            )
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(DEFAULT_MIX.replace("=", ",").split(",")[::2])
+    if unknown:
+        raise SystemExit(f"unknown operations in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def percentile(sorted_values, p):
+    return sorted_values[max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)]
+
+
+def summarize(run, elapsed):
+    results = {}
+    for name, timings in run.timings.items():
+        if name == "setup":
+            continue
+        timings = sorted(timings)
+        results[name] = dict(
+            {f"p{p}_ms": percentile(timings, p) * 1000 for p in PERCENTILES},
+            requests=len(timings),
+            errors=run.errors.get(name, 0),
+            rps=len(timings) / elapsed,
+        )
+    return results
+
+
+def print_results(results, elapsed):
+    print(f"{'endpoint':<24}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}")
+    for name in sorted(results):
+        r = results[name]
+        print(
+            f"{name:<24}{r['requests']:>9}{r['errors']:>8}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}"
+            f"{r['p99_ms']:>9.1f}{r['rps']:>9.1f}"
+        )
+    total = sum(r["requests"] for r in results.values())
+    print(f"{total} requests in {elapsed:.1f}s, {total / elapsed:.1f} req/s overall")
+
+
+def compare(results, baseline, tolerance):
+    """Regressions against a saved run, as printable lines."""
+    regressions = []
+    for name, base in baseline["endpoints"].items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']:.1f} ms, baseline {base['p95_ms']:.1f} ms")
+        if current["rps"] < base["rps"] / (1 + tolerance):
+            regressions.append(f"{name}: {current['rps']:.1f} req/s, baseline {base['rps']:.1f} req/s")
+        if current["errors"] and not base["errors"]:
+            regressions.append(f"{name}: {current['errors']} errors, baseline had none")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="timed requests across all workers")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation=weight pairs")
+    parser.add_argument("--users", type=int, default=20, help="accounts registered before the run")
+    parser.add_argument("--upstream-ms", type=float, default=50.0)
+    parser.add_argument("--translate-ms", type=float, default=20.0)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--max-page", type=int, default=3)
+    parser.add_argument("--distinct-searches", type=int, default=100)
+    parser.add_argument("--bcrypt-rounds", type=int, default=4, help="production uses 12")
+    parser.add_argument("--data", default="benchmarks/data", help="recorded /studies responses")
+    parser.add_argument("--mongo-uri")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", help="fail on regressions against this file")
+    parser.add_argument("--save-baseline", help="write this run's results here")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative regression")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    stub = StubClinicalTrials(args.upstream_ms / 1000)
+    configure_environment(args, stub.url)
+    # imports the app, so only once the environment points at the stand-ins
+    from benchmarks.parse_studies import load_bodies
+    bodies, source = load_bodies(args.data, 10, 100)
+    stub.load(bodies)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+
+    with patch("app.services.translate.build_translator", return_value=FakeTranslator(args.translate_ms / 1000)):
+        server, base_url = start_app(args)
+        run = Run(base_url, args)
+        run.setup(requests.Session(), args.users)
+
+        operations, weights = zip(*mix.items())
+        counter = iter(range(args.requests))
+        counter_lock = threading.Lock()
+
+        def worker(index):
+            rng = random.Random(args.seed * 1000 + index)
+            session = requests.Session()
+            while True:
+                with counter_lock:
+                    if next(counter, None) is None:
+                        return
+                run.step(session, rng, rng.choices(operations, weights)[0])
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(worker, range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        server.shutdown()
+    stub.shutdown()
+
+    print(f"upstream: {source}, {args.upstream_ms:.0f} ms; translator {args.translate_ms:.0f} ms; "
+          f"mongo: {args.mongo_uri or 'mongomock'}; concurrency {args.concurrency}; {stub.requests} upstream calls")
+    results = summarize(run, elapsed)
+    print_results(results, elapsed)
+
+    options = {key: value for key, value in vars(args).items() if key not in ("baseline", "save_baseline", "tolerance")}
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"options": options, "endpoints": results}, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("options") != options:
+            print("warning: baseline was recorded with different options")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("REGRESSIONS against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            raise SystemExit(1)
+        print(f"no regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Ingest and query latency of the local trial mirror.
+
+    python -m benchmarks.mirror --studies 100000
+
+Builds a throwaway mirror from synthetic studies already projected to
+MIRROR_FIELDS (what a sync receives), then times typical patient
+searches against it. Compare the query column with an upstream round
+trip, which is typically several hundred milliseconds.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from app.schemas.search import PacienteSearch
+from app.services.mirror import TrialMirror
+from benchmarks.fixtures import CITIES, CONDITIONS, STATUSES, WORDS, text
+
+QUERIES = {
+    "condition": PacienteSearch(condition="asthma"),
+    "condition+status": PacienteSearch(condition="breast cancer", status=["RECRUITING"]),
+    "condition+age+sex": PacienteSearch(condition="diabetes", age="45", sex="FEMALE"),
+    "keywords+location": PacienteSearch(keywords="placebo efficacy", location="Sao Paulo"),
+    "status only": PacienteSearch(status=["NOT_YET_RECRUITING"]),
+}
+
+
+def make_projected_study(rng, n):
+    condition = rng.choice(CONDITIONS)
+    status = rng.choice(STATUSES)
+    locations = []
+    for _ in range(rng.randint(1, 5)):
+        city, state, country = rng.choice(CITIES)
+        locations.append({"facility": f"Hospital {rng.randint(1, 999)}", "city": city, "state": state,
+                          "country": country, "status": rng.choice(STATUSES)})
+    return {"protocolSection": {
+        "identificationModule": {"nctId": f"NCT{n:08d}", "briefTitle": f"A Study of {condition} Treatment {n}"},
+        "statusModule": {
+            "overallStatus": status,
+            "lastUpdatePostDateStruct": {"date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"},
+        },
+        "descriptionModule": {"briefSummary": text(rng, 60)},
+        "sponsorsCollaboratorsModule": {"leadSponsor": {"name": f"Sponsor {rng.randint(1, 50)}"}},
+        "conditionsModule": {"conditions": [condition], "keywords": [rng.choice(WORDS) for _ in range(3)]},
+        "armsInterventionsModule": {"interventions": [{"name": f"Drug {rng.randint(1, 300)}"}]},
+        "eligibilityModule": {
+            "eligibilityCriteria": text(rng, 40),
+            "sex": rng.choice(["ALL", "FEMALE", "MALE"]),
+            "minimumAge": f"{rng.randint(0, 40)} Years",
+            "maximumAge": f"{rng.randint(41, 90)} Years",
+        },
+        "contactsLocationsModule": {"locations": locations},
+    }}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--studies", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=1000, help="studies per ingest call, like a sync page")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "mirror.sqlite3")
+        mirror = TrialMirror(path)
+
+        ingest_seconds = 0.0
+        for start in range(0, args.studies, args.batch):
+            batch = [make_projected_study(rng, n) for n in range(start, min(start + args.batch, args.studies))]
+            started = time.perf_counter()
+            mirror.ingest(batch)
+            ingest_seconds += time.perf_counter() - started
+
+        print(f"{mirror.count()} studies, {os.path.getsize(path) / 1024 / 1024:.0f} MiB on disk")
+        print(f"ingest: {ingest_seconds:.1f}s ({args.studies / ingest_seconds:.0f} studies/s)")
+        print(f"{'query':<20}{'p50 ms':>10}{'max ms':>10}{'results':>10}")
+        for name, search_data in QUERIES.items():
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                result = mirror.search(search_data, page_size=10)
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f"{name:<20}{statistics.median(timings):>10.2f}{max(timings):>10.2f}{len(result or []):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Parse time and peak memory: full json.loads versus the streaming projector.
+
+parse_studies uses json.loads up to CTGOV_STREAM_PARSE_MIN_BYTES and
+streams above it; the "auto" rows show which one it picked for each body.
+
+    python -m benchmarks.parse_studies                 # synthetic pages
+    python -m benchmarks.parse_studies --record 5      # record real pages first
+    python -m benchmarks.parse_studies --data benchmarks/data
+
+Recorded responses are plain /studies JSON bodies fetched without a
+fields= projection, i.e. the worst case the parser has to cope with.
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import statistics
+import time
+import tracemalloc
+import requests
+from app.services.search import SearchService
+from app.services.study_parser import STUDY_FIELDS, parse_studies, project
+from benchmarks.fixtures import make_page_bytes
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+BASE_URL = "https://clinicaltrials.gov/api/v2/studies"
+
+
+def record(pages, page_size, data_dir, condition):
+    os.makedirs(data_dir, exist_ok=True)
+    params = {"format": "json", "pageSize": page_size, "query.cond": condition}
+    for page in range(1, pages + 1):
+        response = requests.get(BASE_URL, params=params, timeout=(5, 60))
+        response.raise_for_status()
+        path = os.path.join(data_dir, f"studies_{condition}_{page}.json")
+        with open(path, "wb") as f:
+            f.write(response.content)
+        print(f"recorded {path} ({len(response.content) / 1024:.0f} KiB)")
+        token = response.json().get("nextPageToken")
+        if not token:
+            break
+        params["pageToken"] = token
+
+
+def load_bodies(data_dir, synthetic_pages, page_size):
+    paths = sorted(glob.glob(os.path.join(data_dir, "*.json")))
+    if paths:
+        bodies = []
+        for path in paths:
+            with open(path, "rb") as f:
+                bodies.append(f.read())
+        return bodies, f"{len(paths)} recorded responses from {data_dir}"
+    bodies = [make_page_bytes(page_size, seed) for seed in range(synthetic_pages)]
+    return bodies, f"{synthetic_pages} synthetic pages of {page_size} studies"
+
+
+class ChunkedReader(io.RawIOBase):
+    """Hands the body out in socket-sized reads, like response.raw does."""
+
+    def __init__(self, body, chunk_size=64 * 1024):
+        self.body = body
+        self.offset = 0
+        self.chunk_size = chunk_size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.chunk_size, len(self.body) - self.offset)
+        buffer[:size] = self.body[self.offset:self.offset + size]
+        self.offset += size
+        return size
+
+
+def apply_fields_projection(body):
+    # what the same page looks like when fetched with the default fields=
+    page = json.loads(body)
+    paths = [tuple(field.split(".")) for field in STUDY_FIELDS]
+    page["studies"] = [project(study, paths) for study in page["studies"]]
+    return json.dumps(page).encode("utf-8")
+
+
+def full_parse(body):
+    # what response.json() did: the whole body is decoded and parsed at once
+    return SearchService.filter_studies(json.loads(body.decode("utf-8")))
+
+
+def streaming_parse(body):
+    return SearchService.filter_studies(parse_studies(ChunkedReader(body), stream_min_bytes=0))
+
+
+def auto_parse(body):
+    return SearchService.filter_studies(parse_studies(ChunkedReader(body)))
+
+
+def measure(fn, bodies, repeat):
+    timings = []
+    for _ in range(repeat):
+        for body in bodies:
+            started = time.perf_counter()
+            fn(body)
+            timings.append(time.perf_counter() - started)
+
+    peaks = []
+    for body in bodies:
+        tracemalloc.start()
+        fn(body)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.median(timings), max(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DATA_DIR)
+    parser.add_argument("--record", type=int, default=0, metavar="PAGES")
+    parser.add_argument("--condition", default="cancer")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=5, help="synthetic pages when nothing is recorded")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.page_size, args.data, args.condition)
+
+    bodies, source = load_bodies(args.data, args.pages, args.page_size)
+    assert full_parse(bodies[0]) == streaming_parse(bodies[0]), "projection changed filter_studies output"
+
+    projected = [apply_fields_projection(body) for body in bodies]
+    print(source)
+    print(f"{'body':<24}{'parser':<12}{'KiB':>8}{'median ms':>12}{'peak MiB':>12}")
+    for label, payloads in (("full", bodies), ("fields= projection", projected)):
+        size = statistics.mean(len(body) for body in payloads) / 1024
+        for name, fn in (("json.loads", full_parse), ("streaming", streaming_parse), ("auto", auto_parse)):
+            median, peak = measure(fn, payloads, args.repeat)
+            print(f"{label:<24}{name:<12}{size:>8.0f}{median * 1000:>12.1f}{peak / 2 ** 20:>12.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Serving a cached search page: jsonify per request versus the kept body.
+
+    python -m benchmarks.responses --studies 20 --requests 2000
+
+Times what a cache hit costs to turn into a response: before, jsonify of
+serialize_studies on every request, sent uncompressed; now, the encoded
+body kept with the cached result, compressed once per encoding, and
+a 304 for a client that already has it. Also prints the bytes each
+sends.
+"""
+import argparse
+import time
+from flask import Flask, jsonify
+from app.core.responses import EncodedBody, encoded_response
+from app.models.study import Study, serialize_studies
+from benchmarks.fixtures import make_page
+
+
+def per_request_us(app, headers, build, requests):
+    with app.test_request_context(headers=headers):
+        response = build()
+        started = time.perf_counter()
+        for _ in range(requests):
+            build()
+        return (time.perf_counter() - started) / requests * 1e6, len(response.get_data())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--studies", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    studies = [Study.from_api(study) for study in make_page(args.studies)["studies"]]
+    body = EncodedBody.from_data(serialize_studies(studies))
+
+    rows = [
+        ("jsonify per request", {}, lambda: jsonify(serialize_studies(studies))),
+        ("kept body, identity", {}, lambda: encoded_response(body)),
+        ("kept body, gzip", {"Accept-Encoding": "gzip"}, lambda: encoded_response(body)),
+        ("kept body, br", {"Accept-Encoding": "br"}, lambda: encoded_response(body)),
+        ("If-None-Match -> 304", {"If-None-Match": body.etag()}, lambda: encoded_response(body)),
+    ]
+    print(f"{args.studies} studies per page, {args.requests} requests")
+    print(f"{'':<24}{'us/request':>12}{'bytes':>10}")
+    for name, headers, build in rows:
+        us, size = per_request_us(app, headers, build, args.requests)
+        print(f"{name:<24}{us:>12.1f}{size:>10}")
+
+
+if __name__ == "__main__":
+    main()
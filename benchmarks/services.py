@@ -0,0 +1,85 @@
+"""Per-request service setup: building SearchService each time versus the registry.
+
+    python -m benchmarks.services --requests 500 --token-ms 80
+
+Before the registry, every search built a SearchService, a TranslateService
+and a Google translate client: the service account JSON was parsed, the
+key loaded and, on the first translation, a new OAuth token fetched.
+A throwaway service account is generated so no network or real key is
+needed; the token fetch is simulated with --token-ms of sleep.
+"""
+import argparse
+import json
+import time
+from unittest.mock import patch
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google.oauth2 import service_account
+from app.core.config import Config
+from app.services.registry import get_search_service, reset_services
+from app.services.search import SearchService
+from app.services.translate import TranslateService, build_translator
+
+
+def fake_service_account() -> str:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    return json.dumps({
+        "type": "service_account",
+        "project_id": "benchmark",
+        "private_key_id": "benchmark",
+        "private_key": pem,
+        "client_email": "benchmark@benchmark.iam.gserviceaccount.com",
+        "client_id": "1",
+        "token_uri": "https://oauth2.googleapis.com/token",
+    })
+
+
+def run(requests, get_service, token_seconds):
+    fetches = 0
+
+    def refresh(credentials, request):
+        nonlocal fetches
+        fetches += 1
+        time.sleep(token_seconds)
+        credentials.token = "token"
+        credentials.expiry = None
+
+    with patch.object(service_account.Credentials, "refresh", refresh):
+        started = time.perf_counter()
+        for _ in range(requests):
+            credentials = get_service().translate_service.translator._credentials
+            # what the authorized session does before the first call it makes
+            if not credentials.valid:
+                credentials.refresh(None)
+        elapsed = time.perf_counter() - started
+    return elapsed / requests * 1000, fetches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--token-ms", type=float, default=80.0, help="simulated OAuth token fetch latency")
+    args = parser.parse_args()
+
+    Config.GOOGLE_CREDENTIALS = fake_service_account()
+    token_seconds = args.token_ms / 1000
+
+    per_request_ms, per_request_fetches = run(
+        args.requests,
+        lambda: SearchService(translate_service=TranslateService(translator=build_translator())),
+        token_seconds,
+    )
+    reset_services()
+    registry_ms, registry_fetches = run(args.requests, get_search_service, token_seconds)
+
+    print(f"{args.requests} requests, {args.token_ms:.0f} ms per token fetch")
+    print(f"{'':<22}{'ms/request':>12}{'token fetches':>15}")
+    print(f"{'built per request':<22}{per_request_ms:>12.3f}{per_request_fetches:>15}")
+    print(f"{'process registry':<22}{registry_ms:>12.3f}{registry_fetches:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Memory and CPU of Study records versus the old per-study dicts.
+
+    python -m benchmarks.study_records --studies 1000
+
+Compares what a cached result costs to hold and what translation has to
+walk: the old generic recursive collection over dicts versus
+Study.texts() over known fields.
+"""
+import argparse
+import time
+import tracemalloc
+from app.models.study import Study
+from benchmarks.fixtures import make_page
+
+
+def collect_strings(d, strings):
+    # the recursive walk translate_fields does over dict results
+    if isinstance(d, dict):
+        for k, v in d.items():
+            if k not in ('Location', 'Contacts'):
+                collect_strings(v, strings)
+    elif isinstance(d, list):
+        for item in d:
+            collect_strings(item, strings)
+    elif isinstance(d, str) and d.strip():
+        strings.append(d)
+    return strings
+
+
+def held_bytes(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, after - before
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--studies", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    raw = make_page(args.studies)["studies"]
+    records, records_bytes = held_bytes(lambda: [Study.from_api(study) for study in raw])
+    # the old results had no NCT ID key
+    dicts, dicts_bytes = held_bytes(lambda: [
+        {key: value for key, value in Study.from_api(study).to_dict().items() if key != "NCT ID"}
+        for study in raw
+    ])
+
+    collect_dicts = best_of(lambda: collect_strings(dicts, []), args.repeat)
+    collect_records = best_of(lambda: [text for study in records for text in study.texts()], args.repeat)
+    assert sorted(collect_strings(dicts, [])) == sorted(text for study in records for text in study.texts())
+
+    print(f"{args.studies} studies")
+    print(f"{'':<16}{'held KiB':>12}{'collect ms':>12}")
+    print(f"{'dicts':<16}{dicts_bytes / 1024:>12.0f}{collect_dicts * 1000:>12.2f}")
+    print(f"{'Study records':<16}{records_bytes / 1024:>12.0f}{collect_records * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
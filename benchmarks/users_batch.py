@@ -0,0 +1,103 @@
+"""Batch user endpoints versus one call per user.
+
+    python -m benchmarks.users_batch --users 2000 --latency-ms 1
+    python -m benchmarks.users_batch --mongo-uri mongodb://localhost:27017
+
+Runs lookup, update and delete for N users through the UserService batch
+methods and through N single calls. Without --mongo-uri it uses mongomock
+and adds --latency-ms to every call, standing in for the network round
+trip that dominates the single-call path against a real server.
+"""
+import argparse
+import time
+from types import SimpleNamespace
+from bson import ObjectId
+from app.services.user import UserService
+
+
+class RoundTripCollection:
+    """A mongomock collection that sleeps for one round trip per call."""
+
+    def __init__(self, collection, latency):
+        self.collection = collection
+        self.latency = latency
+
+    def __getattr__(self, name):
+        attr = getattr(self.collection, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            time.sleep(self.latency)
+            return attr(*args, **kwargs)
+        return call
+
+    def bulk_write(self, operations, ordered=True):
+        # mongomock's bulk_write does not accept current pymongo operations;
+        # one round trip applying each update stands in for it
+        time.sleep(self.latency)
+        for operation in operations:
+            self.collection.update_one(operation._filter, operation._doc)
+
+
+def make_db(args):
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        db = MongoClient(args.mongo_uri)["users_batch_benchmark"]
+        db.users.drop()
+        return db
+    import mongomock
+    return SimpleNamespace(users=RoundTripCollection(mongomock.MongoClient().db.users, args.latency_ms / 1000))
+
+
+def seed(db, users):
+    ids = [ObjectId() for _ in range(users)]
+    db.users.insert_many([
+        {"_id": user_id, "username": f"user{n}", "email": f"user{n}@example.com", "hashed_password": "x"}
+        for n, user_id in enumerate(ids)
+    ])
+    return [str(user_id) for user_id in ids]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    parser.add_argument("--mongo-uri")
+    args = parser.parse_args()
+
+    rows = []
+    for name, single, batch in [
+        ("lookup",
+         lambda service, ids: [service.get_user_by_id(user_id) for user_id in ids],
+         lambda service, ids: list(service.get_users_by_ids(ids))),
+        ("update",
+         lambda service, ids: [service.update_user(user_id, {"username": f"renamed-{user_id}"}) for user_id in ids],
+         lambda service, ids: service.update_users([{"id": user_id, "username": f"renamed-{user_id}"} for user_id in ids])),
+        ("delete",
+         lambda service, ids: [service.delete_user(user_id) for user_id in ids],
+         lambda service, ids: service.delete_users(ids)),
+    ]:
+        timings = []
+        for fn in (single, batch):
+            db = make_db(args)
+            ids = seed(db, args.users)
+            service = UserService(db)
+            timings.append(timed(lambda: fn(service, ids)))
+        rows.append((name, *timings))
+
+    backend = args.mongo_uri or f"mongomock + {args.latency_ms} ms per call"
+    print(f"{args.users} users, {backend}")
+    print(f"{'':<10}{'single s':>10}{'batch s':>10}{'speedup':>10}")
+    for name, single_seconds, batch_seconds in rows:
+        print(f"{name:<10}{single_seconds:>10.2f}{batch_seconds:>10.3f}{single_seconds / batch_seconds:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()